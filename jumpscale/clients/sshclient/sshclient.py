@@ -21,6 +21,16 @@ JS-NG> localclient.sshclient.run("hostname")
 asgard
 (0, 'asgard\n', '')
 
+```
+
+## Executing many commands
+
+Connections are pooled and shared by all clients with the same host, user, port and key,
+and many commands can be run concurrently over the same connection
+
+```
+JS-NG> localclient.sshclient.run_many(["hostname", "uptime"])
+[(0, 'asgard\n', ''), (0, ' 11:28:30 up 2 days, ...', '')]
 ```
 """
 
@@ -93,10 +103,12 @@ class SSHClient(Client):
         return self.__client
 
     def reset_connection(self):
-        """Reset the connection
+        """Reset the connection (the pooled connection is closed, and a new one is opened on next use)
         e.g
             localconnection = j.clients.sshclient.new("localconnection")
             localconnection.reset_connection()
 
         """
+        if self.__client:
+            self.__client.close()
         self.__client = None
@@ -1,5 +1,6 @@
 from jumpscale.core.base import StoredFactory
 from .client import ZDBClient, ZDBAdminClient
+from .replication import BATCH_SIZE, copy_namespace
 
 
 class ZDBFactory(StoredFactory):
@@ -8,6 +9,26 @@ class ZDBFactory(StoredFactory):
             self.type = ZDBAdminClient
         return super().new(name, *args, **kwargs)
 
+    def copy_namespace(self, src, dst, workers=4, batch_size=BATCH_SIZE, checkpoint_path=None):
+        """
+        copy all entries of the namespace of `src` client to the namespace of `dst` client,
+        see `jumpscale.clients.zdb.replication`
+
+        :param src: source client
+        :type src: ZDBClient
+        :param dst: destination client
+        :type dst: ZDBClient
+        :param workers: number of connections used to read (and write in user mode), defaults to 4
+        :type workers: int, optional
+        :param batch_size: number of entries written at once, defaults to BATCH_SIZE
+        :type batch_size: int, optional
+        :param checkpoint_path: a file to save progress to, and resume from if it exists, defaults to None
+        :type checkpoint_path: str, optional
+        :return: copy metrics
+        :rtype: CopyStats
+        """
+        return copy_namespace(src, dst, workers=workers, batch_size=batch_size, checkpoint_path=checkpoint_path)
+
 
 def export_module_as():
 
@@ -8,6 +8,7 @@ zcl = j.clients.zdb.get("instance", admin=True, mode="user")
 """
 from jumpscale.clients.base import Client
 from jumpscale.core.base import fields
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
 
@@ -77,8 +78,7 @@ class ZDBClient(Client):
         return key
 
     def set(self, data, key=None):
-        key = key or ""
-        key = self._key_encode(key)
+        key = "" if key is None else self._key_encode(key)
         res = self.redis.execute_command("SET", key, data)
         if not res:
             return res
@@ -88,6 +88,52 @@ class ZDBClient(Client):
         key = self._key_encode(key)
         return self.redis.execute_command("GET", key)
 
+    def _mget_raw(self, keys):
+        """
+        get data of many (already encoded) keys in one pipelined round trip
+
+        :param keys: encoded keys
+        :type keys: list
+        :return: data of every key (None if not found)
+        :rtype: list
+        """
+        if not keys:
+            return []
+
+        pipeline = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipeline.execute_command("GET", key)
+        return pipeline.execute()
+
+    def mget(self, keys):
+        """
+        get data of many keys in one pipelined round trip
+
+        :param keys: keys
+        :type keys: list
+        :return: data of every key (in the same order), None if not found
+        :rtype: list
+        """
+        return self._mget_raw([self._key_encode(key) for key in keys])
+
+    def mset(self, items):
+        """
+        set many entries in one pipelined round trip
+
+        :param items: (key, data) tuples (a key can be None in seq mode to get a new key) or a dict of key/data
+        :type items: list or dict
+        :return: keys of every entry (in the same order)
+        :rtype: list
+        """
+        if isinstance(items, dict):
+            items = items.items()
+
+        pipeline = self.redis.pipeline(transaction=False)
+        for key, data in items:
+            pipeline.execute_command("SET", "" if key is None else self._key_encode(key), data)
+
+        return [self._key_decode(res) if res else res for res in pipeline.execute()]
+
     def exists(self, key):
         key = self._key_encode(key)
         return self.redis.execute_command("EXISTS", key) == 1
@@ -135,10 +181,13 @@ class ZDBClient(Client):
             result.append(key)
         return result
 
-    def iterate(self, key_start=None, reverse=False, keyonly=False):
+    def iterate(self, key_start=None, reverse=False, keyonly=False, workers=1):
         """
         walk over all the namespace and yield (key,data) for each entries in a namespace
 
+        data of every page of keys is fetched with pipelined GETs (one round trip per page, or per worker),
+        and the next page is scanned while the data is fetched
+
         :param key_start: if specified start to walk from that key instead of the first one, defaults to None
         :param key_start: str, optional
         :param reverse: decide how to walk the namespace
@@ -148,6 +197,8 @@ class ZDBClient(Client):
         :param reverse: bool, optional
         :param keyonly: [description], defaults to False
         :param keyonly: bool, optional
+        :param workers: number of connections used to fetch data of every page in parallel, defaults to 1
+        :param workers: int, optional
         :raises e: [description]
         """
 
@@ -162,27 +213,44 @@ class ZDBClient(Client):
 
         CMD = "SCANX" if not reverse else "RSCAN"
 
-        while True:
+        def scan(cursor):
+            # format of the response
+            # see https://github.com/threefoldtech/0-db/tree/development#scan
             try:
-                if not next:
-                    response = self.redis.execute_command(CMD)
-                else:
-                    response = self.redis.execute_command(CMD, next)
-                # format of the response
-                # see https://github.com/threefoldtech/0-db/tree/development#scan
+                if not cursor:
+                    return self.redis.execute_command(CMD)
+                return self.redis.execute_command(CMD, cursor)
             except redis.ResponseError as e:
                 if e.args[0] == "No more data":
                     return
                 raise e
 
-            (next, results) = response
-            for item in results:
-                keyb, size, epoch = item
-                key_new = self._key_decode(keyb)
-                data = None
-                if not keyonly:
-                    data = self.redis.execute_command("GET", keyb)
-                yield (key_new, data)
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+
+            def fetch(keys):
+                # split the page between workers, every worker would use its own connection from the pool
+                chunk_size = -(-len(keys) // max(workers, 1)) or 1
+                chunks = [keys[i : i + chunk_size] for i in range(0, len(keys), chunk_size)]
+                return [executor.submit(self._mget_raw, chunk) for chunk in chunks]
+
+            response = scan(next)
+            while response:
+                (next, results) = response
+                keys = [item[0] for item in results]
+                futures = [] if keyonly else fetch(keys)
+
+                # scan the next page while data of this one is fetched
+                response = scan(next)
+
+                values = []
+                for future in futures:
+                    values.extend(future.result())
+
+                for index, keyb in enumerate(keys):
+                    data = None
+                    if not keyonly:
+                        data = values[index]
+                    yield (self._key_decode(keyb), data)
 
     @property
     def count(self):
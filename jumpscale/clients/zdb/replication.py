@@ -0,0 +1,217 @@
+"""
+Copy (replicate/backup) a namespace from one 0-db to another
+
+```python
+src = j.clients.zdb.get("src", addr="10.0.0.1", nsname="data", mode="user")
+dst = j.clients.zdb.get("dst", addr="10.0.0.2", nsname="data", mode="user")
+
+stats = j.clients.zdb.copy_namespace(src, dst, workers=4, checkpoint_path="/tmp/data.checkpoint")
+print(stats)
+```
+
+Keys are streamed from the source (data of every page is fetched with pipelined GETs),
+and written to the destination in pipelined batches.
+
+If a checkpoint path is given, the last copied key is saved after every batch, so an interrupted copy
+resumes from where it stopped when called again with the same checkpoint path.
+
+In seq mode, entries are appended to the destination in the same order (the destination should be empty
+before the first copy), in user mode, keys are kept and batches are written in parallel by `workers` connections.
+"""
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from jumpscale.data.serializers import json
+from jumpscale.loader import j
+
+from .client import Mode
+
+# number of entries written to the destination at once
+BATCH_SIZE = 500
+# log progress every this number of batches
+PROGRESS_INTERVAL = 20
+
+
+class CopyStats:
+    """Progress and throughput metrics of a namespace copy"""
+
+    def __init__(self, copied=0, size=0):
+        self.copied = copied
+        self.size = size
+        self.skipped = 0
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def entries_per_second(self):
+        return self.copied / self.elapsed if self.elapsed else 0
+
+    @property
+    def bytes_per_second(self):
+        return self.size / self.elapsed if self.elapsed else 0
+
+    def to_dict(self):
+        return {
+            "copied": self.copied,
+            "size": self.size,
+            "skipped": self.skipped,
+            "elapsed": self.elapsed,
+            "entries_per_second": self.entries_per_second,
+            "bytes_per_second": self.bytes_per_second,
+        }
+
+    def __str__(self):
+        return (
+            f"copied {self.copied} entries ({self.size} bytes) in {self.elapsed:.2f}s, "
+            f"{self.entries_per_second:.2f} entries/s, {self.bytes_per_second / 1024 / 1024:.2f} MB/s"
+        )
+
+    __repr__ = __str__
+
+
+def _load_checkpoint(path):
+    if path and j.sals.fs.exists(path):
+        return json.loads(j.sals.fs.read_text(path))
+
+
+def _save_checkpoint(path, src, dst, last_key, dst_last_key, stats):
+    if not path:
+        return
+
+    if isinstance(last_key, bytes):
+        last_key = last_key.hex()
+
+    checkpoint = {
+        "src": f"{src.addr}:{src.port}/{src.nsname}",
+        "dst": f"{dst.addr}:{dst.port}/{dst.nsname}",
+        "last_key": last_key,
+        "dst_last_key": dst_last_key,
+        "copied": stats.copied,
+        "size": stats.size,
+    }
+    tmp_path = f"{path}.tmp"
+    j.sals.fs.write_text(tmp_path, json.dumps(checkpoint))
+    j.sals.fs.rename(tmp_path, path)
+
+
+def _count_appended(dst, dst_last_key):
+    """
+    count entries appended to a seq mode destination after `dst_last_key` (all entries if it's None),
+    these are written by an interrupted batch after the last checkpoint
+    """
+    count = sum(1 for _ in dst.iterate(key_start=dst_last_key, keyonly=True))
+    if dst_last_key is not None:
+        # the start key itself is yielded first
+        count -= 1
+    return count
+
+
+def copy_namespace(src, dst, workers=4, batch_size=BATCH_SIZE, checkpoint_path=None):
+    """
+    copy all entries of the namespace of `src` client to the namespace of `dst` client
+
+    :param src: source client
+    :type src: ZDBClient
+    :param dst: destination client (should have the same mode as the source)
+    :type dst: ZDBClient
+    :param workers: number of connections used to read (and write in user mode), defaults to 4
+    :type workers: int, optional
+    :param batch_size: number of entries written at once, defaults to BATCH_SIZE
+    :type batch_size: int, optional
+    :param checkpoint_path: a file to save progress to, and resume from if it exists, defaults to None
+    :type checkpoint_path: str, optional
+    :return: copy metrics
+    :rtype: CopyStats
+    """
+    if src.mode.value != dst.mode.value:
+        raise j.exceptions.Value("source and destination must have the same mode")
+
+    seq = src.mode.value == Mode.SEQ.value
+
+    key_start = None
+    dst_last_key = None
+    skip = 0
+    stats = CopyStats()
+    checkpoint = _load_checkpoint(checkpoint_path)
+    if checkpoint:
+        key_start = checkpoint["last_key"]
+        if key_start is not None and not seq:
+            key_start = bytes.fromhex(key_start)
+        dst_last_key = checkpoint.get("dst_last_key")
+        stats = CopyStats(copied=checkpoint["copied"], size=checkpoint["size"])
+        j.logger.info(f"resuming copy of {src.nsname} from {key_start} ({stats.copied} entries already copied)")
+
+        if seq:
+            # entries of a partially written batch cannot be overwritten in seq mode, skip them instead
+            skip = _count_appended(dst, dst_last_key)
+    else:
+        # an initial checkpoint, so a partially written first batch is detected if interrupted
+        _save_checkpoint(checkpoint_path, src, dst, None, None, stats)
+
+    entries = src.iterate(key_start=key_start, workers=workers)
+    if key_start is not None:
+        # the start key is yielded first, but it's already copied
+        next(entries, None)
+
+    def write(batch):
+        # in seq mode, new entries are appended (key is assigned by the destination)
+        return dst.mset([(None if seq else key, data) for key, data in batch])
+
+    # seq mode entries must be written in order
+    write_workers = 1 if seq else max(workers, 1)
+    with ThreadPoolExecutor(max_workers=write_workers) as executor:
+        pending = []
+        batches_count = 0
+
+        def wait_oldest():
+            nonlocal batches_count, dst_last_key
+            future, batch = pending.pop(0)
+            dst_keys = future.result()
+
+            # all batches before this one are done too, so it's safe to checkpoint its last key
+            stats.copied += len(batch)
+            stats.size += sum(len(data) for _, data in batch if data)
+            if seq:
+                dst_last_key = dst_keys[-1]
+            _save_checkpoint(checkpoint_path, src, dst, batch[-1][0], dst_last_key, stats)
+
+            batches_count += 1
+            if batches_count % PROGRESS_INTERVAL == 0:
+                j.logger.info(f"copying {src.nsname}: {stats}")
+
+        batch = []
+        for key, data in entries:
+            if data is None:
+                # deleted in the meantime
+                stats.skipped += 1
+                continue
+
+            if skip:
+                # already appended to the destination before the copy was interrupted
+                skip -= 1
+                stats.copied += 1
+                stats.size += len(data)
+                continue
+
+            batch.append((key, data))
+            if len(batch) >= batch_size:
+                pending.append((executor.submit(write, batch), batch))
+                batch = []
+                # limit the number of in-flight batches
+                if len(pending) >= write_workers * 2:
+                    wait_oldest()
+
+        if batch:
+            pending.append((executor.submit(write, batch), batch))
+
+        while pending:
+            wait_oldest()
+
+    stats.finished_at = time.monotonic()
+    j.logger.info(f"copy of {src.nsname} is done: {stats}")
+    return stats
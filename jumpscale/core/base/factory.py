@@ -21,6 +21,7 @@ Get all stores configurations:
 redis.hostname = "localhost"
 redis.port = 6379
 filesystem.path = "/home/abom/.config/jumpscale/secureconfig"
+packed.path = "/home/abom/.config/jumpscale/packedconfig"
 whoosh.path = "/home/abom/.config/jumpscale/whoosh_indexes"
 ```
 
@@ -31,18 +32,46 @@ jsctl config update store redis
 ```
 
 This will use current redis config (hostname: localhost, port: 6379).
+
+To save many instances at once (e.g. when provisioning a lot of child instances), use a batch:
+
+```python
+with factory.batch():
+    for i in range(100):
+        child = instance.children.get(f"child_{i}")
+        child.save()
+```
+
+Inside a batch, `save()` only validates instances, every saved instance (and its parents) is written once
+when the batch is done.
+
+Instances are loaded from the store on first access, to load all of them at once (e.g. to iterate over them),
+use `load_all`, secrets can be decrypted in parallel by passing the number of `workers`:
+
+```python
+for instance in factory.load_all(workers=8):
+    print(instance.instance_name)
+```
 """
+import threading
+
+from contextlib import contextmanager
 from functools import partial
 from jumpscale.core import config, events
 
 from .events import InstanceCreateEvent, InstanceDeleteEvent
 from .store import ConfigNotFound, KEY_FIELD_NAME, Location
 from .store.filesystem import FileSystemStore
+from .store.packed import PackedStore
 from .store.redis import RedisStore
 from .store.whooshfts import WhooshStore
 
 
-STORES = {"filesystem": FileSystemStore, "redis": RedisStore, "whoosh": WhooshStore}
+STORES = {"filesystem": FileSystemStore, "packed": PackedStore, "redis": RedisStore, "whoosh": WhooshStore}
+
+
+# the current save batch (per thread), see `StoredFactory.batch`
+_local = threading.local()
 
 
 class DuplicateError(Exception):
@@ -51,6 +80,70 @@ class DuplicateError(Exception):
     """
 
 
+class SaveBatch:
+    """
+    collects instances saved inside a `StoredFactory.batch` context, to be written once when it's done
+    """
+
+    def __init__(self):
+        # a mapping between (location name, instance name) and (factory, instance)
+        self.instances = {}
+
+    def add(self, factory, instance):
+        """
+        add an instance to this batch
+
+        Args:
+            factory (StoredFactory): the factory of this instance
+            instance (Base): instance
+
+        Returns:
+            bool: `True` if added, `False` if it was already added
+        """
+        key = (factory.location.name, instance.instance_name)
+        if key in self.instances:
+            return False
+        self.instances[key] = (factory, instance)
+        return True
+
+    def discard(self, factory, name):
+        """
+        discard an instance from this batch (e.g. if it's deleted)
+
+        Args:
+            factory (StoredFactory): the factory of this instance
+            name (str): instance name
+        """
+        self.instances.pop((factory.location.name, name), None)
+
+    def contains(self, factory, name):
+        """
+        check if an instance is in this batch
+
+        Args:
+            factory (StoredFactory): the factory of this instance
+            name (str): instance name
+
+        Returns:
+            bool
+        """
+        return (factory.location.name, name) in self.instances
+
+    def flush(self):
+        """
+        write all instances of this batch, every store writes its instances at once
+        """
+        by_factory = {}
+        for factory, instance in self.instances.values():
+            configs = by_factory.setdefault(factory, {})
+            configs[instance.instance_name] = instance._get_data()
+
+        for factory, configs in by_factory.items():
+            factory.store.save_many(configs)
+
+        self.instances = {}
+
+
 class Factory:
     """
     Base factory, where you can create/get/list/delete new instances.
@@ -346,15 +439,52 @@ class StoredFactory(events.Handler, Factory):
             self.__store = self.STORE(self.location)
         return self.__store
 
+    @contextmanager
+    def batch(self):
+        """
+        a context where saving instances (of any stored factory) only validates them,
+        and they're written once (with their parents) when the context is done
+
+        if an exception is raised inside the context, nothing will be written
+
+        nested batches are merged with the outer one
+
+        Yields:
+            SaveBatch: current batch
+        """
+        current_batch = getattr(_local, "batch", None)
+        if current_batch:
+            yield current_batch
+            return
+
+        current_batch = SaveBatch()
+        _local.batch = current_batch
+        try:
+            yield current_batch
+        finally:
+            _local.batch = None
+
+        current_batch.flush()
+
     def _validate_and_save_instance(self, instance):
         """
         validate and save a given instance to the store
 
+        if there's a current batch, it will only be added to it
+
         Args:
             instance (Base)
         """
         instance.validate()
-        self.store.save(instance.instance_name, instance._get_data())
+
+        current_batch = getattr(_local, "batch", None)
+        if current_batch:
+            if not current_batch.add(self, instance):
+                # already added with its parents
+                return
+        else:
+            self.store.save(instance.instance_name, instance._get_data())
+
         if instance.parent and hasattr(instance.parent, "save"):
             instance.parent.save()
 
@@ -438,7 +568,8 @@ class StoredFactory(events.Handler, Factory):
         """
         instance = super().find(name)
         if instance:
-            if self.always_reload:
+            current_batch = getattr(_local, "batch", None)
+            if self.always_reload and not (current_batch and current_batch.contains(self, name)):
                 try:
                     instance._set_data(self.store.get(name))
                 except ConfigNotFound:
@@ -495,6 +626,49 @@ class StoredFactory(events.Handler, Factory):
 
         return property(getter)
 
+    def _is_loaded(self, name):
+        """
+        check if an instance is already created in this factory (not only listed)
+
+        Args:
+            name (str): instance name
+
+        Returns:
+            bool
+        """
+        return name in self.__dict__ or f"__{name}" in self.__dict__
+
+    def load_all(self, workers=None):
+        """
+        load all stored instances at once, instead of loading every instance on first access
+
+        configs of not-loaded instances are read in bulk from the store, and can be decrypted by a pool of threads,
+        already loaded instances are kept as is.
+
+        ```python
+        for instance in factory.load_all(workers=8):
+            print(instance.instance_name)
+        ```
+
+        Args:
+            workers (int, optional): number of threads used to decrypt configs. Defaults to None (no threads).
+
+        Returns:
+            list: all loaded instances
+        """
+        names = [name for name in self.store.list_all() if not self._is_loaded(name)]
+        configs = self.store.get_many(names, workers=workers)
+
+        for name, instance_config in configs.items():
+            instance = self._get_object_from_config(name, instance_config)
+            if isinstance(getattr(self.__class__, name, None), property):
+                # listed by the store, set the value used by its property descriptor
+                setattr(self, f"__{name}", instance)
+            else:
+                setattr(self, name, instance)
+
+        return list(self)
+
     def _load(self):
         """
         lazy-load all instance configuration
@@ -521,6 +695,10 @@ class StoredFactory(events.Handler, Factory):
         Args:
             name (str): instance name
         """
+        current_batch = getattr(_local, "batch", None)
+        if current_batch:
+            current_batch.discard(self, name)
+
         self.store.delete(name)
 
         class_prop = getattr(self.__class__, name, None)
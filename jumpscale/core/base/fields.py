@@ -63,6 +63,7 @@ import uuid
 from urllib.parse import urlparse
 
 from .factory import Factory as BaseFactory, StoredFactory
+from .store import EncryptedValue
 
 
 class ValidationError(Exception):
@@ -351,6 +352,12 @@ class Secret(String):
         kwargs: any keyword arguments supported by `String`
     """
 
+    def validate(self, value):
+        # a still-encrypted value (lazy decryption), will be validated after being decrypted
+        if isinstance(value, EncryptedValue):
+            return
+        super().validate(value)
+
 
 class Object(Typed):
     def __init__(self, type_, type_kwargs=None, **kwargs):
@@ -73,6 +73,7 @@ from jumpscale.core import events
 from . import fields
 from .factory import Factory, StoredFactory, DuplicateError
 from .events import AttributeUpdateEvent
+from .store import EncryptedValue
 
 
 def get_field_property(name: str, field: fields.Field) -> property:
@@ -293,7 +294,13 @@ class Base(SimpleNamespace, metaclass=BaseMeta):
         # and also when __getattr__ is overridden
         inner_name = f"__{name}"
         if inner_name in self.__dict__:
-            return getattr(self, inner_name)
+            value = getattr(self, inner_name)
+            if isinstance(value, EncryptedValue):
+                # a lazy-loaded secret, decrypt it once, validate it and keep the decrypted value
+                value = field.from_raw(value.decrypt())
+                field.validate_with_name(value, name)
+                setattr(self, inner_name, value)
+            return value
 
         # if default is callable, get it
         if callable(field.default):
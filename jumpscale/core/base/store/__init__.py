@@ -8,9 +8,12 @@ read/write the config data in raw (string) format.
 """
 
 
+import contextlib
 import os
+import threading
 
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
 from jumpscale.data.nacl import NACL
@@ -21,6 +24,30 @@ from jumpscale.core.config import Environment
 # we will use this as a key field name to get it when searching
 KEY_FIELD_NAME = "instance_name_"
 
+# the name used by stores to persist the secondary index of a location
+# instance names cannot start with "__", so it would never clash with an instance
+INDEX_NAME = "__index__"
+
+# private key: NACL, shared by all stores, as deriving keys is expensive
+_nacl_instances = {}
+_nacl_lock = threading.Lock()
+
+
+def get_nacl(private_key):
+    """
+    get a shared `NACL` object for a private key
+
+    Args:
+        private_key (bytes): private key
+
+    Returns:
+        NACL: nacl object
+    """
+    with _nacl_lock:
+        if private_key not in _nacl_instances:
+            _nacl_instances[private_key] = NACL(private_key=private_key)
+        return _nacl_instances[private_key]
+
 
 class InvalidPrivateKey(Exception):
     """
@@ -106,6 +133,43 @@ class EncryptionMode(Enum):
 
     Encrypt = 0
     Decrypt = 1
+    LazyDecrypt = 2
+
+
+class EncryptedValue:
+    """
+    A handle for an encrypted value, which is only decrypted when needed
+
+    The decrypted value is memoized, so it's decrypted at most once.
+    """
+
+    def __init__(self, value, decrypt):
+        """
+        get a new handle for an encrypted value
+
+        Args:
+            value (str): encrypted value (as stored)
+            decrypt (callable): a callable that takes the encrypted value and returns the decrypted one
+        """
+        self.value = value
+        self.__decrypt = decrypt
+        self.__decrypted = None
+        self.__is_decrypted = False
+
+    def decrypt(self):
+        """
+        decrypt the value (only once)
+
+        Returns:
+            str: decrypted value
+        """
+        if not self.__is_decrypted:
+            self.__decrypted = self.__decrypt(self.value)
+            self.__is_decrypted = True
+        return self.__decrypted
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(...)"
 
 
 class EncryptionMixin:
@@ -138,12 +202,207 @@ class EncryptionMixin:
         return self.nacl.decrypt(data, self.public_key).decode()
 
 
+class IndexMixin(ABC):
+    """
+    A mixin that maintains a per-location secondary index of non-secret scalar values
+
+    The index is a mapping between instance names and entries, every entry has:
+
+    - `values`: a mapping of field names to their raw values (only scalar and non-secret values)
+    - `unindexed`: a list of field names that are not indexed (secrets and nested values)
+    - `stamp`: a version stamp of the stored data the entry was built from (see `get_index_stamps`)
+
+    Entries are validated against the stamps of current data before being used, so data written by another
+    process (or by an older version without updating the index) is re-indexed.
+
+    Stores that support it need to implement:
+
+    - `read_index()`: returns the whole index as a dict, or `None` if it does not exist
+    - `write_index(index)`: writes the whole index
+    - `write_index_entries(entries)`: add or update entries (a mapping of instance name and entry)
+    - `delete_index_entries(instance_names)`: remove entries
+    - `get_index_stamps(instance_names, data=None)`: get the current version stamps of instances data
+
+    and optionally `index_lock()`, a context manager to serialize data writes and index updates between processes.
+    """
+
+    INDEXABLE_TYPES = (str, int, float, bool, type(None))
+
+    def get_index_entry(self, config, stamp=None):
+        """
+        get an index entry from a raw (stored) config
+
+        Args:
+            config (dict): config as stored, secrets are prefixed with `__`
+            stamp (any, optional): version stamp of the stored data. Defaults to None.
+
+        Returns:
+            dict: index entry with `values`, `unindexed` field names and the `stamp`
+        """
+        values = {}
+        unindexed = []
+        for name, value in config.items():
+            if name.startswith("__"):
+                unindexed.append(name.lstrip("__"))
+            elif isinstance(value, self.INDEXABLE_TYPES):
+                values[name] = value
+            else:
+                unindexed.append(name)
+        return {"values": values, "unindexed": unindexed, "stamp": stamp}
+
+    def _build_index_entries(self, instance_names):
+        """
+        build index entries from stored configs
+
+        secrets are never decrypted here, they're only listed as unindexed fields
+
+        Args:
+            instance_names (list): instance names
+
+        Returns:
+            dict: a mapping between instance name and index entry (`None` if the data is not found)
+        """
+        # stamps are taken before reading, so if data is changed meanwhile, the entry would be considered stale
+        stamps = self.get_index_stamps(instance_names)
+        entries = {}
+        for instance_name, data in zip(instance_names, self.read_many(instance_names)):
+            if data is None:
+                # keep it, so the index would not be considered stale again
+                entries[instance_name] = None
+                continue
+            entries[instance_name] = self.get_index_entry(self.serializer.deserialize(data), stamps.get(instance_name))
+        return entries
+
+    def rebuild_index(self, instance_names=None):
+        """
+        rebuild the index from stored configs
+
+        Args:
+            instance_names (list, optional): instance names, if not given, `list_all()` is used. Defaults to None.
+
+        Returns:
+            dict: the new index
+        """
+        if instance_names is None:
+            instance_names = self.list_all()
+
+        with self.index_lock():
+            index = self._build_index_entries(instance_names)
+            self.write_index(index)
+        return index
+
+    def get_index(self, instance_names=None):
+        """
+        get current index, it will be rebuilt if it's missing, and stale entries (with a different stamp
+        than current data, or of instances that do not exist anymore) are updated
+
+        Args:
+            instance_names (list, optional): instance names, if not given, `list_all()` is used. Defaults to None.
+
+        Returns:
+            dict: the index
+        """
+        if instance_names is None:
+            instance_names = self.list_all()
+
+        index = self.read_index()
+        if index is None:
+            return self.rebuild_index(instance_names)
+
+        stamps = self.get_index_stamps(instance_names)
+        stale = [
+            name for name in instance_names if name not in index or (index[name] or {}).get("stamp") != stamps.get(name)
+        ]
+        existing = set(instance_names)
+        removed = [name for name in index if name not in existing]
+
+        if stale or removed:
+            with self.index_lock():
+                entries = self._build_index_entries(stale)
+                if entries:
+                    self.write_index_entries(entries)
+                if removed:
+                    self.delete_index_entries(removed)
+
+            index.update(entries)
+            for name in removed:
+                index.pop(name)
+        return index
+
+    def update_index(self, instance_name, config, data=None):
+        """
+        update the index entry of an instance
+
+        Args:
+            instance_name (str): name
+            config (dict): config as stored
+            data (str, optional): serialized config as written. Defaults to None.
+        """
+        self.update_index_many({instance_name: config}, {instance_name: data} if data is not None else None)
+
+    def update_index_many(self, configs, data=None):
+        """
+        update the index entries of many instances at once
+
+        should be called with `index_lock()` acquired, after writing the data
+
+        Args:
+            configs (dict): a mapping between instance name and config (as stored)
+            data (dict, optional): a mapping between instance name and serialized config as written. Defaults to None.
+        """
+        stamps = self.get_index_stamps(list(configs.keys()), data=data)
+        self.write_index_entries(
+            {name: self.get_index_entry(config, stamps.get(name)) for name, config in configs.items()}
+        )
+
+    def remove_from_index(self, instance_name):
+        """
+        remove the index entry of an instance
+
+        Args:
+            instance_name (str): name
+        """
+        with self.index_lock():
+            self.delete_index_entries([instance_name])
+
+    def index_lock(self):
+        """
+        get a context manager to serialize data writes and index updates, by default, nothing is locked
+
+        Returns:
+            context manager
+        """
+        return contextlib.nullcontext()
+
+    @abstractmethod
+    def read_index(self):
+        pass
+
+    @abstractmethod
+    def write_index(self, index):
+        pass
+
+    @abstractmethod
+    def write_index_entries(self, entries):
+        pass
+
+    @abstractmethod
+    def delete_index_entries(self, instance_names):
+        pass
+
+    @abstractmethod
+    def get_index_stamps(self, instance_names, data=None):
+        pass
+
+
 class ConfigStore(ABC):
     """
     the interface every config store should implement:
 
     - `read(instance_name)`:  reads the data of this instance name
+    - `read_many(instance_names)`: optional, reads the data of many instances at once
     - `write(instance_name, data)`: writes the data of this instance
+    - `write_many(data)`: optional, writes the data of many instances at once
     - `list_all(instance_name)`: lists all instance names
     - `delete(instance_name)`: delete instance data
     - `find(self, cursor_=None, limit_=None, **query)`: optional search method with query as field mapping
@@ -153,10 +412,38 @@ class ConfigStore(ABC):
     def read(self, instance_name):
         pass
 
+    def read_many(self, instance_names):
+        """
+        read the data of many instances, backends can override it to do it in less round trips
+
+        Args:
+            instance_names (list): instance names
+
+        Returns:
+            list: data of every instance (in the same order), or `None` if not found
+        """
+        data = []
+        for instance_name in instance_names:
+            try:
+                data.append(self.read(instance_name))
+            except ConfigNotFound:
+                data.append(None)
+        return data
+
     @abstractmethod
     def write(self, instance_name, data):
         pass
 
+    def write_many(self, data):
+        """
+        write the data of many instances, backends can override it to do it at once (e.g. in a transaction)
+
+        Args:
+            data (dict): a mapping between instance name and its data
+        """
+        for instance_name, instance_data in data.items():
+            self.write(instance_name, instance_data)
+
     @abstractmethod
     def list_all(self):
         pass
@@ -173,6 +460,9 @@ class ConfigStore(ABC):
 class EncryptedConfigStore(ConfigStore, EncryptionMixin):
     """the base class for any config store backend"""
 
+    # how many instances are read at once while searching
+    FIND_BATCH_SIZE = 100
+
     def __init__(self, location, serializer):
         """
         the base for encrypted config store
@@ -187,13 +477,15 @@ class EncryptedConfigStore(ConfigStore, EncryptionMixin):
         self.location = location
         self.serializer = serializer
         self.config_env = Environment()
+        # if enabled, secrets are returned as `EncryptedValue` handles, and decrypted only when accessed
+        self.lazy_decrypt = self.config_env.get_factory_config().get("lazy_decrypt", False)
         self.priv_key = base64.decode(self.config_env.get_private_key())
-        self.nacl = NACL(private_key=self.priv_key)
-        self.public_key = self.nacl.public_key.encode()
-
         if not self.priv_key:
             raise InvalidPrivateKey
 
+        self.nacl = get_nacl(self.priv_key)
+        self.public_key = self.nacl.public_key.encode()
+
     def _encrypt_value(self, value):
         """
         encrypt a single value
@@ -231,6 +523,8 @@ class EncryptedConfigStore(ConfigStore, EncryptionMixin):
             if name.startswith("__") and value is not None:
                 if mode == EncryptionMode.Decrypt:
                     new_config[name.lstrip("__")] = self._decrypt_value(value)
+                elif mode == EncryptionMode.LazyDecrypt:
+                    new_config[name.lstrip("__")] = EncryptedValue(value, self._decrypt_value)
                 else:
                     # preserve __ to know it's an encrypted value
                     new_config[name] = self._encrypt_value(value)
@@ -244,19 +538,116 @@ class EncryptedConfigStore(ConfigStore, EncryptionMixin):
         """
         get instance config
 
+        if `lazy_decrypt` is enabled, secrets will be `EncryptedValue` handles instead of decrypted values
+
         Args:
             instance_name (str): instance name
 
         Returns:
             dict: instance config as dict
         """
-        config = self.serializer.deserialize(self.read(instance_name))
+        return self._load_config(self.read(instance_name))
+
+    def get_many(self, instance_names, workers=None):
+        """
+        get the config of many instances, using `read_many` of the backend
+
+        secrets can be decrypted in parallel by a pool of threads (decryption is done by libsodium, which does not
+        hold the GIL), this has no effect if `lazy_decrypt` is enabled, as nothing is decrypted
+
+        Args:
+            instance_names (list): instance names
+            workers (int, optional): number of threads used to decrypt configs. Defaults to None (no threads).
+
+        Returns:
+            dict: a mapping between instance name and config (not found instances are skipped)
+        """
+        found = [
+            (instance_name, data)
+            for instance_name, data in zip(instance_names, self.read_many(instance_names))
+            if data is not None
+        ]
+
+        if not workers or workers < 2 or self.lazy_decrypt or len(found) < 2:
+            return {instance_name: self._load_config(data) for instance_name, data in found}
+
+        configs = [self.serializer.deserialize(data) for _, data in found]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            configs = executor.map(self._process_config, configs, [EncryptionMode.Decrypt] * len(configs))
+            return {instance_name: config for (instance_name, _), config in zip(found, configs)}
+
+    def _load_config(self, data):
+        """
+        deserialize and decrypt config data according to `lazy_decrypt`
+
+        Args:
+            data (str): config data as read from the backend
+
+        Returns:
+            dict: config
+        """
+        config = self.serializer.deserialize(data)
+        if self.lazy_decrypt:
+            return self._process_config(config, EncryptionMode.LazyDecrypt)
         return self._process_config(config, EncryptionMode.Decrypt)
 
+    @property
+    def indexed(self):
+        """
+        whether this store maintains a secondary index (see `IndexMixin`)
+
+        Returns:
+            bool
+        """
+        return isinstance(self, IndexMixin)
+
+    def _match(self, value, target_value):
+        """
+        check if a query value matches a config value
+
+        Args:
+            value (any): query value
+            target_value (any): config value
+
+        Returns:
+            bool
+        """
+        if isinstance(target_value, EncryptedValue):
+            target_value = target_value.decrypt()
+
+        if isinstance(target_value, str):
+            # just a simple normalization
+            value = str(value).lower()
+            target_value = target_value.lower()
+        return value == target_value
+
+    def _match_index_entry(self, entry, query):
+        """
+        check if an index entry can match the given query
+
+        unindexed fields (secrets and nested values) are always considered a possible match
+
+        Args:
+            entry (dict): index entry
+            query (dict): a mapping between field and value fo search by
+
+        Returns:
+            bool
+        """
+        values = entry["values"]
+        for name, value in query.items():
+            if name in values and self._match(value, values[name]):
+                return True
+            if name in entry["unindexed"]:
+                return True
+        return False
+
     def find(self, cursor_=None, limit_=None, **query):
         """
         a generic find, which do a linear search over all items
 
+        if the store is indexed, the index is used to only get (and decrypt) the configs that can match
+
         if you want a better way, use a store which provides search
 
         Args:
@@ -276,37 +667,57 @@ class EncryptedConfigStore(ConfigStore, EncryptionMixin):
         if not limit_:
             limit_ = all_count
 
-        start_search = not bool(cursor_)
+        search_index = None
+        if self.indexed:
+            search_index = self.get_index(all_names)
+
+        if not cursor_:
+            start = 0
+        elif cursor_ in all_names:
+            start = all_names.index(cursor_)
+        else:
+            # nothing to search
+            start = all_count
+
         found = []
+        last_index = all_count - 1
 
-        for index in range(all_count):
-            instance_name = all_names[index]
-            if instance_name == cursor_:
-                start_search = True
+        # configs are read in batches, so backends can read them in less round trips
+        for batch_start in range(start, all_count, self.FIND_BATCH_SIZE):
+            batch_names = all_names[batch_start : batch_start + self.FIND_BATCH_SIZE]
 
-            if not start_search:
-                continue
+            candidates = []
+            for instance_name in batch_names:
+                if search_index is not None:
+                    entry = search_index.get(instance_name)
+                    if entry is not None and not self._match_index_entry(entry, query):
+                        continue
+                candidates.append(instance_name)
 
-            data = self.get(instance_name)
-            for name, value in query.items():
-                if name in data:
-                    data[KEY_FIELD_NAME] = instance_name
-                    target_value = data[name]
-                    if isinstance(target_value, str):
-                        # just a simple normalization
-                        value = str(value).lower()
-                        target_value = target_value.lower()
+            raw_data = dict(zip(candidates, self.read_many(candidates)))
 
-                    if value == target_value and data not in found:
-                        found.append(data)
+            for offset, instance_name in enumerate(batch_names):
+                if raw_data.get(instance_name) is None:
+                    continue
+
+                data = self._load_config(raw_data[instance_name])
+                for name, value in query.items():
+                    if name in data:
+                        data[KEY_FIELD_NAME] = instance_name
+                        if self._match(value, data[name]) and data not in found:
+                            found.append(data)
+
+                if len(found) >= limit_:
+                    last_index = batch_start + offset
+                    break
 
             if len(found) >= limit_:
                 break
 
-        if index == all_count - 1:
+        if last_index == all_count - 1:
             new_cursor = None
         else:
-            new_cursor = all_names[index + 1]
+            new_cursor = all_names[last_index + 1]
 
         # return the new cursor, total found and a generator
         return new_cursor, len(found), (config for config in found)
@@ -323,4 +734,28 @@ class EncryptedConfigStore(ConfigStore, EncryptionMixin):
             bool: written or not
         """
         new_config = self._process_config(config, EncryptionMode.Encrypt)
-        return self.write(instance_name, self.serializer.serialize(new_config))
+        data = self.serializer.serialize(new_config)
+        if not self.indexed:
+            return self.write(instance_name, data)
+
+        with self.index_lock():
+            written = self.write(instance_name, data)
+            self.update_index(instance_name, new_config, data)
+        return written
+
+    def save_many(self, configs):
+        """
+        save the config of many instances at once, using `write_many` of the backend
+
+        Args:
+            configs (dict): a mapping between instance name and config data
+        """
+        new_configs = {name: self._process_config(config, EncryptionMode.Encrypt) for name, config in configs.items()}
+        data = {name: self.serializer.serialize(config) for name, config in new_configs.items()}
+        if not self.indexed:
+            self.write_many(data)
+            return
+
+        with self.index_lock():
+            self.write_many(data)
+            self.update_index_many(new_configs, data)
@@ -1,18 +1,28 @@
+import contextlib
+import fcntl
 import os
 
-from . import ConfigNotFound, EncryptedConfigStore
+from . import ConfigNotFound, EncryptedConfigStore, IndexMixin, INDEX_NAME
 from .serializers import JsonSerializer
 
-from jumpscale.sals.fs import exists, make_path, read_file_binary, rmtree, write_file_binary
+from jumpscale.data.serializers import json
+from jumpscale.sals.fs import exists, read_file_binary, rmtree, write_file_binary
 
+# the index journal is compacted when it has more lines than `ratio * entries + min lines`
+INDEX_COMPACTION_RATIO = 2
+INDEX_COMPACTION_MIN_LINES = 100
 
-class FileSystemStore(EncryptedConfigStore):
+
+class FileSystemStore(IndexMixin, EncryptedConfigStore):
     """
     Filesystem store is an EncryptedConfigStore
 
     It saves the config relative to `config_env.get_store_config("filesystem")`
 
     To store every instance config in a different path, it uses the given `Location`.
+
+    It also keeps a secondary index for every location as an append-only journal at `<config root>/__index__`,
+    see `IndexMixin`.
     """
 
     def __init__(self, location):
@@ -80,16 +90,34 @@ class FileSystemStore(EncryptedConfigStore):
         """
         list all instance names (directories under config root)
 
+        instance names cannot start with "__", so the index, its lock and any left over temporary files are skipped
+
         Returns:
             list: instance/directory names
         """
         if not os.path.exists(self.config_root):
             return []
-        return os.listdir(self.config_root)
+        return [name for name in os.listdir(self.config_root) if not name.startswith("__")]
+
+    def _write_atomic(self, path, data):
+        """
+        write data to a temporary file first, then rename it, so readers never get a partially written file
+
+        Args:
+            path (str): path
+            data (bytes): data
+
+        Returns:
+            int: written bytes count
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        written = write_file_binary(tmp_path, data)
+        os.replace(tmp_path, path)
+        return written
 
     def write(self, instance_name, data):
         """
-        write config data to data file
+        write config data to data file (atomically)
 
         Args:
             instance_name (str): config
@@ -99,8 +127,8 @@ class FileSystemStore(EncryptedConfigStore):
             bool: written or not
         """
         path = self.get_path(instance_name)
-        make_path(path)
-        return write_file_binary(path, data.encode())
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return self._write_atomic(path, data.encode())
 
     def delete(self, instance_name):
         """
@@ -112,3 +140,159 @@ class FileSystemStore(EncryptedConfigStore):
         path = self.get_instance_root(instance_name)
         if os.path.exists(path):
             rmtree(path)
+        self.remove_from_index(instance_name)
+
+    @property
+    def index_path(self):
+        """
+        get the path of the index journal of current location
+
+        Returns:
+            str: path
+        """
+        return os.path.join(self.config_root, INDEX_NAME)
+
+    @property
+    def index_lock_path(self):
+        """
+        get the path of the lock file used by writers of current location
+
+        Returns:
+            str: path
+        """
+        return os.path.join(self.config_root, f"{INDEX_NAME}.lock")
+
+    @contextlib.contextmanager
+    def index_lock(self):
+        """
+        a context manager that takes an exclusive lock (between processes) of current location,
+        used to serialize data writes and index updates
+
+        nothing is locked if the location does not exist yet (or was deleted), as there's no index to update,
+        and creating it would make a deleted parent instance appear again
+        """
+        if not os.path.exists(self.config_root):
+            yield
+            return
+
+        with open(self.index_lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _replay_index(self):
+        """
+        replay the index journal
+
+        Returns:
+            tuple: index (or None if it does not exist) and the number of lines in the journal
+        """
+        if not exists(self.index_path):
+            return None, 0
+
+        index = {}
+        lines = read_file_binary(self.index_path).splitlines()
+        for line in lines:
+            try:
+                change = json.loads(line)
+            except ValueError:
+                continue
+
+            if isinstance(change, dict):
+                # the whole index written by an older version, entries have no stamps, so it will be updated
+                index.update(change)
+            elif len(change) == 2:
+                index[change[0]] = change[1]
+            elif len(change) == 1:
+                index.pop(change[0], None)
+        return index, len(lines)
+
+    def read_index(self):
+        """
+        read the index of current location, by replaying its journal
+
+        the journal has a JSON line for every change, `[name, entry]` to add or update an entry,
+        or `[name]` to remove it, invalid lines (e.g. partially written) are skipped, as their entries
+        would be considered stale anyway
+
+        the journal is compacted if it has too many lines compared to entries
+
+        Returns:
+            dict or NoneType: index or None if it does not exist
+        """
+        index, line_count = self._replay_index()
+        if index is not None and line_count > len(index) * INDEX_COMPACTION_RATIO + INDEX_COMPACTION_MIN_LINES:
+            with self.index_lock():
+                # replayed again, as it could be changed before the lock is acquired
+                index, _ = self._replay_index()
+                if index is not None:
+                    self.write_index(index)
+        return index
+
+    def write_index(self, index):
+        """
+        write the whole index of current location (compacted, one line per entry)
+
+        the journal is written to a temporary file first, then renamed, so readers never get a partial index
+
+        Args:
+            index (dict): index
+        """
+        os.makedirs(self.config_root, exist_ok=True)
+        lines = [json.dumps([name, entry]) for name, entry in index.items()]
+        self._write_atomic(self.index_path, "".join(f"{line}\n" for line in lines).encode())
+
+    def _append_index_changes(self, changes):
+        """
+        append changes to the index journal, nothing is done if the index does not exist (it will be rebuilt)
+
+        Args:
+            changes (list): a list of `[name, entry]` or `[name]` changes
+        """
+        if not changes or not exists(self.index_path):
+            return
+
+        with open(self.index_path, "ab") as f:
+            f.write("".join(f"{json.dumps(change)}\n" for change in changes).encode())
+
+    def write_index_entries(self, entries):
+        """
+        add or update index entries, only the changes are appended to the journal
+
+        Args:
+            entries (dict): a mapping between instance name and index entry
+        """
+        self._append_index_changes([[name, entry] for name, entry in entries.items()])
+
+    def delete_index_entries(self, instance_names):
+        """
+        remove index entries
+
+        Args:
+            instance_names (list): instance names
+        """
+        self._append_index_changes([[name] for name in instance_names])
+
+    def get_index_stamps(self, instance_names, data=None):
+        """
+        get version stamps of instances data, (inode, size, mtime) of data files, data files are always
+        replaced on write, so every write gets a new inode
+
+        Args:
+            instance_names (list): instance names
+            data (dict, optional): not used, stamps are taken from the files. Defaults to None.
+
+        Returns:
+            dict: a mapping between instance name and stamp (`None` if the data file is not found)
+        """
+        stamps = {}
+        for instance_name in instance_names:
+            try:
+                stat = os.stat(self.get_path(instance_name))
+            except FileNotFoundError:
+                stamps[instance_name] = None
+                continue
+            stamps[instance_name] = [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+        return stamps
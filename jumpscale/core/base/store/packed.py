@@ -0,0 +1,379 @@
+"""
+Packed store keeps all instance configs of a location in a single append-only log file.
+
+Every record in the log file is a header (operation, name length, data length), followed by the name and the data.
+A write appends a new record, and a delete appends a tombstone (a record with an empty data), so,
+the last record for an instance name always wins.
+
+An in-memory index of data offsets is built by scanning the log once, and is updated incrementally
+if the log grows (e.g. by another process). Reads are done through `mmap`, without opening a file per instance.
+
+When dead records (overwritten or deleted) take more than `COMPACTION_RATIO` of the log, it's compacted,
+by writing only live records to a new file and renaming it.
+
+Deleting an instance also removes the log files of its child locations (e.g. of its sub-factories).
+"""
+import contextlib
+import fcntl
+import mmap
+import os
+import struct
+
+from . import ConfigNotFound, EncryptedConfigStore
+from .serializers import JsonSerializer
+
+# record header: operation, name length and data length
+HEADER = struct.Struct("!BII")
+
+WRITE = 1
+DELETE = 2
+
+# compact the log if dead records take more than this ratio of its size
+COMPACTION_RATIO = 0.5
+# and the log is bigger than this size (in bytes)
+COMPACTION_MIN_SIZE = 64 * 1024
+
+
+class PackedStore(EncryptedConfigStore):
+    """
+    Packed store is an EncryptedConfigStore
+
+    It saves all instance configs of a location in a single log file at `config_env.get_store_config("packed")`
+    """
+
+    def __init__(self, location):
+        """
+        create a new `PackedStore` that stores config of the given location in a single log file under configured root.
+
+        Args:
+            location (Location): where config will be stored per instance
+        """
+        super().__init__(location, JsonSerializer())
+        self.root = self.config_env.get_store_config("packed")["path"]
+
+        # a mapping between instance name and (data offset, data length, record size)
+        self.offsets = {}
+        self.scanned_size = 0
+        self.dead_size = 0
+        self.file_id = None
+
+        self.__mmap = None
+        self.__mmap_size = 0
+
+    @property
+    def path(self):
+        """
+        get the path of the log file of current location
+
+        Returns:
+            str: path
+        """
+        return os.path.join(self.root, f"{self.location.name}.log")
+
+    @property
+    def lock_path(self):
+        """
+        get the path of the lock file used by writers, it's never replaced (unlike the log file)
+
+        Returns:
+            str: path
+        """
+        return f"{self.path}.lock"
+
+    @contextlib.contextmanager
+    def _lock(self):
+        """
+        acquire the exclusive lock of writers of current location
+        """
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _reset(self):
+        """
+        reset the in-memory index, so the log would be scanned from the start
+        """
+        self.offsets = {}
+        self.scanned_size = 0
+        self.dead_size = 0
+        self.file_id = None
+        self._close_mmap()
+
+    def _close_mmap(self):
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__mmap = None
+            self.__mmap_size = 0
+
+    def _get_mmap(self):
+        """
+        get a read-only memory map of the log file, covering at least the scanned part of it
+
+        Returns:
+            mmap.mmap or NoneType: the memory map or None if the log is empty
+        """
+        if self.__mmap is None or self.__mmap_size < self.scanned_size:
+            self._close_mmap()
+            if not self.scanned_size:
+                return
+
+            with open(self.path, "rb") as f:
+                self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.__mmap_size = len(self.__mmap)
+
+        return self.__mmap
+
+    def _refresh(self):
+        """
+        make sure the in-memory index covers the whole log file
+
+        the log is scanned from the start if it's replaced (compacted), or only the new records otherwise
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            return
+
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self.file_id or stat.st_size < self.scanned_size:
+            self._reset()
+            self.file_id = file_id
+
+        if stat.st_size > self.scanned_size:
+            self._scan(stat.st_size)
+
+    def _scan(self, size):
+        """
+        scan new records of the log file (from `scanned_size` to `size`) and update the in-memory index
+
+        a partially written record at the end of the log is ignored
+
+        Args:
+            size (int): current log file size
+        """
+        with open(self.path, "rb") as f:
+            f.seek(self.scanned_size)
+            buf = f.read(size - self.scanned_size)
+
+        start = self.scanned_size
+        pos = 0
+        while pos + HEADER.size <= len(buf):
+            operation, name_length, data_length = HEADER.unpack_from(buf, pos)
+            record_size = HEADER.size + name_length + data_length
+            if pos + record_size > len(buf):
+                break
+
+            name = buf[pos + HEADER.size : pos + HEADER.size + name_length].decode()
+            self._index_record(name, operation, start + pos + HEADER.size + name_length, data_length, record_size)
+            pos += record_size
+
+        self.scanned_size = start + pos
+
+    def _index_record(self, name, operation, data_offset, data_length, record_size):
+        """
+        update the in-memory index with a record
+
+        Args:
+            name (str): instance name
+            operation (int): `WRITE` or `DELETE`
+            data_offset (int): offset of the data in the log file
+            data_length (int): data length
+            record_size (int): the whole record size
+        """
+        if name in self.offsets:
+            self.dead_size += self.offsets.pop(name)[2]
+
+        if operation == WRITE:
+            self.offsets[name] = (data_offset, data_length, record_size)
+        else:
+            self.dead_size += record_size
+
+    def _write_all(self, fd, data):
+        """
+        write all data to a file descriptor, as `os.write` can write less than requested (e.g. if interrupted)
+
+        Args:
+            fd (int): file descriptor
+            data (bytes): data
+
+        Raises:
+            OSError: if nothing can be written (e.g. no space left on device)
+        """
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            if not written:
+                raise OSError(f"cannot write to the log file {self.path}")
+            view = view[written:]
+
+    def _append(self, records):
+        """
+        append records to the log file (with an exclusive lock)
+
+        the in-memory index is only updated after all records are written, if writing fails, the log is
+        truncated back, records are not fsync'ed (the same as other stores)
+
+        Args:
+            records (list): a list of (operation, name, data) tuples
+        """
+        with self._lock():
+            self._refresh()
+
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+            try:
+                # drop any partially written record at the end
+                if os.fstat(fd).st_size != self.scanned_size:
+                    os.ftruncate(fd, self.scanned_size)
+
+                chunks = []
+                for operation, name, data in records:
+                    name = name.encode()
+                    chunks.append(HEADER.pack(operation, len(name), len(data)) + name + data)
+
+                os.lseek(fd, self.scanned_size, os.SEEK_SET)
+                try:
+                    self._write_all(fd, b"".join(chunks))
+                except OSError:
+                    # drop the partially written records, so offsets always point to complete records
+                    os.ftruncate(fd, self.scanned_size)
+                    raise
+
+                offset = self.scanned_size
+                for (operation, name, data), chunk in zip(records, chunks):
+                    data_offset = offset + len(chunk) - len(data)
+                    self._index_record(name, operation, data_offset, len(data), len(chunk))
+                    offset += len(chunk)
+
+                self.scanned_size = offset
+                stat = os.fstat(fd)
+                self.file_id = (stat.st_dev, stat.st_ino)
+            finally:
+                os.close(fd)
+
+            if self.scanned_size >= COMPACTION_MIN_SIZE and self.dead_size > self.scanned_size * COMPACTION_RATIO:
+                self._compact()
+
+    def compact(self):
+        """
+        compact the log file, by only keeping the last record of every live instance
+
+        it's called automatically by writers when dead records take too much space
+        """
+        with self._lock():
+            self._refresh()
+            self._compact()
+
+    def _compact(self):
+        """
+        compact the log file, should be called with the lock acquired
+        """
+        names = self.list_all()
+        live = self.read_many(names)
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            for name, data in zip(names, live):
+                name = name.encode()
+                f.write(HEADER.pack(WRITE, len(name), len(data)) + name + data)
+        os.replace(tmp_path, self.path)
+
+        self._reset()
+        self._refresh()
+
+    def read(self, instance_name):
+        """
+        read config data of an instance from the log file
+
+        Args:
+            instance_name (str): name
+
+        Returns:
+            bytes: data
+        """
+        self._refresh()
+        if instance_name not in self.offsets:
+            raise ConfigNotFound(f"cannot find config for {instance_name} at {self.path}")
+
+        offset, length, _ = self.offsets[instance_name]
+        return self._get_mmap()[offset : offset + length]
+
+    def read_many(self, instance_names):
+        """
+        read config data of many instances
+
+        Args:
+            instance_names (list): instance names
+
+        Returns:
+            list: data of every instance (in the same order), or `None` if not found
+        """
+        self._refresh()
+        data_map = self._get_mmap()
+
+        data = []
+        for instance_name in instance_names:
+            if instance_name in self.offsets:
+                offset, length, _ = self.offsets[instance_name]
+                data.append(data_map[offset : offset + length])
+            else:
+                data.append(None)
+        return data
+
+    def list_all(self):
+        """
+        list all instance names
+
+        Returns:
+            list: instance names
+        """
+        self._refresh()
+        return list(self.offsets.keys())
+
+    def write(self, instance_name, data):
+        """
+        write config data of an instance (appends a new record)
+
+        Args:
+            instance_name (str): name
+            data (str): data
+
+        Returns:
+            bool: written or not
+        """
+        self._append([(WRITE, instance_name, data.encode())])
+        return True
+
+    def write_many(self, data):
+        """
+        write config data of many instances at once (appends all records with a single write)
+
+        Args:
+            data (dict): a mapping between instance name and its data
+        """
+        if data:
+            self._append(
+                [(WRITE, instance_name, instance_data.encode()) for instance_name, instance_data in data.items()]
+            )
+
+    def delete(self, instance_name):
+        """
+        delete instance config (appends a tombstone), and the log files of its child locations
+
+        Args:
+            instance_name (str): name
+        """
+        self._refresh()
+        if instance_name in self.offsets:
+            self._append([(DELETE, instance_name, b"")])
+
+        # child locations (and their children) are named after this location and the instance name
+        prefix = f"{self.location.name}.{instance_name}."
+        if os.path.isdir(self.root):
+            for filename in os.listdir(self.root):
+                if filename.startswith(prefix) and filename.endswith(".log"):
+                    os.remove(os.path.join(self.root, filename))
@@ -1,14 +1,31 @@
 import redis
 
-from . import ConfigNotFound, EncryptedConfigStore
+from . import ConfigNotFound, EncryptedConfigStore, IndexMixin, INDEX_NAME
 from .serializers import JsonSerializer
 
+from jumpscale.data.serializers import json
 
-class RedisStore(EncryptedConfigStore):
+# the name used to keep a set of all instance names of a location
+NAMES_SET_NAME = "__names__"
+
+# the name used to keep a hash of instance names and version stamps (incremented on every write)
+STAMPS_NAME = "__stamps__"
+
+# how many keys to be returned by every SCAN call
+SCAN_COUNT = 1000
+
+
+class RedisStore(IndexMixin, EncryptedConfigStore):
     """
     RedisStore store is an EncryptedConfigStore
 
     It saves the data in redis and configuration for redis comes from `config_env.get_store_config("redis")`
+
+    It also keeps a secondary index for every location as a hash at `<location name>.__index__`, see `IndexMixin`,
+    and a set of all instance names at `<location name>.__names__`, so listing them does not need a full scan.
+
+    Every write increments a version stamp of the instance in a hash at `<location name>.__stamps__`,
+    used to validate index entries without reading the data.
     """
 
     def __init__(self, location):
@@ -38,6 +55,26 @@ class RedisStore(EncryptedConfigStore):
         """
         return ".".join([self.location.name, instance_name])
 
+    @property
+    def names_key(self):
+        """
+        get the key of the set of instance names of current location
+
+        Returns:
+            str: key
+        """
+        return self.get_key(NAMES_SET_NAME)
+
+    @property
+    def stamps_key(self):
+        """
+        get the key of the hash of version stamps of current location
+
+        Returns:
+            str: key
+        """
+        return self.get_key(STAMPS_NAME)
+
     def read(self, instance_name):
         """
         read instance config from redis
@@ -49,27 +86,33 @@ class RedisStore(EncryptedConfigStore):
             str: data
         """
         key = self.get_key(instance_name)
-        if not self.redis_client.exists(key):
+        data = self.redis_client.get(key)
+        if data is None:
             raise ConfigNotFound(f"cannot find config for {instance_name} at {key}")
-        return self.redis_client.get(key)
+        return data
 
-    def _full_scan(self, pattern):
+    def read_many(self, instance_names):
         """
-        get the full result of a scan command on current redis database by this pattern
+        read config of many instances with a single MGET
 
         Args:
-            pattern ([type]): [description]
+            instance_names (list): instance names
+
+        Returns:
+            list: data of every instance (in the same order), or `None` if not found
         """
-        keys = []
-        cursor, values = self.redis_client.scan(0, pattern)
+        if not instance_names:
+            return []
+        return self.redis_client.mget([self.get_key(instance_name) for instance_name in instance_names])
 
-        while values:
-            keys += values
-            if not cursor:
-                break
-            cursor, values = self.redis_client.scan(cursor, pattern)
+    def _full_scan(self, pattern):
+        """
+        get the full result of a scan command on current redis database by this pattern
 
-        return keys
+        Args:
+            pattern (str): keys pattern
+        """
+        return list(self.redis_client.scan_iter(match=pattern, count=SCAN_COUNT))
 
     def get_location_keys(self):
         """
@@ -80,12 +123,12 @@ class RedisStore(EncryptedConfigStore):
         """
         return self._full_scan(f"{self.location.name}.*")
 
-    def list_all(self):
+    def scan_names(self):
         """
-        get all names of instances (instance keys)
+        get all names of instances by scanning location keys
 
         Returns:
-            [type]: [description]
+            list: instance names
         """
         names = []
 
@@ -94,13 +137,31 @@ class RedisStore(EncryptedConfigStore):
             # remove location name part
             name = key.decode().replace(self.location.name, "").lstrip(".")
             # if it does not contain a ".", then it's not a child
-            if "." not in name:
+            # also, instance names cannot start with "__" (e.g. names set or the index)
+            if "." not in name and not name.startswith("__"):
                 names.append(name)
         return names
 
+    def list_all(self):
+        """
+        get all names of instances (from the names set)
+
+        if the names set does not exist (e.g. written by an older version), location keys are scanned and
+        the set is created
+
+        Returns:
+            list: instance names (sorted)
+        """
+        names = [name.decode() for name in self.redis_client.smembers(self.names_key)]
+        if not names:
+            names = self.scan_names()
+            if names:
+                self.redis_client.sadd(self.names_key, *names)
+        return sorted(names)
+
     def write(self, instance_name, data):
         """
-        set data with the corresponding key for this instance
+        set data with the corresponding key for this instance, and add it to the names set
 
         Args:
             instance_name (str): name
@@ -109,7 +170,46 @@ class RedisStore(EncryptedConfigStore):
         Returns:
             bool: written or not
         """
-        return self.redis_client.set(self.get_key(instance_name), data)
+        pipeline = self.redis_client.pipeline()
+        pipeline.exists(self.names_key)
+        pipeline.set(self.get_key(instance_name), data)
+        pipeline.sadd(self.names_key, instance_name)
+        pipeline.hincrby(self.stamps_key, instance_name, 1)
+        names_existed, written, _, _ = pipeline.execute()
+        self._init_names(names_existed)
+        return written
+
+    def _init_names(self, names_existed):
+        """
+        make sure the names set is initialized with all current instances, after writing to it
+
+        Args:
+            names_existed (bool): whether the names set existed before writing
+        """
+        if not names_existed:
+            # created by this write (e.g. written by an older version), add other instances too
+            names = self.scan_names()
+            if names:
+                self.redis_client.sadd(self.names_key, *names)
+
+    def write_many(self, data):
+        """
+        write data of many instances in a single transaction (MULTI/EXEC)
+
+        Args:
+            data (dict): a mapping between instance name and its data
+        """
+        if not data:
+            return
+
+        pipeline = self.redis_client.pipeline(transaction=True)
+        pipeline.exists(self.names_key)
+        for instance_name, instance_data in data.items():
+            pipeline.set(self.get_key(instance_name), instance_data)
+            pipeline.hincrby(self.stamps_key, instance_name, 1)
+        pipeline.sadd(self.names_key, *data.keys())
+        names_existed = pipeline.execute()[0]
+        self._init_names(names_existed)
 
     def delete(self, instance_name):
         """
@@ -121,4 +221,87 @@ class RedisStore(EncryptedConfigStore):
         Returns:
             bool
         """
-        return self.redis_client.delete(self.get_key(instance_name))
+        pipeline = self.redis_client.pipeline()
+        pipeline.delete(self.get_key(instance_name))
+        pipeline.srem(self.names_key, instance_name)
+        pipeline.hdel(self.index_key, instance_name)
+        pipeline.hdel(self.stamps_key, instance_name)
+        deleted, _, _, _ = pipeline.execute()
+        return deleted
+
+    @property
+    def index_key(self):
+        """
+        get the key of the index hash of current location
+
+        Returns:
+            str: key
+        """
+        return self.get_key(INDEX_NAME)
+
+    def read_index(self):
+        """
+        read the index of current location
+
+        Returns:
+            dict or NoneType: index or None if it does not exist
+        """
+        entries = self.redis_client.hgetall(self.index_key)
+        if not entries:
+            return
+        return {name.decode(): json.loads(entry) for name, entry in entries.items()}
+
+    def write_index(self, index):
+        """
+        write the index of current location, the old index is replaced in one transaction
+
+        Args:
+            index (dict): index
+        """
+        pipeline = self.redis_client.pipeline()
+        pipeline.delete(self.index_key)
+        for name, entry in index.items():
+            pipeline.hset(self.index_key, name, json.dumps(entry))
+        pipeline.execute()
+
+    def write_index_entries(self, entries):
+        """
+        add or update index entries
+
+        Args:
+            entries (dict): a mapping between instance name and index entry
+        """
+        if not self.redis_client.exists(self.index_key):
+            # missing, will be fully rebuilt when needed
+            return
+
+        pipeline = self.redis_client.pipeline()
+        for instance_name, entry in entries.items():
+            pipeline.hset(self.index_key, instance_name, json.dumps(entry))
+        pipeline.execute()
+
+    def delete_index_entries(self, instance_names):
+        """
+        remove index entries
+
+        Args:
+            instance_names (list): instance names
+        """
+        if instance_names:
+            self.redis_client.hdel(self.index_key, *instance_names)
+
+    def get_index_stamps(self, instance_names, data=None):
+        """
+        get version stamps of instances, they are incremented on every write, so data is not read
+
+        Args:
+            instance_names (list): instance names
+            data (dict, optional): not used, stamps are always read. Defaults to None.
+
+        Returns:
+            dict: a mapping between instance name and stamp (`None` if not found)
+        """
+        if not instance_names:
+            return {}
+        stamps = self.redis_client.hmget(self.stamps_key, instance_names)
+        return {name: int(stamp) if stamp is not None else None for name, stamp in zip(instance_names, stamps)}
@@ -1,3 +1,6 @@
+import threading
+from contextlib import contextmanager
+
 from whoosh import fields
 from whoosh.index import create_in, exists_in, open_dir
 from whoosh.qparser import FuzzyTermPlugin, GtLtPlugin, MultifieldParser, PhrasePlugin
@@ -39,12 +42,44 @@ ENUM_FIELD = "Enum"
 # they are handled when reading/writing the data
 SECRET_FIELD = "Secret"
 
+# a process-wide registry of compiled schemas and open indexes, keyed by location name
+# so, creating many stores for the same location (e.g. nested factories) does not rebuild/reopen them
+_schemas = {}
+_indexes = {}
+_registry_lock = threading.RLock()
+
+
+def clear_registry():
+    """
+    close and forget all open indexes and compiled schemas, they will be opened again when needed
+
+    should be used if index directories are removed or changed outside the store
+    """
+    with _registry_lock:
+        for index in _indexes.values():
+            index.close()
+        _indexes.clear()
+        _schemas.clear()
+
 
 class WhooshStore(EncryptedConfigStore):
     """
     whoosh store is an EncryptedConfigStore
 
     It saves and indexes the data in a whoosh index
+
+    Every write/delete is committed on its own, to ingest a lot of documents, use `bulk()`:
+
+    ```python
+    with store.bulk():
+        for name, config in configs.items():
+            store.save(name, config)
+    ```
+
+    An open searcher is kept, and is only refreshed when the index changes (after commits).
+
+    Schemas and indexes are shared by all stores of the same location in this process, when the schema of
+    an existing index changes (e.g. a field is added or its type is changed), all documents are re-indexed.
     """
 
     def __init__(self, location):
@@ -59,19 +94,20 @@ class WhooshStore(EncryptedConfigStore):
         super().__init__(location, Serializer())
         config = self.config_env.get_store_config("whoosh")
         self.base_index_path = config["path"]
+        self.__index_path = join_paths(self.base_index_path, self.location.name)
 
-        self.schema = self.get_schema()
-        self.index = self.get_index(self.schema)
+        self.schema, self.index = self.get_schema_and_index()
 
         self.default_plugins = [FuzzyTermPlugin(), GtLtPlugin(), PhrasePlugin()]
         self.default_pagenum = 1
         self.default_pagelen = 20
 
+        self.searcher = None
+        self.bulk_writer = None
+
     @property
     def index_path(self):
-        path = join_paths(self.base_index_path, self.location.name)
-        mkdirs(path)
-        return path
+        return self.__index_path
 
     @property
     def type_fields(self):
@@ -100,10 +136,93 @@ class WhooshStore(EncryptedConfigStore):
 
         return fields.Schema(**schema_fields)
 
+    def get_schema_and_index(self):
+        """
+        get the compiled schema and the open index of current location from the registry,
+        or compile/open them if not registered yet
+
+        Returns:
+            tuple: (whoosh.fields.Schema, whoosh.index.Index)
+        """
+        location_name = self.location.name
+
+        with _registry_lock:
+            # the type is checked too, as it can be re-defined (e.g. re-imported)
+            cached = _schemas.get(location_name)
+            if cached and cached[0] is self.location.type:
+                schema = cached[1]
+            else:
+                schema = self.get_schema()
+                _schemas[location_name] = (self.location.type, schema)
+
+            index = _indexes.get(self.index_path)
+            if not index or index.schema != schema:
+                if index:
+                    index.close()
+                index = self.get_index(schema)
+                _indexes[self.index_path] = index
+
+            return schema, index
+
     def get_index(self, schema):
-        if exists_in(self.index_path):
-            return open_dir(self.index_path, schema=schema)
-        return create_in(self.index_path, schema=schema)
+        """
+        open or create the index of current location with the given schema
+
+        if the index exists with a different schema, it's re-indexed with the new one
+
+        Args:
+            schema (whoosh.fields.Schema): schema
+
+        Returns:
+            whoosh.index.Index: index
+        """
+        mkdirs(self.index_path)
+        if not exists_in(self.index_path):
+            return create_in(self.index_path, schema=schema)
+
+        index = open_dir(self.index_path)
+        if index.schema == schema:
+            return index
+        return self.reindex(index, schema)
+
+    def reindex(self, old_index, schema):
+        """
+        re-create the index with a new schema, and add all stored documents of the old index to it
+
+        values of removed fields are dropped, and values that cannot be indexed with a changed field type
+        are dropped too
+
+        Args:
+            old_index (whoosh.index.Index): old index
+            schema (whoosh.fields.Schema): new schema
+
+        Returns:
+            whoosh.index.Index: the new index
+        """
+        old_schema = old_index.schema
+        with old_index.reader() as reader:
+            docs = [doc for _, doc in reader.iter_docs()]
+        old_index.close()
+
+        changed_fields = {name for name in schema.names() if name in old_schema and old_schema[name] != schema[name]}
+
+        def can_index(name, value):
+            if name not in changed_fields:
+                return True
+            try:
+                list(schema[name].index(value))
+            except (TypeError, ValueError):
+                return False
+            return True
+
+        index = create_in(self.index_path, schema=schema)
+        writer = index.writer()
+        for doc in docs:
+            writer.add_document(
+                **{name: value for name, value in doc.items() if name in schema and can_index(name, value)}
+            )
+        writer.commit()
+        return index
 
     def get_reader(self):
         return self.index.reader()
@@ -112,35 +231,100 @@ class WhooshStore(EncryptedConfigStore):
         return AsyncWriter(self.index)
 
     def get_searcher(self, up_to_date=True):
-        searcher = self.index.searcher()
+        """
+        get the open searcher of this store, it's created once and only refreshed if the index has changed
 
-        if up_to_date and not searcher.up_to_date():
-            searcher = searcher.refresh()
+        the returned searcher should not be closed, as it's reused
 
-        return searcher
+        Args:
+            up_to_date (bool, optional): refresh the searcher if the index has changed. Defaults to True.
+
+        Returns:
+            whoosh.searching.Searcher: searcher
+        """
+        if not self.searcher:
+            self.searcher = self.index.searcher()
+        elif up_to_date:
+            # refresh only re-opens new segments, or returns the same searcher if nothing changed
+            self.searcher = self.searcher.refresh()
+
+        return self.searcher
+
+    @contextmanager
+    def bulk(self, merge=False, optimize=False, **writer_kwargs):
+        """
+        a context to write/delete many documents using a single writer, which is committed once when it's done
+
+        if an exception is raised inside the context, all changes are cancelled
+
+        nested calls will use the same writer
+
+        Args:
+            merge (bool, optional): merge small segments on commit, can be deferred using `optimize()` later.
+                Defaults to False.
+            optimize (bool, optional): merge all segments into one on commit. Defaults to False.
+            writer_kwargs: any keyword arguments passed to the index writer (e.g. `limitmb` or `procs`)
+
+        Yields:
+            whoosh.writing.IndexWriter: the writer
+        """
+        if self.bulk_writer:
+            yield self.bulk_writer
+            return
+
+        self.bulk_writer = self.index.writer(**writer_kwargs)
+        try:
+            yield self.bulk_writer
+        except BaseException:
+            self.bulk_writer.cancel()
+            raise
+        else:
+            self.bulk_writer.commit(merge=merge, optimize=optimize)
+        finally:
+            self.bulk_writer = None
+
+    def optimize(self):
+        """
+        merge all index segments into one, useful after bulk writes without merging
+        """
+        self.index.optimize()
+
+    def _write_document(self, operation, *args, **kwargs):
+        """
+        do a write operation using the bulk writer if any, or a new writer (which is committed directly)
+
+        Args:
+            operation (str): writer method name, e.g. `update_document`
+        """
+        if self.bulk_writer:
+            getattr(self.bulk_writer, operation)(*args, **kwargs)
+            return
+
+        writer = self.get_writer()
+        getattr(writer, operation)(*args, **kwargs)
+        writer.commit()
 
     def read(self, instance_name):
-        with self.get_searcher() as searcher:
-            kw = {KEY_FIELD_NAME: instance_name}
-            doc = searcher.document(**kw)
+        kw = {KEY_FIELD_NAME: instance_name}
+        doc = self.get_searcher().document(**kw)
 
-            if not doc:
-                raise ConfigNotFound(f"cannot find config for {instance_name} in the index")
+        if not doc:
+            raise ConfigNotFound(f"cannot find config for {instance_name} in the index")
 
-            for name, field in self.type_fields:
-                # whoosh does not store None values, so, we just set them
-                # if they are not set, that means when they're added, they'd the value of None
-                if name not in doc and field.stored:
-                    doc[name] = None
+        for name, field in self.type_fields:
+            # whoosh does not store None values, so, we just set them
+            # if they are not set, that means when they're added, they'd the value of None
+            if name not in doc and field.stored:
+                doc[name] = None
 
-                # add __ to field name by hand
-                # as we cannot add a field that starts with "__" in whoosh schema
-                if field.__class__.__name__ == SECRET_FIELD:
-                    name_with_prefix = f"__{name}"
-                    doc[name_with_prefix] = doc[name]
-                    doc.pop(name)
+            # add __ to field name by hand
+            # as we cannot add a field that starts with "__" in whoosh schema
+            if field.__class__.__name__ == SECRET_FIELD:
+                name_with_prefix = f"__{name}"
+                doc[name_with_prefix] = doc[name]
+                doc.pop(name)
 
-            return doc
+        return doc
 
     def write(self, instance_name, data):
         data[KEY_FIELD_NAME] = instance_name
@@ -154,14 +338,22 @@ class WhooshStore(EncryptedConfigStore):
                     data[name] = data[name_with_prefix]
                     data.pop(name_with_prefix)
 
-        writer = self.get_writer()
-        writer.update_document(**data)
-        writer.commit()
+        self._write_document("update_document", **data)
+
+    def write_many(self, data):
+        """
+        write documents of many instances, with a single commit
+
+        Args:
+            data (dict): a mapping between instance name and its data
+        """
+        with self.bulk():
+            for instance_name, instance_data in data.items():
+                self.write(instance_name, instance_data)
 
     def list_all(self):
-        with self.get_reader() as reader:
-            for _, doc in reader.iter_docs():
-                yield doc[KEY_FIELD_NAME]
+        reader = self.get_searcher().reader()
+        return [doc[KEY_FIELD_NAME] for _, doc in reader.iter_docs()]
 
     def find(self, cursor_=None, limit_=None, **queries):
         fields = queries.keys()
@@ -188,9 +380,9 @@ class WhooshStore(EncryptedConfigStore):
         if result.total >= limit_:
             result = result[:limit_]
 
-        return new_cursor, len(result), (hit for hit in result)
+        # get the stored fields now, as the searcher can be refreshed before results are consumed
+        hits = [hit.fields() for hit in result]
+        return new_cursor, len(hits), (hit for hit in hits)
 
     def delete(self, instance_name):
-        writer = self.get_writer()
-        writer.delete_by_term(KEY_FIELD_NAME, instance_name)
-        writer.commit()
+        self._write_document("delete_by_term", KEY_FIELD_NAME, instance_name)
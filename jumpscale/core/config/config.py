@@ -48,6 +48,12 @@ JS-NG> j.core.config.get_config()
 {'debug': True, 'ssh_key_path': '', 'log_to_redis': False, 'log_to_files': True, 'log_level': 15, 'private_key_path': '/home/ahmed/.config/jumpscale/mykey.priv', 'secure_config_path': '/home/ahmed/.config/jumpscale/secureconfig', 'store': 'filesystem', 'favcolor': 'blue', 'logging': {'handlers': [{'sink': 'sys.stdout', 'format': '{time} - {message}', 'colorize': True, 'enqueue': True}, {'sink': '/home/ahmed/.config/jumpscale/logs/file_jumpscale.log', 'serialize': True, 'enqueue': True}], 'redis': {'enabled': True, 'level': 15, 'max_size': 1000, 'dump': True, 'dump_dir': '/home/ahmed/.config/jumpscale/logs/redis'}, 'filesystem': {'enabled': True, 'level': 15, 'log_dir': '/home/ahmed/.config/jumpscale/logs/fs/log.txt', 'rotation': '5 MB'}}, 'stores': {'redis': {'hostname': 'localhost', 'port': 6379}, 'filesystem': {'path': '/home/ahmed/.config/jumpscale/secureconfig'}}, 'alerts': {'enabled': True, 'level': 40}, 'threebot': {'default': ''}, 'explorer': {'default_url': 'https://explorer.testnet.grid.tf/explorer'}}
 ```
 
+## Caching
+
+The parsed configuration is cached per process, and only read again when `config.toml` changes
+(its inode, size or modification time), `get_config` and `get` return copies, so the cache can not be changed
+by mistake, while `set` and `update_config` write the file and replace the cached configuration.
+
 ## Get/Set
 you can use `j.core.config.get` and `j.core.config.set` to retrive values of keys or set the value of a key respectively.
 
@@ -63,7 +69,9 @@ JS-NG> j.core.config.get("favcolor")
 ```
 """
 
+import copy
 import os
+import threading
 
 import nacl.utils
 import nacl.encoding
@@ -89,6 +97,7 @@ __all__ = [
     "set",
     "set_default",
     "get_current_version",
+    "clear_cache",
 ]
 
 
@@ -121,6 +130,11 @@ def get_default_config():
                 "max_size": 1000,
                 "dump": True,
                 "dump_dir": os.path.join(config_root, "logs/redis"),
+                "queued": False,
+                "queue_size": 10000,
+                "batch_size": 500,
+                "flush_interval": 0.5,
+                "drop_policy": "drop_old",
             },
             "filesystem": {
                 "enabled": True,
@@ -129,28 +143,62 @@ def get_default_config():
                 "rotation": "5 MB",
             },
         },
-        "alerts": {"enabled": True, "level": 40},
+        "alerts": {"enabled": True, "level": 40, "coalesce_window": 0},
         "ssh_key_path": "",
         "private_key_path": "",
         "stores": {
             "redis": {"hostname": "localhost", "port": 6379},
             "filesystem": {"path": os.path.expanduser(os.path.join(config_root, "secureconfig"))},
+            "packed": {"path": os.path.expanduser(os.path.join(config_root, "packedconfig"))},
             "whoosh": {"path": os.path.expanduser(os.path.join(config_root, "whoosh_indexes"))},
         },
-        "factory": {"always_reload": False},
+        "factory": {"always_reload": False, "lazy_decrypt": False},
         "store": "filesystem",
         "threebot": {"default": ""},
     }
 
 
+# parsed config, and the (inode, size, mtime) of the file it was read from
+_cache = {"key": None, "config": None}
+_cache_lock = threading.Lock()
+
+
+def _get_file_key():
+    stat = os.stat(config_path)
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _get_cached_config():
+    """Gets the cached config, it's parsed again only if the file has changed
+
+    the returned dict is shared, and must not be modified
+
+    Returns:
+        dict: config
+    """
+    key = _get_file_key()
+    with _cache_lock:
+        if _cache["key"] != key:
+            with open(config_path, "r") as f:
+                _cache["config"] = toml.load(f)
+            _cache["key"] = key
+        return _cache["config"]
+
+
+def clear_cache():
+    """Clears the cached config, so it's parsed again on next access"""
+    with _cache_lock:
+        _cache["key"] = None
+        _cache["config"] = None
+
+
 def get_config():
     """Gets jumpscale configurations
 
     Returns:
         [dict] - toml loaded config of CONFIG_DIR/config.toml
     """
-    with open(config_path, "r") as f:
-        return toml.load(f)
+    return copy.deepcopy(_get_cached_config())
 
 
 def update_config(data):
@@ -159,8 +207,12 @@ def update_config(data):
     Arguments:
         data {dict} -- dict to update the config with.
     """
-    with open(config_path, "w") as f:
-        toml.dump(data, f)
+    with _cache_lock:
+        with open(config_path, "w") as f:
+            toml.dump(data, f)
+        # a copy, so later changes to data are not cached without being written
+        _cache["config"] = copy.deepcopy(data)
+        _cache["key"] = _get_file_key()
 
 
 def get(key, default=None):
@@ -170,8 +222,8 @@ def get(key, default=None):
         key (str): the key you wish to retrieve
         default (object): return value if key doesn't exist in configurations
     """
-    conf = get_config()
-    return conf.get(key, default)
+    conf = _get_cached_config()
+    return copy.deepcopy(conf.get(key, default))
 
 
 def set(key, val):
@@ -196,9 +248,9 @@ def set_default(key, val):
     Returns:
         val (str): returned if key doesn't exist in configuration or the value of key in configurations
     """
-    conf = get_config()
+    conf = _get_cached_config()
     if key in conf:
-        return conf[key]
+        return copy.deepcopy(conf[key])
     else:
         set(key, val)
         return val
@@ -245,15 +297,29 @@ class StoreTypeNotFound(Exception):
     pass
 
 
+# private key path: ((inode, size, mtime) of the file, its content)
+_private_keys = {}
+
+
+def _read_private_key(path):
+    stat = os.stat(path)
+    key = stat.st_ino, stat.st_size, stat.st_mtime_ns
+    cached = _private_keys.get(path)
+    if not cached or cached[0] != key:
+        with open(path, "rb") as f:
+            cached = _private_keys[path] = (key, f.read())
+    return cached[1]
+
+
 class Environment:
     def get_private_key_path(self):
-        config = get_config()
+        config = _get_cached_config()
         private_key_path = config["private_key_path"]
         return private_key_path
 
     def get_threebot_data(self):
-        config = get_config()
-        return config.get("threebot", {})
+        config = _get_cached_config()
+        return copy.deepcopy(config.get("threebot", {}))
 
     def get_private_key(self):
         private_key_path = self.get_private_key_path()
@@ -263,17 +329,20 @@ class Environment:
             config = get_config()
             config["private_key_path"] = private_key_path
             update_config(config)
-        return open(private_key_path, "rb").read()
+        return _read_private_key(private_key_path)
 
     def get_store_config(self, name):
-        config = get_config()
+        config = _get_cached_config()
         stores = config["stores"]
         if name not in stores:
             raise StoreTypeNotFound(f"'{name}' store is not found")
-        return stores[name]
+        return copy.deepcopy(stores[name])
 
     def get_logging_config(self):
-        return get_config()["logging"]
+        return copy.deepcopy(_get_cached_config()["logging"])
+
+    def get_factory_config(self):
+        return copy.deepcopy(_get_cached_config().get("factory", {}))
 
 
 migrate_config()
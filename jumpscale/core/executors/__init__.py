@@ -1,3 +1,5 @@
 from .local import execute as run_local
-from .remote import execute as run_remote, RemoteExecutor
+from .remote import execute as run_remote, execute_many as run_remote_many, RemoteExecutor
+from .group import GroupExecutor, execute_group as run_group
+from . import pool
 from .tmux import execute_in_window as run_tmux
@@ -0,0 +1,169 @@
+"""
+Group executor runs the same command on many machines at once, and yields results as machines finish.
+
+Hosts can be given as sshclient instance names, connection contexts (the same as `RemoteExecutor`),
+or executor objects (anything with a `run(cmd, **command_ctx)` method returning (rc, stdout, stderr)).
+
+```python
+JS-NG> group = j.core.executors.GroupExecutor(["node1", {"host": "10.0.0.2", "user": "root"}], workers=20, timeout=30, connect_timeout=10)
+JS-NG> for host, rc, stdout, stderr in group.run("uptime"):
+           print(host, rc, stdout)
+node1 0  11:28:30 up 2 days, ...
+10.0.0.2 0  11:28:31 up 9 days, ...
+```
+
+Commands are executed with `warn=True` and `hide=True` by default, so a failing command or a failing host
+does not stop the others:
+
+- a command that exits with non-zero code is reported with its return code.
+- a command that times out is reported with `TIMEOUT_RC`.
+- a host that fails (e.g. connection refused) is reported with `ERROR_RC` and the error in stderr.
+
+Workers are threads by default, or greenlets (`mode="gevent"`) when running inside a monkey patched process
+(e.g. the threebot server).
+"""
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from invoke.exceptions import CommandTimedOut
+
+from .remote import RemoteExecutor
+
+# default max number of hosts running a command at the same time
+WORKERS = 10
+# return code of commands which timed out
+TIMEOUT_RC = 124
+# return code of hosts which failed (e.g. could not connect)
+ERROR_RC = -1
+
+HostResult = namedtuple("HostResult", ["host", "rc", "stdout", "stderr"])
+
+
+def _get_executor(host, connect_timeout=None):
+    """
+    get a (name, executor) of a host
+
+    Args:
+        host (str or dict or object): sshclient instance name, connection context or an executor
+        connect_timeout (int): connection timeout for connection contexts without one
+
+    Returns:
+        tuple: name, executor
+    """
+    if isinstance(host, str):
+        from jumpscale.loader import j
+
+        return host, j.clients.sshclient.get(host).sshclient
+    if isinstance(host, dict):
+        name = host["host"]
+        if host.get("port"):
+            name = f"{name}:{host['port']}"
+        if connect_timeout and not host.get("connect_timeout"):
+            host = dict(host, connect_timeout=connect_timeout)
+        return name, RemoteExecutor(**host)
+    return getattr(host, "name", None) or getattr(host, "host", None) or repr(host), host
+
+
+class GroupExecutor:
+    def __init__(self, hosts, workers=WORKERS, timeout=None, mode="threads", connect_timeout=None):
+        """
+        Args:
+            hosts (list): sshclient instance names, connection contexts (dict) or executor objects
+            workers (int): max number of hosts running a command at the same time
+            timeout (int): default per-host command timeout in seconds, None for no timeout
+            mode (str): "threads" or "gevent"
+            connect_timeout (int): connection timeout in seconds for connection contexts without one
+        """
+        if mode not in ("threads", "gevent"):
+            raise ValueError(f"mode must be one of 'threads' or 'gevent', not '{mode}'")
+
+        self.hosts = list(hosts)
+        self.workers = workers
+        self.timeout = timeout
+        self.mode = mode
+        self.connect_timeout = connect_timeout
+        self._executors = None
+
+    @property
+    def executors(self):
+        """list of (name, executor) of all hosts"""
+        if self._executors is None:
+            self._executors = [_get_executor(host, self.connect_timeout) for host in self.hosts]
+        return self._executors
+
+    def _run_on(self, name, executor, cmd, command_ctx):
+        try:
+            rc, stdout, stderr = executor.run(cmd, **command_ctx)
+        except CommandTimedOut as e:
+            return HostResult(name, TIMEOUT_RC, e.result.stdout, e.result.stderr)
+        except Exception as e:
+            return HostResult(name, ERROR_RC, "", f"{type(e).__name__}: {e}")
+        return HostResult(name, rc, stdout, stderr)
+
+    def run(self, cmd, timeout=None, **command_ctx):
+        """
+        run a command on all hosts concurrently
+
+        Args:
+            cmd (str or list): command as a string or an argument list, e.g. `"ls -la"` or `["ls", "la"]`
+            timeout (int): per-host command timeout in seconds, defaults to the group timeout
+            command_ctx (dict): command runner context (the same as `RemoteExecutor.run`)
+
+        Yields:
+            HostResult: (host, rc, stdout, stderr) of every host, as hosts finish
+        """
+        command_ctx.setdefault("warn", True)
+        command_ctx.setdefault("hide", True)
+        timeout = timeout or self.timeout
+        if timeout:
+            command_ctx["timeout"] = timeout
+
+        executors = self.executors
+        if not executors:
+            return
+
+        workers = min(len(executors), self.workers)
+        if self.mode == "gevent":
+            from gevent.pool import Pool
+
+            yield from Pool(workers).imap_unordered(lambda host: self._run_on(*host, cmd, command_ctx), executors)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._run_on, name, executor, cmd, command_ctx) for name, executor in executors]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def run_all(self, cmd, timeout=None, **command_ctx):
+        """
+        run a command on all hosts concurrently, and wait for all of them
+
+        Args:
+            cmd (str or list): command as a string or an argument list
+            timeout (int): per-host command timeout in seconds, defaults to the group timeout
+            command_ctx (dict): command runner context (the same as `RemoteExecutor.run`)
+
+        Returns:
+            dict: host name to HostResult
+        """
+        return {result.host: result for result in self.run(cmd, timeout=timeout, **command_ctx)}
+
+
+def execute_group(hosts, cmd, workers=WORKERS, timeout=None, connect_timeout=None, **command_ctx):
+    """
+    run a command on many hosts concurrently
+
+    Args:
+        hosts (list): sshclient instance names, connection contexts (dict) or executor objects
+        cmd (str or list): command as a string or an argument list
+        workers (int): max number of hosts running a command at the same time
+        timeout (int): per-host command timeout in seconds
+        connect_timeout (int): connection timeout in seconds for connection contexts without one
+        command_ctx (dict): command runner context (the same as `RemoteExecutor.run`)
+
+    Yields:
+        HostResult: (host, rc, stdout, stderr) of every host, as hosts finish
+    """
+    return GroupExecutor(hosts, workers=workers, timeout=timeout, connect_timeout=connect_timeout).run(
+        cmd, **command_ctx
+    )
@@ -0,0 +1,259 @@
+"""
+A pool of persistent ssh connections, shared by remote executors.
+
+Connections are keyed by their context (host, user, port, keys and other connection options),
+so executors with the same context share one connection (and one ssh transport), which saves a handshake
+and a key exchange per command. Commands run on a shared connection open their own channels over
+the same transport, so they can run concurrently.
+
+- keepalive packets are sent every `keepalive` seconds, so idle connections are not dropped by the network.
+- a connection which is not used for more than `max_idle` seconds is closed, connections in use
+  (e.g. running a command) are never closed as idle.
+- a connection which is not used for more than `health_check_interval` seconds is checked before being returned,
+  and re-opened if it's broken.
+
+```python
+JS-NG> connection = j.core.executors.pool.get_connection(host="10.0.0.1", user="root")
+JS-NG> connection.run("hostname")
+```
+
+A connection can be held in use while running long operations (e.g. sftp transfers), so it's not closed as idle
+
+```python
+JS-NG> with j.core.executors.pool.use_connection(host="10.0.0.1", user="root") as connection:
+           connection.sftp().put("/tmp/big", "/tmp/big")
+```
+"""
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+
+import fabric
+
+# seconds between keepalive packets
+KEEPALIVE = 30
+# close connections not used for this number of seconds
+MAX_IDLE = 300
+# check connections not used for this number of seconds before returning them
+HEALTH_CHECK_INTERVAL = 10
+
+
+def _freeze(value):
+    """get a hashable version of a value (dicts and lists are converted to tuples)
+
+    other unhashable values (e.g. `fabric.Config` objects) are identified by their id, they are kept alive
+    by their pooled connections, so the id is not reused while the connection is pooled
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return (type(value).__name__, id(value))
+    return value
+
+
+class PooledConnection:
+    def __init__(self, connection):
+        self.connection = connection
+        self.last_used = time.monotonic()
+        # number of users currently using the connection (e.g. running commands)
+        self.users = 0
+        self.lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, keepalive=KEEPALIVE, max_idle=MAX_IDLE, health_check_interval=HEALTH_CHECK_INTERVAL):
+        """
+        Args:
+            keepalive (int): seconds between keepalive packets, 0 to disable.
+            max_idle (int): close connections not used for this number of seconds.
+            health_check_interval (int): check connections not used for this number of seconds before using them.
+        """
+        self.keepalive = keepalive
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    def get_key(self, **connection_ctx):
+        """
+        get the pool key of a connection context
+
+        Args:
+            connection_ctx (dict): context passed to `fabric.Connection`
+
+        Returns:
+            tuple: key
+        """
+        return _freeze(connection_ctx)
+
+    def _is_healthy(self, connection):
+        transport = connection.transport
+        if not transport or not transport.is_active():
+            return False
+
+        try:
+            transport.send_ignore()
+        except Exception:
+            return False
+        return True
+
+    def _open(self, connection_ctx):
+        connection = fabric.Connection(**connection_ctx)
+        connection.open()
+        if self.keepalive:
+            connection.transport.set_keepalive(self.keepalive)
+        return connection
+
+    def _acquire(self, connection_ctx):
+        """get the pooled connection of the given context, and mark it as in use"""
+        key = self.get_key(**connection_ctx)
+        self.evict_idle()
+
+        with self._lock:
+            pooled = self._connections.get(key)
+            if not pooled:
+                pooled = self._connections[key] = PooledConnection(None)
+            # counted under the pool lock, so it's not evicted before getting the connection
+            pooled.users += 1
+
+        try:
+            with pooled.lock:
+                now = time.monotonic()
+                connection = pooled.connection
+                if connection is not None:
+                    if not connection.is_connected:
+                        healthy = False
+                    elif now - pooled.last_used > self.health_check_interval:
+                        healthy = self._is_healthy(connection)
+                    else:
+                        healthy = True
+
+                    if not healthy:
+                        connection.close()
+                        connection = None
+
+                if connection is None:
+                    connection = pooled.connection = self._open(connection_ctx)
+
+                pooled.last_used = now
+        except Exception:
+            self._release(pooled)
+            raise
+
+        return pooled, connection
+
+    def _release(self, pooled):
+        with self._lock:
+            pooled.users -= 1
+            pooled.last_used = time.monotonic()
+
+    def get(self, **connection_ctx):
+        """
+        get an open connection for the given context, a new one is opened if there's none, or the pooled one is broken
+
+        the connection is not held in use, use `use` for operations that can take more than `max_idle` seconds
+
+        Args:
+            connection_ctx (dict): context passed to `fabric.Connection`
+                                   e.g. fabric.Connection(host, user=None, port=None, config=None, gateway=None, forward_agent=None, connect_timeout=None, connect_kwargs=None, inline_ssh_env=None)
+
+        Returns:
+            fabric.Connection: connection
+        """
+        pooled, connection = self._acquire(connection_ctx)
+        self._release(pooled)
+        return connection
+
+    @contextmanager
+    def use(self, **connection_ctx):
+        """
+        get an open connection for the given context (the same as `get`), and hold it in use until the block exits,
+        so it's not closed as idle
+
+        Args:
+            connection_ctx (dict): context passed to `fabric.Connection`
+
+        Yields:
+            fabric.Connection: connection
+        """
+        pooled, connection = self._acquire(connection_ctx)
+        try:
+            yield connection
+        finally:
+            self._release(pooled)
+
+    def close(self, **connection_ctx):
+        """
+        close and remove the connection of the given context from the pool
+
+        Args:
+            connection_ctx (dict): context passed to `fabric.Connection`
+        """
+        with self._lock:
+            pooled = self._connections.pop(self.get_key(**connection_ctx), None)
+
+        if pooled and pooled.connection:
+            pooled.connection.close()
+
+    def evict_idle(self):
+        """close connections which are not in use, and were not used for more than `max_idle` seconds"""
+        now = time.monotonic()
+        with self._lock:
+            idle_keys = [
+                key
+                for key, pooled in self._connections.items()
+                if pooled.connection and not pooled.users and now - pooled.last_used > self.max_idle
+            ]
+            idle = [self._connections.pop(key) for key in idle_keys]
+
+        for pooled in idle:
+            pooled.connection.close()
+
+    def close_all(self):
+        """close all connections"""
+        with self._lock:
+            pooled_connections = list(self._connections.values())
+            self._connections.clear()
+
+        for pooled in pooled_connections:
+            if pooled.connection:
+                pooled.connection.close()
+
+    def __len__(self):
+        return len(self._connections)
+
+
+# the pool shared by all remote executors
+pool = ConnectionPool()
+atexit.register(pool.close_all)
+
+
+def get_connection(**connection_ctx):
+    """
+    get an open connection from the shared pool
+
+    Args:
+        connection_ctx (dict): context passed to `fabric.Connection`
+
+    Returns:
+        fabric.Connection: connection
+    """
+    return pool.get(**connection_ctx)
+
+
+def use_connection(**connection_ctx):
+    """
+    get an open connection from the shared pool, held in use until the block exits
+
+    Args:
+        connection_ctx (dict): context passed to `fabric.Connection`
+
+    Returns:
+        contextmanager: yields a `fabric.Connection`
+    """
+    return pool.use(**connection_ctx)
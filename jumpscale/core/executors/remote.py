@@ -8,12 +8,25 @@ JS-NG> with j.core.executors.RemoteExecutor(host="localhost", connect_kwargs={"k
 xmonader-ThinkPad-E580
 JS-NG>
 ```
-"""
 
+Connections are pooled (see `jumpscale.core.executors.pool`), so commands with the same connection context
+reuse one ssh connection, and many commands can be run concurrently over it using `run_many`
+
+```
+JS-NG> executor = j.core.executors.RemoteExecutor(host="localhost")
+JS-NG> executor.run_many(["hostname", "uptime", "df -h"])
+[(0, 'xmonader-ThinkPad-E580\n', ''), (0, ' 11:28:30 up ...', ''), (0, 'Filesystem ...', '')]
+```
+"""
 
-import fabric
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import list2cmdline
 
 from .command_builder import cmd_from_args
+from .pool import pool
+
+# max number of channels (concurrent commands) opened by `run_many` over one connection
+MAX_CHANNELS = 10
 
 
 @cmd_from_args
@@ -29,9 +42,41 @@ def execute(cmd, command_ctx, connection_ctx):
     Returns:
         tuple: return code, stdout, stderr
     """
-    with fabric.Connection(**connection_ctx) as c:
-        res = c.run(cmd, **command_ctx)
-        return res.return_code, res.stdout, res.stderr
+    with pool.use(**connection_ctx) as connection:
+        res = connection.run(cmd, **command_ctx)
+    return res.return_code, res.stdout, res.stderr
+
+
+def execute_many(cmds, command_ctx, connection_ctx, max_channels=MAX_CHANNELS):
+    """
+    execute many commands on a remote context concurrently, every command runs in its own channel
+    over the same connection
+
+    Args:
+        cmds (list): commands, every command is a string or an argument list
+        command_ctx (dict): command runner context (the same as local `execute`), output is hidden by default
+        connection_ctx (dict): context passed to fabric
+        max_channels (int): max number of commands running at the same time
+
+    Returns:
+        list of tuple: return code, stdout, stderr of every command (in the same order)
+    """
+    if not cmds:
+        return []
+
+    command_ctx = dict(command_ctx)
+    command_ctx.setdefault("hide", True)
+
+    with pool.use(**connection_ctx) as connection:
+
+        def run(cmd):
+            if isinstance(cmd, list):
+                cmd = list2cmdline(cmd)
+            res = connection.run(cmd, **command_ctx)
+            return res.return_code, res.stdout, res.stderr
+
+        with ThreadPoolExecutor(max_workers=min(len(cmds), max_channels)) as executor:
+            return list(executor.map(run, cmds))
 
 
 class RemoteExecutor:
@@ -58,12 +103,25 @@ class RemoteExecutor:
 
     @property
     def connection(self):
-        return fabric.Connection(**self._connection_ctx)
+        """the pooled (shared) connection of this executor"""
+        return pool.get(**self._connection_ctx)
 
     @property
     def sftp(self):
+        """the sftp session of the pooled connection, use `use_connection` for long transfers"""
         return self.connection.sftp()
 
+    def use_connection(self):
+        """
+        get the pooled connection of this executor, held in use (not closed as idle) until the block exits
+        e.g
+            with executor.use_connection() as connection: connection.sftp().put("/tmp/big", "/tmp/big")
+
+        Returns:
+            contextmanager: yields a `fabric.Connection`
+        """
+        return pool.use(**self._connection_ctx)
+
     def run(self, cmd, **command_ctx):
         """
         execute a command
@@ -75,3 +133,20 @@ class RemoteExecutor:
             tuple: return code, stdout, stderr
         """
         return execute(cmd, command_ctx, self._connection_ctx)
+
+    def run_many(self, cmds, max_channels=MAX_CHANNELS, **command_ctx):
+        """
+        execute many commands concurrently over the same connection
+
+        Args:
+            cmds (list): commands, e.g. ["hostname", ["ls", "-la"]]
+            max_channels (int): max number of commands running at the same time
+
+        Returns:
+            list of tuple: return code, stdout, stderr of every command (in the same order)
+        """
+        return execute_many(cmds, command_ctx, self._connection_ctx, max_channels=max_channels)
+
+    def close(self):
+        """close the pooled connection of this executor, a new one is opened on next use"""
+        pool.close(**self._connection_ctx)
@@ -19,7 +19,14 @@ def export_module_as():
         if config["redis"]["enabled"] and j.core.db:
             redis_config = config["redis"]
             redis_handler = RedisLogHandler(
-                max_size=redis_config["max_size"], dump=redis_config["dump"], dump_dir=redis_config["dump_dir"]
+                max_size=redis_config["max_size"],
+                dump=redis_config["dump"],
+                dump_dir=redis_config["dump_dir"],
+                queued=redis_config.get("queued", False),
+                queue_size=redis_config.get("queue_size", 10000),
+                batch_size=redis_config.get("batch_size", 500),
+                flush_interval=redis_config.get("flush_interval", 0.5),
+                drop_policy=redis_config.get("drop_policy", "drop_old"),
             )
             logger.add_custom_handler("redis", redis_handler, serialize=True, level=redis_config["level"])
 
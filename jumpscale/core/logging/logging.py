@@ -1,21 +1,39 @@
+import atexit
 import math
+import os
+import sys
+import threading
+import time
+import weakref
 import loguru
 import msgpack
 import json
 
 from abc import ABC, abstractmethod
+from collections import deque
 
 from loguru._get_frame import get_frame
 
 from jumpscale.core.exceptions import Value
 from jumpscale.loader import j
 
+from .records import InvalidRecordsFile, RecordsFile, write_records
+
 
 LEVELS = {10: "DEBUG", 20: "INFO", 30: "WARNING", 40: "ERROR", 50: "CRITICAL"}
 
 # init is kept as a name for backward compatibility
 DEFAULT_APP_NAME = "init"
 
+# what to do with new records in queued mode if the queue is full
+DROP_OLD = "drop_old"
+DROP_NEW = "drop_new"
+BLOCK = "block"
+DROP_POLICIES = (DROP_OLD, DROP_NEW, BLOCK)
+
+# how long (in seconds) the redis health check result is kept, instead of pinging for every record
+HEALTH_CHECK_INTERVAL = 5
+
 
 class LogHandler(ABC):
     """the interface every cutom log handler should implement"""
@@ -224,7 +242,35 @@ class MainLogger(Logger):
 
 
 class RedisLogHandler(LogHandler):
-    def __init__(self, max_size: int = 1000, dump: bool = True, dump_dir: str = None):
+    def __init__(
+        self,
+        max_size: int = 1000,
+        dump: bool = True,
+        dump_dir: str = None,
+        queued: bool = False,
+        queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        drop_policy: str = DROP_OLD,
+    ):
+        """Redis log handler, keeps the last `max_size` records of every app in redis
+
+        In queued mode, records are put in a bounded in-process queue and written in batches
+        (pipelined) by a background thread, so, logging calls never wait for redis.
+
+        Keyword Arguments:
+            max_size (int): max number of records kept in redis per app (default: 1000)
+            dump (bool): dump older records to `dump_dir` (default: True)
+            dump_dir (str): dump directory (default: "/tmp")
+            queued (bool): enable queued mode (default: False)
+            queue_size (int): max number of queued records (default: 10000)
+            batch_size (int): max number of records written at once (default: 500)
+            flush_interval (float): max time (in seconds) a record stays in the queue (default: 0.5)
+            drop_policy (str): what to do if the queue is full, "drop_old", "drop_new" or "block" (default: "drop_old")
+        """
+        if drop_policy not in DROP_POLICIES:
+            raise Value(f"invalid drop policy '{drop_policy}', must be one of {DROP_POLICIES}")
+
         self._max_size = max_size
         self._dump = dump
         self._dump_dir = dump_dir or "/tmp"
@@ -232,6 +278,28 @@ class RedisLogHandler(LogHandler):
         self._rkey_incr = "logs:%s:incr"
         self.__db = None
 
+        self._healthy = False
+        self._health_checked_at = 0
+
+        self._queued = queued
+        self._queue_size = queue_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._drop_policy = drop_policy
+        self._queue = deque()
+        self._queue_condition = threading.Condition()
+        self._dropped_count = 0
+        self._flusher = None
+        self._stopped = False
+        self._close_registered = False
+        # whether the last write failed, so a failure is reported only once until writes succeed again
+        self._write_failed = False
+
+        if hasattr(os, "register_at_fork"):
+            # the flusher thread does not exist in a forked child, weak, not to keep the handler alive
+            after_fork = weakref.WeakMethod(self._after_fork_in_child)
+            os.register_at_fork(after_in_child=lambda: after_fork() and after_fork()())
+
         if self._dump_dir:
             j.sals.fs.mkdirs(self._dump_dir)
 
@@ -253,22 +321,119 @@ class RedisLogHandler(LogHandler):
     def dump_dir(self):
         return self._dump_dir
 
+    @property
+    def queued(self):
+        return self._queued
+
+    @property
+    def dropped_count(self):
+        """number of records dropped because the queue was full or redis was not available"""
+        return self._dropped_count
+
+    def _is_db_running(self):
+        """Check if redis is running, the result is cached for `HEALTH_CHECK_INTERVAL` seconds
+
+        Returns:
+            bool: True if running
+        """
+        now = time.monotonic()
+        if now - self._health_checked_at > HEALTH_CHECK_INTERVAL:
+            self._healthy = self._db.is_running()
+            self._health_checked_at = now
+        return self._healthy
+
     def _map_identifier(self, identifier):
         part = math.ceil(identifier / self.max_size) * self.max_size
         index = (identifier % self.max_size) - 1
         return part, index
 
+    def _get_part_path(self, app_name, part, legacy=False):
+        """Get the path of a dumped part
+
+        Arguments:
+            app_name (str): app name
+            part (int): part number (the last record id in this part)
+            legacy (bool): get the path of the older format (msgpack) instead
+
+        Returns:
+            str: path
+        """
+        extension = "msgpack" if legacy else "records"
+        return j.sals.fs.join_paths(self.dump_dir, app_name, "%s.%s" % (part, extension))
+
     def _dump_records(self, app_name, path):
         j.sals.fs.mkdir(j.sals.fs.parent(path))
         records = self._db.lrange(self._rkey % app_name, 0, self.max_size - 1)
-        j.sals.fs.write_bytes(path, msgpack.dumps(records))
+        write_records(path, records)
+
+    def _read_dumped_record(self, app_name, part, index):
+        """Read a single record from a dumped part, without reading the whole part
+
+        Arguments:
+            app_name (str): app name
+            part (int): part number
+            index (int): record index inside this part
+
+        Returns:
+            bytes: the record or None if not found (or the part is invalid)
+        """
+        path = self._get_part_path(app_name, part)
+        if j.sals.fs.exists(path):
+            try:
+                with RecordsFile(path) as records:
+                    if len(records) > index:
+                        return records[index]
+            except InvalidRecordsFile:
+                # e.g. truncated, its records are lost
+                pass
+            return
+
+        # parts dumped by older versions
+        path = self._get_part_path(app_name, part, legacy=True)
+        if j.sals.fs.exists(path):
+            records = msgpack.loads(j.sals.fs.read_bytes(path))
+            if records and len(records) > index:
+                return records[index]
+
+    def _iter_dumped_part(self, app_name, part):
+        """Iterate over raw records of a dumped part
+
+        Arguments:
+            app_name (str): app name
+            part (int): part number
+
+        Yields:
+            bytes: records
+        """
+        path = self._get_part_path(app_name, part)
+        if j.sals.fs.exists(path):
+            try:
+                records = RecordsFile(path)
+            except InvalidRecordsFile:
+                # e.g. truncated, its records are lost
+                return
+
+            with records:
+                yield from records
+            return
+
+        path = self._get_part_path(app_name, part, legacy=True)
+        if j.sals.fs.exists(path):
+            yield from msgpack.loads(j.sals.fs.read_bytes(path))
 
     def _process_message(self, message):
+        """Get a record from a serialized loguru message (without an id, it's set when the record is written)
+
+        Arguments:
+            message (str): serialized message
+
+        Returns:
+            dict: record
+        """
         record = json.loads(message)["record"]
         app_name = record["extra"]["app_name"]
-        record_id = self._db.incr(self._rkey_incr % app_name)
         return dict(
-            id=record_id,
+            id=None,
             app_name=app_name,
             module=record["name"],
             message=record["message"],
@@ -286,28 +451,169 @@ class RedisLogHandler(LogHandler):
     def _clean_up(self, app_name):
         self._db.ltrim(self._rkey % app_name, self.max_size, -1)
 
-    def _handle(self, message: str, **kwargs):
-        """Logging handler
+    def _write_records(self, records):
+        """Write records to redis, ids are reserved and records are pushed using pipelines (per batch, not per record)
+
+        Older records are dumped and trimmed if the app records exceed `max_size`.
 
         Arguments:
-            message {str} -- message string
+            records (list): records (dicts)
         """
-        if not self._db.is_running():
+        app_records = {}
+        for record in records:
+            app_records.setdefault(record["app_name"], []).append(record)
+
+        pipeline = self._db.pipeline(transaction=False)
+        for app_name, records in app_records.items():
+            pipeline.incrby(self._rkey_incr % app_name, len(records))
+        last_ids = pipeline.execute()
+
+        pipeline = self._db.pipeline(transaction=False)
+        for (app_name, records), last_id in zip(app_records.items(), last_ids):
+            first_id = last_id - len(records) + 1
+            for record_id, record in enumerate(records, start=first_id):
+                record["id"] = record_id
+            rkey = self._rkey % app_name
+            pipeline.rpush(rkey, *[json.dumps(record) for record in records])
+        lengths = pipeline.execute()
+
+        for app_name, last_id, length in zip(app_records, last_ids, lengths):
+            while length > self.max_size:
+                if self.dump:
+                    # the first record in the list always starts a new part
+                    part, _ = self._map_identifier(last_id - length + 1)
+                    self._dump_records(app_name, self._get_part_path(app_name, part))
+
+                self._clean_up(app_name)
+                length -= self.max_size
+
+    def _enqueue(self, record):
+        """Put a record in the queue according to the drop policy, and start the flusher if not started yet
+
+        Arguments:
+            record (dict): record
+        """
+        with self._queue_condition:
+            if len(self._queue) >= self._queue_size:
+                if self._drop_policy == DROP_NEW:
+                    self._count_dropped(1)
+                    return
+                elif self._drop_policy == DROP_OLD:
+                    self._queue.popleft()
+                    self._count_dropped(1)
+                else:
+                    while len(self._queue) >= self._queue_size and not self._stopped:
+                        self._queue_condition.wait()
+
+            self._queue.append(record)
+            if len(self._queue) >= self._batch_size:
+                self._queue_condition.notify_all()
+
+            if not self._flusher or not self._flusher.is_alive():
+                self._start_flusher()
+
+    def _start_flusher(self):
+        self._stopped = False
+        self._flusher = threading.Thread(target=self._flush_loop, name="redis-log-flusher", daemon=True)
+        self._flusher.start()
+        if not self._close_registered:
+            # the flusher can be started again after being closed, register only once
+            atexit.register(self.close)
+            self._close_registered = True
+
+    def _after_fork_in_child(self):
+        """Reset queued mode state in a forked child, the flusher (and queued records) belong to the parent"""
+        self._queue = deque()
+        self._queue_condition = threading.Condition()
+        self._flusher = None
+        self._stopped = False
+
+    def _count_dropped(self, count):
+        """Add to the dropped records count, it's updated by both producers and the flusher
+
+        Arguments:
+            count (int): number of dropped records
+        """
+        with self._queue_condition:
+            self._dropped_count += count
+
+    def _take_batch(self):
+        """Take a batch of records from the queue (should be called with the queue condition acquired)
+
+        Returns:
+            list: records
+        """
+        batch = []
+        while self._queue and len(batch) < self._batch_size:
+            batch.append(self._queue.popleft())
+        # notify blocked producers if any
+        self._queue_condition.notify_all()
+        return batch
+
+    def _flush_loop(self):
+        while True:
+            with self._queue_condition:
+                if len(self._queue) < self._batch_size and not self._stopped:
+                    self._queue_condition.wait(self._flush_interval)
+                batch = self._take_batch()
+                stopped = self._stopped
+
+            if batch:
+                self._flush_batch(batch)
+            elif stopped:
+                return
+
+    def _flush_batch(self, batch):
+        if not self._is_db_running():
+            self._count_dropped(len(batch))
             return
 
-        record = self._process_message(message)
-        app_name = record["app_name"]
+        try:
+            self._write_records(batch)
+        except Exception as e:
+            # redis went away, check again later
+            self._health_checked_at = 0
+            self._count_dropped(len(batch))
+            if not self._write_failed:
+                # not using the logger itself, as it would come back here
+                self._write_failed = True
+                sys.stderr.write(f"failed to write {len(batch)} log records to redis, dropping records: {e}\n")
+        else:
+            self._write_failed = False
+
+    def flush(self):
+        """Write all queued records now (in queued mode), in the caller thread"""
+        while True:
+            with self._queue_condition:
+                batch = self._take_batch()
+            if not batch:
+                return
+            self._flush_batch(batch)
+
+    def close(self):
+        """Stop the background flusher (if started) after all queued records are written"""
+        flusher = self._flusher
+        if not flusher:
+            return
 
-        rkey = self._rkey % app_name
-        self._db.rpush(rkey, json.dumps(record))
+        with self._queue_condition:
+            self._stopped = True
+            self._queue_condition.notify_all()
+
+        flusher.join()
+        self._flusher = None
 
-        if self._db.llen(rkey) > self.max_size:
-            if self.dump:
-                part, _ = self._map_identifier(record["id"] - 1)
-                path = j.sals.fs.join_paths(self.dump_dir, app_name, "%s.msgpack" % part)
-                self._dump_records(app_name, path)
+    def _handle(self, message: str, **kwargs):
+        """Logging handler
 
-            self._clean_up(app_name)
+        Arguments:
+            message {str} -- message string
+        """
+        record = self._process_message(message)
+        if self.queued:
+            self._enqueue(record)
+        else:
+            self._flush_batch([record])
 
     def records_count(self, app_name: str = DEFAULT_APP_NAME) -> int:
         """Gets total number of the records of the app
@@ -323,9 +629,27 @@ class RedisLogHandler(LogHandler):
             return int(count)
         return 0
 
+    def _get_live_range(self, app_name):
+        """Get the total records count and the id of the first record kept in redis
+
+        Arguments:
+            app_name (str): app name
+
+        Returns:
+            tuple: (count, first live id)
+        """
+        pipeline = self._db.pipeline(transaction=False)
+        pipeline.get(self._rkey_incr % app_name)
+        pipeline.llen(self._rkey % app_name)
+        count, length = pipeline.execute()
+        count = int(count or 0)
+        return count, count - length + 1
+
     def record_get(self, identifier: int, app_name: str = DEFAULT_APP_NAME) -> dict:
         """Get app log record by its identifier
 
+        Older records are read from dumped parts, only the requested record is read (not the whole part).
+
         Arguments:
             identifier {int} -- record identifier
             app_name {str} -- app name
@@ -333,22 +657,78 @@ class RedisLogHandler(LogHandler):
         Returns:
             dict: requested log record
         """
-        count = self.records_count(app_name)
-        part, index = self._map_identifier(identifier)
-
-        if identifier > count:
+        count, first_live_id = self._get_live_range(app_name)
+        if identifier > count or identifier < 1:
             return
 
-        if part > count - self.max_size:
-            record = self._db.lindex(self._rkey % app_name, index)
-            return json.loads(record)
+        if identifier >= first_live_id:
+            record = self._db.lindex(self._rkey % app_name, identifier - first_live_id)
+            return json.loads(record) if record else None
 
         if self.dump:
-            path = j.sals.fs.join_paths(self.dump_dir, app_name, "%s.msgpack" % part)
-            if j.sals.fs.exists(path):
-                records = msgpack.loads(j.sals.fs.read_bytes(path))
-                if records and len(records) > index:
-                    return json.loads(records[index])
+            part, index = self._map_identifier(identifier)
+            record = self._read_dumped_record(app_name, part, index)
+            if record:
+                return json.loads(record)
+
+    def iter_records(
+        self,
+        app_name: str = DEFAULT_APP_NAME,
+        start_id: int = None,
+        end_id: int = None,
+        start_time: float = None,
+        end_time: float = None,
+        batch_size: int = 100,
+    ) -> iter:
+        """Iterate over records (ordered by id) across dumped parts and redis, records are read as needed
+
+        Keyword Arguments:
+            app_name (str): app name.
+            start_id (int, optional): first record id (default: first available record)
+            end_id (int, optional): last record id (default: last record)
+            start_time (float, optional): only records logged at or after this time (epoch)
+            end_time (float, optional): only records logged at or before this time (epoch)
+            batch_size (int, optional): number of records fetched from redis at once (default: 100)
+
+        Yields:
+            dict: records
+        """
+        count, first_live_id = self._get_live_range(app_name)
+        start_id = max(start_id or 1, 1)
+        end_id = min(end_id or count, count)
+
+        def in_time_range(record):
+            if start_time and record["epoch"] < start_time:
+                return False
+            if end_time and record["epoch"] > end_time:
+                return False
+            return True
+
+        # dumped parts first
+        if self.dump and start_id < first_live_id:
+            first_part, _ = self._map_identifier(start_id)
+            for part in range(first_part, min(end_id, first_live_id - 1) + self.max_size, self.max_size):
+                part_first_id = part - self.max_size + 1
+                for record_id, raw_record in enumerate(self._iter_dumped_part(app_name, part), start=part_first_id):
+                    if record_id < start_id:
+                        continue
+                    if record_id > end_id or record_id >= first_live_id:
+                        break
+
+                    record = json.loads(raw_record)
+                    if in_time_range(record):
+                        yield record
+
+        # then the records in redis
+        rkey = self._rkey % app_name
+        start_index = max(start_id, first_live_id) - first_live_id
+        end_index = end_id - first_live_id
+        for batch_start in range(start_index, end_index + 1, batch_size):
+            batch_end = min(batch_start + batch_size - 1, end_index)
+            for raw_record in self._db.lrange(rkey, batch_start, batch_end):
+                record = json.loads(raw_record)
+                if in_time_range(record):
+                    yield record
 
     def remove_all_records(self, app_name: str):
         """Delete all app's log records
@@ -356,6 +736,7 @@ class RedisLogHandler(LogHandler):
         Arguments:
             app_name (str): app name
         """
+        self.flush()
         self._db.delete(self._rkey % app_name, self._rkey_incr % app_name)
         path = j.sals.fs.join_paths(self.dump_dir, app_name)
 
@@ -0,0 +1,126 @@
+"""
+A simple file format for dumped log records, which supports random access to a single record.
+
+The file is all records (raw bytes) one after another, followed by an index and a footer:
+
+```
+| record 0 | record 1 | ... | record n-1 | offset 0 | offset 1 | ... | offset n | index offset | count | magic |
+```
+
+Where offsets are the start of every record (and the end of the last one) as unsigned 64-bit integers,
+so, reading a record only needs to read two offsets from the index.
+"""
+import mmap
+import os
+import struct
+
+MAGIC = b"JSLR"
+
+OFFSET = struct.Struct("!Q")
+# index offset, records count and magic
+FOOTER = struct.Struct("!QI4s")
+
+
+class InvalidRecordsFile(Exception):
+    pass
+
+
+def write_records(path, records):
+    """Write records to a file at `path` (the file is replaced atomically)
+
+    Arguments:
+        path (str): file path
+        records (list): records as bytes
+    """
+    offsets = [0]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(records))
+        f.write(b"".join(OFFSET.pack(offset) for offset in offsets))
+        f.write(FOOTER.pack(offsets[-1], len(records), MAGIC))
+    os.replace(tmp_path, path)
+
+
+class RecordsFile:
+    """Read-only access to a records file using mmap
+
+    ```python
+    with RecordsFile(path) as records:
+        print(len(records), records[0])
+        for record in records:
+            print(record)
+    ```
+    """
+
+    def __init__(self, path):
+        """
+        Arguments:
+            path (str): file path
+
+        Raises:
+            InvalidRecordsFile: if the file is not a valid records file
+        """
+        self._mmap = None
+        self._index_offset = self._count = 0
+
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                # empty (e.g. created but never written), has no records
+                return
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if size < FOOTER.size:
+            self.close()
+            raise InvalidRecordsFile(f"{path} is too small to be a records file")
+
+        self._index_offset, self._count, magic = FOOTER.unpack_from(self._mmap, size - FOOTER.size)
+        if magic != MAGIC:
+            self.close()
+            raise InvalidRecordsFile(f"{path} is not a records file")
+
+        if self._index_offset + (self._count + 1) * OFFSET.size + FOOTER.size != size:
+            self.close()
+            raise InvalidRecordsFile(f"{path} has an invalid index")
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        """Get a record by its index
+
+        Arguments:
+            index (int): record index (negative indexes are supported)
+
+        Raises:
+            IndexError: if the index is out of range
+
+        Returns:
+            bytes: record
+        """
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("record index out of range")
+
+        (start,) = OFFSET.unpack_from(self._mmap, self._index_offset + index * OFFSET.size)
+        (end,) = OFFSET.unpack_from(self._mmap, self._index_offset + (index + 1) * OFFSET.size)
+        return self._mmap[start:end]
+
+    def __iter__(self):
+        for index in range(self._count):
+            yield self[index]
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
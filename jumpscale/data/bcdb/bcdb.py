@@ -30,16 +30,64 @@ class BCDB:
             model (ModelObj): The model object that obj belongs to.
             obj (JSObjBase): The object that will be saved.
         """
-        self.indexer_set.set(model, obj)
-        self.indexer_text.set(model, obj)
-        for prop in model.schema.props.values():
-            old_obj = model.get_by("id", obj.id)
-            prop_name = prop.name
-            index_prop = getattr(obj, prop.name)
-            old_index = getattr(old_obj, prop.name) if old_obj else None
-            if prop.index:
-                self.indexer.set(model, prop_name, index_prop, obj.id, old_index)
-        self.storage.set(model, obj.id, obj)
+        self.save_many(model, [obj])
+
+    def save_many(self, model, objs):
+        """Saves many objects of the same model in the db and update the indexes.
+
+        Old objects are fetched once (with a single MGET), then the storage and all the redis index updates
+        are applied in a single transaction (MULTI/EXEC), or one transaction per server if the index and the storage
+        use different redis servers. Range indexes are updated in a single sqlite transaction.
+
+        Args:
+            model (ModelObj): The model object that objs belong to.
+            objs (list[JSObjBase]): The objects that will be saved.
+        """
+        if not objs:
+            return
+
+        self.indexer_set.bulk_set(model, objs)
+        for obj in objs:
+            self.indexer_text.set(model, obj)
+
+        old_objs = self.storage.get_many(model, [obj.id for obj in objs])
+        indexed_props = [prop.name for prop in model.schema.props.values() if prop.index]
+
+        pipeline = self.storage.redis_client.pipeline(transaction=True)
+        if self._same_server(self.indexer.redis_client, self.storage.redis_client):
+            index_pipeline = pipeline
+        else:
+            index_pipeline = self.indexer.redis_client.pipeline(transaction=True)
+
+        for obj, old_obj in zip(objs, old_objs):
+            for prop_name in indexed_props:
+                index_prop = getattr(obj, prop_name)
+                old_index = getattr(old_obj, prop_name) if old_obj else None
+                if old_obj and old_index == index_prop:
+                    # not changed, the index entry is already set
+                    continue
+                self.indexer.set(model, prop_name, index_prop, obj.id, old_index, pipeline=index_pipeline)
+            self.storage.set(model, obj.id, obj, pipeline=pipeline)
+
+        if index_pipeline is not pipeline:
+            index_pipeline.execute()
+        pipeline.execute()
+
+    def _same_server(self, redis_client, other_redis_client):
+        """Checks if two redis clients are connected to the same server and database,
+        so their commands can be sent in the same transaction.
+
+        Args:
+            redis_client (Redis): A redis client.
+            other_redis_client (Redis): Another redis client.
+
+        Returns:
+            bool: True if they use the same server and database.
+        """
+        keys = ("host", "port", "path", "db")
+        kwargs = redis_client.connection_pool.connection_kwargs
+        other_kwargs = other_redis_client.connection_pool.connection_kwargs
+        return all(kwargs.get(key) == other_kwargs.get(key) for key in keys)
 
     def model_id_incr(self, model):
         """Increment the id counter in the model and returns the new id.
@@ -125,6 +173,18 @@ class BCDB:
                     result.append(obj)
             return result
 
+    def get_ids_from_index(self, model, index_values):
+        """Gets the ids of many index entries at once. The keys must be indexed for search.
+
+        Args:
+            model (ModelObj): The model in which the keys are searched for.
+            index_values (list): A list of (key, value) tuples.
+
+        Returns:
+            list: The matched ids (or None if not found) in the same order.
+        """
+        return self.indexer.get_many(model, index_values)
+
     def get_item_from_index(self, model, key, val):
         """Search for objects whose key equal val. The key must be indexed for search.
 
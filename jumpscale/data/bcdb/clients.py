@@ -2,6 +2,7 @@ from .interfaces import *
 from redis import Redis
 import json
 import sqlite3
+import threading
 from jumpscale.loader import j
 
 
@@ -19,14 +20,22 @@ class RedisStorageClient(StorageInterface):
         self.serializer = serializer or JSONSerializer()
         self.bcdb_namespace = bcdb_namespace
 
+    def _get_key(self, model, obj_id):
+        return f"{self.bcdb_namespace}.{model.name}://{obj_id}"
+
     def get(self, model, obj_id):
-        obj_str = self.redis_client.get(f"{self.bcdb_namespace}.{model.name}://{obj_id}")
+        obj_str = self.redis_client.get(self._get_key(model, obj_id))
         return self.serializer.loads(model, obj_str) if obj_str else None
 
-    def set(self, model, obj_id, value):
-        return self.redis_client.set(
-            f"{self.bcdb_namespace}.{model.name}://{obj_id}", self.serializer.dumps(model, value)
-        )
+    def get_many(self, model, obj_ids):
+        if not obj_ids:
+            return []
+        obj_strs = self.redis_client.mget([self._get_key(model, obj_id) for obj_id in obj_ids])
+        return [self.serializer.loads(model, obj_str) if obj_str else None for obj_str in obj_strs]
+
+    def set(self, model, obj_id, value, pipeline=None):
+        client = pipeline if pipeline is not None else self.redis_client
+        return client.set(self._get_key(model, obj_id), self.serializer.dumps(model, value))
 
     def get_keys_in_model(self, model):
         pattern = f"{self.bcdb_namespace}.{model.name}://*"
@@ -47,66 +56,127 @@ class RedisIndexClient(IndexInterface):
         self.redis_client = Redis(host=host, port=port)
         self.bcdb_namespace = bcdb_namespace
 
+    def _get_key(self, model, index_prop, index_value):
+        return f"{self.bcdb_namespace}.indexer.{model.name}.{index_prop}://{index_value}"
+
     def get(self, model, index_prop, index_value):
-        res = self.redis_client.get(f"{self.bcdb_namespace}.indexer.{model.name}.{index_prop}://{index_value}")
+        res = self.redis_client.get(self._get_key(model, index_prop, index_value))
         return int(res) if res else None
 
-    def set(self, model, index_prop, index_value, obj_id, old_value=None):
+    def get_many(self, model, index_values):
+        """Gets the ids of many index entries with a single MGET.
+
+        Args:
+            model (ModelObj): The model object.
+            index_values (list): A list of (index_prop, index_value) tuples.
+
+        Returns:
+            list: The ids (or None if an entry is not found) in the same order.
+        """
+        if not index_values:
+            return []
+        keys = [self._get_key(model, index_prop, index_value) for index_prop, index_value in index_values]
+        return [int(res) if res else None for res in self.redis_client.mget(keys)]
+
+    def set(self, model, index_prop, index_value, obj_id, old_value=None, pipeline=None):
+        client = pipeline if pipeline is not None else self.redis_client
         if old_value:
-            self.redis_client.delete(f"{self.bcdb_namespace}.indexer.{model.name}.{index_prop}://{old_value}")
-        return self.redis_client.set(f"{self.bcdb_namespace}.indexer.{model.name}.{index_prop}://{index_value}", obj_id)
+            client.delete(self._get_key(model, index_prop, old_value))
+        return client.set(self._get_key(model, index_prop, index_value), obj_id)
 
 
 class SQLiteIndexSetClient(IndexSetInterface):
     def __init__(self, bcdb_namespace):
         self.bcdb_namespace = bcdb_namespace
+        self.db_path = f"{self.bcdb_namespace}_index.db"
+        self._conn = None
+        # tables that are known to exist, to skip checking sqlite_master every time
+        self._tables = set()
+        # a mapping between model name and (indexed props, replace statement)
+        self._statements = {}
+        self._lock = threading.RLock()
+
+    @property
+    def conn(self):
+        """A persistent connection to the index database (in WAL mode), created on first use."""
+        if not self._conn:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # with WAL, syncing on checkpoints only is still safe against corruption
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+
+    def close(self):
+        """Closes the persistent connection, it will be re-opened when needed."""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+            self._tables.clear()
+
+    def _get_indexed_props(self, model):
+        return [prop for prop in model.schema.props.values() if prop.name != "id" and prop.index_key]
 
     def _create_if_not_exists(self, model):
-        conn = sqlite3.connect(f"{self.bcdb_namespace}_index.db")
-        c = conn.cursor()
         table_name = f"{model.name}"
-        c.execute(f"SELECT count(*) FROM sqlite_master WHERE type='table' AND name='{table_name}'")
-        if c.fetchone()[0] != 0:
-            return None
-        props = []
-        props_str = ""
-        for prop in model.schema.props.values():
-            if prop.name != "id" and prop.index_key:
-                prop_type = "INTEGER" if isinstance(prop.type, j.data.types.Integer) else "TEXT"
-                props_str += f", {prop.name} {prop_type}"
-                props.append(prop.name)
+        if table_name in self._tables:
+            return
 
-        c.execute(f"CREATE TABLE IF NOT EXISTS {table_name} (id int primary key{props_str})")
+        props = self._get_indexed_props(model)
+        props_str = ""
         for prop in props:
-            c.execute(f"CREATE INDEX IF NOT EXISTS {table_name}_{prop}_index on {table_name}({prop})")
-        conn.commit()
-        conn.close()
+            prop_type = "INTEGER" if isinstance(prop.type, j.data.types.Integer) else "TEXT"
+            props_str += f", {prop.name} {prop_type}"
+
+        with self.conn:
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table_name} (id int primary key{props_str})")
+            for prop in props:
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table_name}_{prop.name}_index on {table_name}({prop.name})"
+                )
+        self._tables.add(table_name)
+
+    def _get_replace_statement(self, model):
+        """Gets the indexed prop names of the model and the REPLACE statement for its table (built once per model).
+
+        Args:
+            model (ModelObj): The model object.
+
+        Returns:
+            tuple: (list of prop names, statement)
+        """
+        if model.name not in self._statements:
+            prop_names = [prop.name for prop in self._get_indexed_props(model)]
+            props_str = ", ".join(["id"] + prop_names)
+            statement = f"REPLACE INTO {model.name} ({props_str}) VALUES (?{', ?' * len(prop_names)})"
+            self._statements[model.name] = (prop_names, statement)
+        return self._statements[model.name]
 
     def get(self, model, index_prop, min, max):
-        self._create_if_not_exists(model)
-        conn = sqlite3.connect(f"{self.bcdb_namespace}_index.db")
-        c = conn.cursor()
-        table_name = f"{model.name}"
-        c.execute(f"SELECT id FROM {table_name} WHERE {index_prop} >= ? and {index_prop} <= ?", (min, max))
-        res = c.fetchall()
-        conn.close()
-        return res
+        with self._lock:
+            self._create_if_not_exists(model)
+            table_name = f"{model.name}"
+            c = self.conn.execute(
+                f"SELECT id FROM {table_name} WHERE {index_prop} >= ? and {index_prop} <= ?", (min, max)
+            )
+            return c.fetchall()
 
     def set(self, model, obj):
-        self._create_if_not_exists(model)
-        conn = sqlite3.connect(f"{self.bcdb_namespace}_index.db")
-        c = conn.cursor()
-        table_name = f"{model.name}"
-        props_str = "id"
-        props = [obj.id]
-        for prop in model.schema.props.values():
-            if prop.name != "id" and prop.index_key:
-                props_str += f", {prop.name}"
-                props.append(getattr(obj, prop.name))
-
-        c.execute(f"REPLACE INTO {table_name} ({props_str}) VALUES (?{', ?' * (len(props) - 1)})", props)
-        conn.commit()
-        conn.close()
+        self.bulk_set(model, [obj])
+
+    def bulk_set(self, model, objs):
+        """Indexes many objects of the same model in a single transaction.
+
+        Args:
+            model (ModelObj): The model object that objs belong to.
+            objs (list): The objects to be indexed.
+        """
+        with self._lock:
+            self._create_if_not_exists(model)
+            prop_names, statement = self._get_replace_statement(model)
+            rows = [[obj.id] + [getattr(obj, prop_name) for prop_name in prop_names] for obj in objs]
+            with self.conn:
+                self.conn.executemany(statement, rows)
 
 
 class SonicIndexTextClient(IndexTextInterface):
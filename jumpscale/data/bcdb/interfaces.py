@@ -2,7 +2,10 @@ class StorageInterface:
     def get(self, model, obj_id):
         pass
 
-    def set(self, model, obj_id, value):
+    def get_many(self, model, obj_ids):
+        return [self.get(model, obj_id) for obj_id in obj_ids]
+
+    def set(self, model, obj_id, value, pipeline=None):
         pass
 
     def get_keys_in_model(self, model):
@@ -19,7 +22,10 @@ class IndexInterface:
     def get(self, model, index_prop, index_value):
         pass
 
-    def set(self, model, index_prop, index_value, obj_id, old_value=None):
+    def get_many(self, model, index_values):
+        return [self.get(model, index_prop, index_value) for index_prop, index_value in index_values]
+
+    def set(self, model, index_prop, index_value, obj_id, old_value=None, pipeline=None):
         pass
 
 
@@ -33,6 +39,10 @@ class IndexSetInterface:
     def set(self, model, obj):
         pass
 
+    def bulk_set(self, model, objs):
+        for obj in objs:
+            self.set(model, obj)
+
 
 class IndexTextInterface:
     def __init__(self, bcdb_namespace):
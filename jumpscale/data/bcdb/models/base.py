@@ -60,12 +60,42 @@ class ModelBase:
         Raises:
             RuntimeError: If it contains a duplicate of a unique value.
         """
-        for prop in self.schema.props.values():
-            if prop.unique:
-                dbobj = self.get_by(prop.name, getattr(obj, prop.name))
-                if dbobj is not None and dbobj.id != obj.id:
+        self._assert_uniqueness_many([obj])
+
+    def _assert_uniqueness_many(self, objs):
+        """Checks that the objects don't contain an already existing property that is marked as unique,
+        or a duplicate among themselves.
+
+        Unique props that are indexed for search are checked with a single index lookup for all objects.
+
+        Args:
+            objs (list[JSObjBase]): The JS Objects.
+
+        Raises:
+            RuntimeError: If they contain a duplicate of a unique value.
+        """
+        unique_props = [prop for prop in self.schema.props.values() if prop.unique]
+
+        index_values = []
+        for prop in unique_props:
+            seen = {}
+            for obj in objs:
+                value = getattr(obj, prop.name)
+                if seen.setdefault(value, obj.id) != obj.id:
                     raise RuntimeError(f"{prop.name} is unique. One already exists.")
 
+                if prop.index:
+                    index_values.append((prop, obj, value))
+                else:
+                    dbobj = self.get_by(prop.name, value)
+                    if dbobj is not None and dbobj.id != obj.id:
+                        raise RuntimeError(f"{prop.name} is unique. One already exists.")
+
+        ids = self.bcdb.get_ids_from_index(self, [(prop.name, value) for prop, _, value in index_values])
+        for (prop, obj, _), obj_id in zip(index_values, ids):
+            if obj_id is not None and obj_id != obj.id:
+                raise RuntimeError(f"{prop.name} is unique. One already exists.")
+
     def save_obj(self, obj):
         """Saves the object to the db. It forwards the call to the bcdb client.
 
@@ -75,6 +105,15 @@ class ModelBase:
         self._assert_uniqueness(obj)
         self.bcdb.save_obj(self, obj)
 
+    def save_many(self, objs):
+        """Saves many objects to the db at once. It forwards the call to the bcdb client.
+
+        Args:
+            objs (list[JSObjBase]): The objects to be saved.
+        """
+        self._assert_uniqueness_many(objs)
+        self.bcdb.save_many(self, objs)
+
     def _incr_id(self):
         """Increment the id counter and returns the newly incremented unique id.
 
@@ -22,7 +22,11 @@ JS-NG>
 """
 
 import hashlib
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+from jumpscale.sals.fs import scan_tree
 
 
 def encode_string(obj, encode):
@@ -31,6 +35,18 @@ def encode_string(obj, encode):
     return obj
 
 
+def iter_files(dir_name):
+    """yields paths of all files in a root folder (recursively)
+
+    Arguments:
+        dir_name (str) : the directory of the root folder
+
+    Yields:
+        str : file path
+    """
+    yield from scan_tree(dir_name, dirs=False)
+
+
 def get_list_files(dir_name):
     """returns a list of directories for all files in a root folder
 
@@ -40,21 +56,7 @@ def get_list_files(dir_name):
     Returns:
         all_files (list) : the list of directories for all files in the root folder
     """
-    # create a list of file and sub directories
-    # names in the given directory
-    files_list = os.listdir(dir_name)
-    all_files = list()
-    # Iterate over all the entries
-    for entry in files_list:
-        # Create full path
-        full_path = os.path.join(dir_name, entry)
-        # If entry is a directory then get the list of files in this directory
-        if os.path.isdir(full_path):
-            all_files = all_files + get_list_files(full_path)
-        else:
-            all_files.append(full_path)
-
-    return all_files
+    return list(iter_files(dir_name))
 
 
 def md5(string, encode="utf-8"):
@@ -301,18 +303,115 @@ def hash_file(path, hash_type):
         return h
 
 
-# TODO: review and allow ignore files e.g .swp, .. etc
-def hash_directory(root_dir, hash_type):
+def _load_hashes_cache(cache_path, hash_type):
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                return json.load(f).get(hash_type, {})
+        except ValueError:
+            pass
+    return {}
+
+
+def _save_hashes_cache(cache_path, hash_type, cache):
+    data = {}
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                data = json.load(f)
+        except ValueError:
+            pass
+    data[hash_type] = cache
+
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, cache_path)
+
+
+def hash_directory(root_dir, hash_type, workers=1, cache_path=None, exclude=None):
     """create hash string list for the files in a folder
 
+    files are hashed in parallel if `workers` is more than 1 (hashlib releases the GIL while hashing)
+
+    if `cache_path` is given, hashes are saved to it, and files with the same (inode, size, mtime) are not hashed again
+
     Arguments:
         root_dir (str) : the dir for the root folder
         hash_type (str) : the type of the hash
+        workers (int) : number of threads used for hashing (default: {1})
+        cache_path (str) : path of a cache file for hashes (default: {None})
+        exclude (list) : name patterns to exclude, e.g. [".git", "*.swp"] (default: {None})
 
     Returns:
         dict : the hashes dict, keys are full paths and values are hexdigests
     """
+    cache = _load_hashes_cache(cache_path, hash_type)
+    new_cache = {}
     hashes = {}
-    for d in get_list_files(root_dir):
-        hashes[d] = hash_file(d, hash_type).hexdigest()
+    to_hash = []
+    for path, stat in scan_tree(root_dir, dirs=False, exclude=exclude, with_stat=True):
+        key = [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+        cached = cache.get(path)
+        if cached and cached[:3] == key:
+            hashes[path] = cached[3]
+            new_cache[path] = cached
+        else:
+            to_hash.append((path, key))
+
+    def hash_one(path):
+        return hash_file(path, hash_type).hexdigest()
+
+    paths = [path for path, _ in to_hash]
+    if workers > 1 and len(paths) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            digests = list(executor.map(hash_one, paths))
+    else:
+        digests = [hash_one(path) for path in paths]
+
+    for (path, key), digest in zip(to_hash, digests):
+        hashes[path] = digest
+        new_cache[path] = key + [digest]
+
+    if cache_path:
+        _save_hashes_cache(cache_path, hash_type, new_cache)
     return hashes
+
+
+def hash_tree(root_dir, hash_type, workers=1, cache_path=None, exclude=None):
+    """create a single (merkle) hash for a folder, it changes if any file content, name or location changes
+
+    every directory hash is the hash of the sorted names and hashes of its children, files are hashed
+    using `hash_directory` (empty directories are not included)
+
+    Arguments:
+        root_dir (str) : the dir for the root folder
+        hash_type (str) : the type of the hash
+        workers (int) : number of threads used for hashing files (default: {1})
+        cache_path (str) : path of a cache file for file hashes (default: {None})
+        exclude (list) : name patterns to exclude, e.g. [".git", "*.swp"] (default: {None})
+
+    Returns:
+        str : hexdigest of the root folder
+    """
+    tree = {}
+    for path, digest in hash_directory(
+        root_dir, hash_type, workers=workers, cache_path=cache_path, exclude=exclude
+    ).items():
+        node = tree
+        parts = os.path.relpath(path, root_dir).split(os.sep)
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = digest
+
+    def hash_node(node):
+        h = hashlib.new(hash_type)
+        for name in sorted(node):
+            child = node[name]
+            if isinstance(child, dict):
+                h.update(b"d" + name.encode() + b"\0" + hash_node(child).encode() + b"\n")
+            else:
+                h.update(b"f" + name.encode() + b"\0" + child.encode() + b"\n")
+        return h.hexdigest()
+
+    return hash_node(tree)
@@ -23,6 +23,14 @@ class NACL:
         self.public_key = self.private_key.public_key
         self.symmetric_key = nacl.utils.random(NACL.KEY_SIZE) if symmetric_key is None else symmetric_key
         self.symmetric_box = SecretBox(self.symmetric_key)
+        # public key: Box, a box computes a shared key, which is expensive, so it's done once per peer
+        self._boxes = {}
+
+    def _get_box(self, public_key):
+        box = self._boxes.get(public_key)
+        if box is None:
+            box = self._boxes[public_key] = Box(self.private_key, PublicKey(public_key))
+        return box
 
     def encrypt(self, message, reciever_public_key):
         """Encrypt the message to send to a receiver. (public key encryption)
@@ -34,7 +42,7 @@ class NACL:
         Returns:
             bytes: The encrypted message
         """
-        return Box(self.private_key, PublicKey(reciever_public_key)).encrypt(message)
+        return self._get_box(reciever_public_key).encrypt(message)
 
     def decrypt(self, message, sender_public_key):
         """Decrypt a received message. (public key encryption)
@@ -46,7 +54,7 @@ class NACL:
         Returns:
             bytes: The decrypted message
         """
-        return Box(self.private_key, PublicKey(sender_public_key)).decrypt(message)
+        return self._get_box(sender_public_key).decrypt(message)
 
     def encrypt_symmetric(self, message):
         """Encrypt the message to send to a receiver. (secret key encryption)
@@ -1,3 +1,5 @@
+import fnmatch
+import os
 import tarfile
 
 
@@ -10,15 +12,30 @@ def istar(path):
     return tarfile.is_tarfile(path)
 
 
-def compress(source, output):
+def compress(source, output, exclude=None):
     """make an archive file from directory or file
 
     Arguments:
         source (str) : the path for the file or the directory
         output (str) : the path for the output
+        exclude (list) : name patterns to exclude, e.g. [".git", "*.pyc"], excluded directories are not walked,
+                         the source itself is not excluded
     """
+    tar_filter = None
+    if exclude:
+        # archive name of the source itself (the same as tarfile does), it's always added
+        root_name = os.path.splitdrive(source)[1].replace(os.sep, "/").lstrip("/")
+
+        def tar_filter(info):
+            if info.name == root_name:
+                return info
+            name = info.name.rsplit("/", 1)[-1]
+            if any(fnmatch.fnmatch(name, pattern) for pattern in exclude):
+                return None
+            return info
+
     with tarfile.open(output, "w") as output:
-        output.add(source)
+        output.add(source, filter=tar_filter)
 
 
 class Reader:
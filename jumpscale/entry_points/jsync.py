@@ -27,7 +27,9 @@ def list_ssh_clients():
 @click.option("--clients")
 @click.option("--paths")
 @click.option("--nosync", is_flag=True, default=False, type=bool)
-def sync(clients, paths, nosync=False):
+@click.option("--debounce", default=0.5, type=float, help="seconds to collect changes for before pushing them")
+@click.option("--full", is_flag=True, default=False, type=bool, help="upload all files on first sync, not only changed")
+def sync(clients, paths, nosync=False, debounce=0.5, full=False):
     clients = [cl_name.strip() for cl_name in clients.split(",")]
     paths_dict = {}
     for watched_path_info in paths.split(","):
@@ -40,8 +42,8 @@ def sync(clients, paths, nosync=False):
         paths_dict[src] = dest
 
     j.logger.info("clients: {}, paths {} ".format(clients, paths_dict))
-    syncer = j.tools.syncer.Syncer(clients, paths_dict)
-    syncer.start(sync=not nosync)
+    syncer = j.tools.syncer.Syncer(clients, paths_dict, debounce=debounce)
+    syncer.start(sync=not nosync, delta=not full)
 
 
 @click.group()
@@ -209,6 +209,15 @@ for el in walk_dirs('/tmp') : ..
 
 ```
 
+### Walk with excluded directories
+
+`scan_tree`, `walk_files` and `walk_dirs` use `os.scandir`, excluded directories (matched by name) are not walked at all,
+and stat results can be yielded too
+
+```
+for path, stat in walk_files('/tmp', exclude=[".git", "node_modules", "*.pyc"], with_stat=True) : ..
+```
+
 ### walk over with a bit complex filter
 
  Walk over paths that are files or dirs and longer than 4 characters in the name
@@ -222,6 +231,7 @@ There are more functionality available in the SAL `j.sals.fs` make sure you chec
 
 """
 
+import fnmatch
 import pathlib
 import tempfile
 import os
@@ -1019,44 +1029,86 @@ def walk_non_recursive(path: str, filter_fun=default_filter_fun):
             yield str(entry)
 
 
-def walk_files(path: str, recursive=True):
+def _is_excluded(name, exclude):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in exclude)
+
+
+def scan_tree(path: str, recursive=True, files=True, dirs=True, exclude=None, with_stat=False):
+    """walk over path using `os.scandir`, entry types are taken from directory entries (no extra stat per entry)
+    e.g
+
+        for el in scan_tree('/tmp', dirs=False, exclude=[".git", "node_modules", "*.pyc"]) : ..
+        for path, stat in scan_tree('/tmp', dirs=False, with_stat=True) : ..
+
+    Args:
+        path (str): path to walk over
+        recursive (bool, optional): recursive or not. Defaults to True.
+        files (bool, optional): yield files. Defaults to True.
+        dirs (bool, optional): yield directories. Defaults to True.
+        exclude (list, optional): patterns matched against entry names (e.g. `.git` or `*.pyc`),
+                                  an excluded directory is not descended into. Defaults to None.
+        with_stat (bool, optional): yield (path, os.stat_result) tuples instead of paths,
+                                    stat results are cached by the directory entries. Defaults to False.
+
+    Yields:
+        str or tuple: path, or (path, os.stat_result) if `with_stat` is set
+    """
+    exclude = exclude or []
+    to_scan = [path]
+    while to_scan:
+        with os.scandir(to_scan.pop()) as entries:
+            for entry in entries:
+                if exclude and _is_excluded(entry.name, exclude):
+                    continue
+
+                is_dir = entry.is_dir()
+                if is_dir and recursive and not entry.is_symlink():
+                    to_scan.append(entry.path)
+
+                if (is_dir and dirs) or (not is_dir and files and entry.is_file()):
+                    if with_stat:
+                        yield entry.path, entry.stat()
+                    else:
+                        yield entry.path
+
+
+def walk_files(path: str, recursive=True, exclude=None, with_stat=False):
     """
     walk over files in path and applies function `fun`
     e.g
 
         for el in walk_files('/tmp') : ..
+        for el in walk_files('/tmp', exclude=[".git", "*.pyc"]) : ..
 
     Args:
         path (str): path to walk over
         recursive (bool, optional): recursive or not. Defaults to True.
+        exclude (list, optional): name patterns to exclude, excluded directories are not walked. Defaults to None.
+        with_stat (bool, optional): yield (path, os.stat_result) tuples. Defaults to False.
 
 
     """
+    return scan_tree(path, recursive=recursive, dirs=False, exclude=exclude, with_stat=with_stat)
 
-    if recursive:
-        return walk(path, filter_fun=is_file)
-    else:
-        return walk_non_recursive(path, filter_fun=is_file)
 
-
-def walk_dirs(path, recursive=True):
+def walk_dirs(path, recursive=True, exclude=None, with_stat=False):
     """
         walk over directories in path and applies function `fun`
     e.g
 
         for el in walk_dirs('/tmp') : ..
+        for el in walk_dirs('/tmp', exclude=["node_modules"]) : ..
 
 
     Args:
         path (str): path to walk over
         recursive (bool, optional): recursive or not. Defaults to True.
+        exclude (list, optional): name patterns to exclude, excluded directories are not walked. Defaults to None.
+        with_stat (bool, optional): yield (path, os.stat_result) tuples. Defaults to False.
 
 
     """
-    if recursive:
-        return walk(path, filter_fun=is_dir)
-    else:
-        return walk_non_recursive(path, filter_fun=is_dir)
+    return scan_tree(path, recursive=recursive, files=False, exclude=exclude, with_stat=with_stat)
 
 
 def fs_check(**arguments):
@@ -79,6 +79,12 @@ Examples:
 
     # Terminate all processes owned by a given user name, fallback to SIGKILL when needed
     >>> j.sals.process.kill_user_processes('sameh', sure_kill=True)
+
+    # take a snapshot of all processes and connections once, then query it many times
+    >>> snapshot = j.sals.process.ProcessSnapshot()
+    >>> snapshot.get_pids('python3')
+    >>> snapshot.get_process_by_port(8000)
+    >>> j.sals.process.get_processes_info(limit=3, snapshot=snapshot)
     ```
 """
 
@@ -401,7 +407,21 @@ def check_stop(cmd, filterstr, retry=1, n_instances=0, timeout=2, delay=0.5):
     raise j.exceptions.Runtime(f"could not stop {cmd}, found {len(found)} of instances instead of {n_instances}")
 
 
-def get_pids(process_name, match_predicate=None, limit=0, _alt_source=None, include_zombie=False, full_cmd_line=False):
+def _get_status(proc):
+    """Get the status of a process, from the attributes fetched by `process_iter` if available"""
+    info = getattr(proc, "info", None) or {}
+    return info.get("status") or proc.status()
+
+
+def get_pids(
+    process_name,
+    match_predicate=None,
+    limit=0,
+    _alt_source=None,
+    include_zombie=False,
+    full_cmd_line=False,
+    snapshot=None,
+):
     """Return a list of processes ID(s) matching a given process name.
 
     Function will check string against Process.name(), Process.exe() and Process.cmdline()
@@ -417,6 +437,7 @@ def get_pids(process_name, match_predicate=None, limit=0, _alt_source=None, incl
         include_zombie (bool, optional): Whether to include pid for zombie proccesses or not. Defaults to False.
         full_cmd_line (bool, optional): The pattern is normally only matched against the process name.
             if full_cmd_line is set to True, the full command line is used. Defaults to False.
+        snapshot (ProcessSnapshot, optional): A snapshot to match against (if no `_alt_source` given). Defaults to None.
 
     Returns:
         list of int: List of the processes IDs.
@@ -428,7 +449,10 @@ def get_pids(process_name, match_predicate=None, limit=0, _alt_source=None, incl
         else:
             return target.strip().lower() == given.lower()
 
-    default_processes_source = psutil.process_iter(["name", "exe", "cmdline"])
+    if snapshot:
+        default_processes_source = snapshot.processes.values()
+    else:
+        default_processes_source = psutil.process_iter(["name", "exe", "cmdline", "status"])
 
     match_predicate = match_predicate or default_predicate
     p_source = _alt_source or default_processes_source
@@ -436,7 +460,7 @@ def get_pids(process_name, match_predicate=None, limit=0, _alt_source=None, incl
     pids = []
     for proc in p_source:
         try:
-            if not include_zombie and proc.status() == psutil.STATUS_ZOMBIE:
+            if not include_zombie and _get_status(proc) == psutil.STATUS_ZOMBIE:
                 # {proc.pid} is a zombie process, ignoring it
                 continue
 
@@ -503,8 +527,8 @@ def get_user_processes(user):
         psutil.Process: process object for all processes owned by `user`.
     """
     try:
-        for process in psutil.process_iter(["name", "exe", "cmdline"]):
-            if process.username() == user:
+        for process in psutil.process_iter(["name", "exe", "cmdline", "status", "username"]):
+            if process.info["username"] == user:
                 yield process
     except (psutil.AccessDenied, psutil.NoSuchProcess):
         pass
@@ -552,7 +576,7 @@ def get_similar_processes(target_proc=None):
             target_proc = get_my_process()
         elif isinstance(target_proc, int):
             target_proc = get_process_object(target_proc, die=True)
-        for proc in psutil.process_iter(["name", "exe", "cmdline"]):
+        for proc in psutil.process_iter(["name", "exe", "cmdline", "status"]):
             if proc.info["cmdline"] and target_proc.cmdline() and proc.info["cmdline"] == target_proc.cmdline():
                 yield proc
     except (psutil.AccessDenied, psutil.NoSuchProcess):
@@ -715,13 +739,14 @@ def is_port_listening(port, ipv6=False):
     return nettools.tcp_connection_test(ip6 if ipv6 else ip4, port, timeout=5)
 
 
-def get_process_by_port(port, ipv6=False, udp=False):
+def get_process_by_port(port, ipv6=False, udp=False, snapshot=None):
     """Returns the psutil.Process object that is listening on the given port.
 
     Args:
         port (int): The port for which to find the process.
         ipv6 (bool, optional): Whether to search the connections that using ipv6 instead of ipv4. Defaults to False.
         udp (bool, optional): Whether to search the connections for UDP port instead of TCP. Defaults to False.
+        snapshot (ProcessSnapshot, optional): A snapshot to search in, instead of listing connections. Defaults to None.
 
     Raises:
         j.exceptions.Runtime: pid is not retrievable.
@@ -731,39 +756,26 @@ def get_process_by_port(port, ipv6=False, udp=False):
     Returns:
         psutil.Process: process object if found, otherwise None
     """
-    for conn in psutil.net_connections():  # TODO use kind parameter
-        try:
-            # should we check against ESTABLISHED status?
-            # connection.status For UDP and UNIX sockets this is always going to be psutil.CONN_NONE
-            if (
-                conn.laddr.port == port
-                and conn.status in ["LISTEN", "NONE", "ESTABLISHED"]
-                and (conn.family.name == "AF_INET6") == ipv6
-                and (conn.type.name == "SOCK_DGRAM") == udp
-            ):
-                if conn.pid:
-                    return psutil.Process(conn.pid)
-                else:
-                    raise j.exceptions.Runtime("pid is not retrievable, not root?")
-        except psutil.NoSuchProcess:
-            raise j.exceptions.NotFound("Process is no longer exists")
-        except psutil.AccessDenied:
-            raise j.exceptions.Permission("Permission denied")
+    snapshot = snapshot or ProcessSnapshot(processes=False)
+    return snapshot.get_process_by_port(port, ipv6=ipv6, udp=udp)
 
 
-def get_defunct_processes():
+def get_defunct_processes(snapshot=None):
     """Gets defunct (zombie) processes.
 
+    Args:
+        snapshot (ProcessSnapshot, optional): A snapshot to search in. Defaults to None.
+
     Returns:
         list of int: List of processes ID(s).
     """
+    if snapshot:
+        return snapshot.get_defunct_processes()
+
     zombie_pids = []
-    for proc in psutil.process_iter():
-        try:
-            if proc.status() == psutil.STATUS_ZOMBIE:
-                zombie_pids.append(proc.pid)
-        except (psutil.AccessDenied, psutil.NoSuchProcess):
-            pass
+    for proc in psutil.process_iter(["status"]):
+        if proc.info["status"] == psutil.STATUS_ZOMBIE:
+            zombie_pids.append(proc.pid)
     return zombie_pids
 
 
@@ -776,7 +788,7 @@ def get_processes():
     yield from psutil.process_iter()
 
 
-def get_processes_info(user=None, sort="mem", filterstr=None, limit=25, desc=True):
+def get_processes_info(user=None, sort="mem", filterstr=None, limit=25, desc=True, snapshot=None):
     """Get information for top running processes sorted by memory usage or CPU usage.
 
     Args:
@@ -800,6 +812,7 @@ def get_processes_info(user=None, sort="mem", filterstr=None, limit=25, desc=Tru
         filterstr (str, optional): the string to match against process name or command used and filter the results based on.
         limit (int, optional): limit the results to specific number of processes, to disable set it to -1. Defaults to 25.
         desc (bool, optional): whether to sort the data returned in descending order or not. Defaults to True.
+        snapshot (ProcessSnapshot, optional): A snapshot to get the info from. Defaults to None.
 
     Returns:
         dict: processes info as a dictionary
@@ -821,82 +834,11 @@ def get_processes_info(user=None, sort="mem", filterstr=None, limit=25, desc=Tru
                     "ports"
                 ]
     """
+    snapshot = snapshot or ProcessSnapshot()
+    return snapshot.get_processes_info(user=user, sort=sort, filterstr=filterstr, limit=limit, desc=desc)
 
-    def _get_sort_key(procObj):
-        if sort == "mem":
-            return procObj["rss"]
-        if sort == "cpu_times":
-            return procObj["cpu_time"]
-        elif sort in ["gids", "egid"]:
-            return procObj["gids"].effective
-        elif sort in ["uids", "euid"]:
-            return procObj["uids"].effective
-        else:
-            try:
-                return procObj[sort]
-            except KeyError:
-                j.logger.error(f"bad field name for sorting: {sort}")
-                raise j.exceptions.Value(f"bad field name for sorting: {sort}")
 
-    processes_list = []
-    if not filterstr:
-        if user:
-            p_source = get_user_processes(user=user)
-        else:
-            p_source = get_processes()
-    else:
-        # it makes sense that get_pids func should returns list of psutil.Process objects instead of list of pids
-        if user:
-            p_source = map(get_process_object, get_pids(process_name=filterstr, _alt_source=get_user_processes(user)))
-        else:
-            p_source = map(get_process_object, get_pids(process_name=filterstr))
-    for proc in p_source:
-        if proc:  # in case a race condition happened, and get_process_object returned None
-            try:
-                # Fetch process details as dict
-                pinfo = proc.as_dict(
-                    attrs=[
-                        "cpu_num",
-                        "cpu_percent",
-                        "cpu_times",
-                        "create_time",
-                        "gids",
-                        "memory_percent",
-                        "name",
-                        "pid",
-                        "ppid",
-                        "status",
-                        "uids",
-                        "username",
-                    ]
-                )
-                pinfo["rss"] = proc.memory_info().rss / (
-                    1024 * 1024
-                )  # the non-swapped physical memory a process has used in Mb
-                pinfo["cpu_time"] = sum(pinfo["cpu_times"][:2])  # cumulative, excluding children and iowait
-                pinfo["ports"] = []
-                try:
-                    connections = proc.connections()  # need root
-                except (psutil.AccessDenied):
-                    pass
-                else:
-                    if connections:
-                        for conn in connections:
-                            pinfo["ports"].append({"port": conn.laddr.port, "status": conn.status})
-                # Append dict to list
-                processes_list.append(pinfo)
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
-                j.logger.exception(
-                    "ignoring and logging an exception that occurred while iterating over system processes, not root?",
-                    exception=e,
-                )
-                pass
-    # sort the processes list by sort_key
-    sorted_processes = sorted(processes_list, key=_get_sort_key, reverse=desc)[:limit]
-    return sorted_processes
-
-
-def get_ports_mapping(status=psutil.CONN_LISTEN):
+def get_ports_mapping(status=psutil.CONN_LISTEN, snapshot=None):
     """Get a mapping for process to ports with a status filter
 
     It will skip any process in case of errors (e.g. permission error)
@@ -910,24 +852,239 @@ def get_ports_mapping(status=psutil.CONN_LISTEN):
 
     Args:
         status (psutil.CONN_CONSTANT): `psutil` CONN_* constant as a filter. Defaults to psutil.CONN_LISTEN.
+        snapshot (ProcessSnapshot, optional): A snapshot to get the mapping from. Defaults to None.
 
     Returns:
         defaultdict: a mapping between process and ports
     """
-    ports = defaultdict(list)
+    snapshot = snapshot or ProcessSnapshot()
+    return snapshot.get_ports_mapping(status=status)
 
-    for process in get_processes():
-        try:
-            connections = process.connections()
-        except psutil.Error:
-            continue
+
+class ProcessSnapshot:
+    """A snapshot of all running processes and their connections, taken in a single pass
+
+    All process attributes are fetched with one `psutil.process_iter(attrs=...)` pass, and all connections
+    with one system-wide `psutil.net_connections()` call, then indexed by pid, name, user and port,
+    so many queries can be done on the same snapshot without any more system calls.
+
+    Example:
+        >>> snapshot = j.sals.process.ProcessSnapshot()
+        >>> snapshot.get_pids("redis-server")
+        >>> snapshot.get_process_by_port(6379)
+        >>> snapshot.get_processes_info(sort="cpu_time", limit=3)
+        >>> snapshot.get_ports_mapping()
+    """
+
+    ATTRS = [
+        "cmdline",
+        "cpu_num",
+        "cpu_percent",
+        "cpu_times",
+        "create_time",
+        "exe",
+        "gids",
+        "memory_info",
+        "memory_percent",
+        "name",
+        "pid",
+        "ppid",
+        "status",
+        "uids",
+        "username",
+    ]
+
+    def __init__(self, processes=True, connections=True):
+        """Take a new snapshot
+
+        Args:
+            processes (bool, optional): Whether to collect processes or not. Defaults to True.
+            connections (bool, optional): Whether to collect connections or not. Defaults to True.
+        """
+        self.taken_at = time.time()
+        # pid: psutil.Process (with attributes in `info`)
+        self.processes = {}
+        self.by_name = defaultdict(list)
+        self.by_user = defaultdict(list)
+        self.connections = []
+        self.connections_by_pid = defaultdict(list)
+        self.connections_by_port = defaultdict(list)
+
+        if processes:
+            for proc in psutil.process_iter(self.ATTRS):
+                self.processes[proc.pid] = proc
+                self.by_name[proc.info["name"]].append(proc)
+                self.by_user[proc.info["username"]].append(proc)
 
         if connections:
+            try:
+                self.connections = psutil.net_connections()
+            except psutil.AccessDenied:
+                # e.g. on macOS, system-wide connections need root
+                j.logger.warning("cannot list system-wide connections, not root?")
+
+            for conn in self.connections:
+                if conn.pid:
+                    self.connections_by_pid[conn.pid].append(conn)
+                if conn.laddr:
+                    self.connections_by_port[conn.laddr.port].append(conn)
+
+    def get_process(self, pid):
+        """Get a process by pid
+
+        Args:
+            pid (int): Process ID
+
+        Returns:
+            psutil.Process or None: process object (with attributes in `info`) if found, otherwise None
+        """
+        return self.processes.get(pid)
+
+    def get_processes_by_name(self, name):
+        """Get processes with exactly the given name
+
+        Args:
+            name (str): process name
+
+        Returns:
+            list of psutil.Process: processes
+        """
+        return list(self.by_name.get(name, []))
+
+    def get_user_processes(self, user):
+        """Get all processes of a specific user
+
+        Args:
+            user (str): The user name to match against.
+
+        Returns:
+            list of psutil.Process: processes owned by `user`
+        """
+        return list(self.by_user.get(user, []))
+
+    def get_pids(self, process_name, match_predicate=None, limit=0, include_zombie=False, full_cmd_line=False):
+        """Return a list of processes ID(s) matching a given process name, see `get_pids`
+
+        Returns:
+            list of int: List of the processes IDs.
+        """
+        return get_pids(
+            process_name,
+            match_predicate=match_predicate,
+            limit=limit,
+            include_zombie=include_zombie,
+            full_cmd_line=full_cmd_line,
+            snapshot=self,
+        )
+
+    def get_defunct_processes(self):
+        """Gets defunct (zombie) processes.
+
+        Returns:
+            list of int: List of processes ID(s).
+        """
+        return [pid for pid, proc in self.processes.items() if proc.info["status"] == psutil.STATUS_ZOMBIE]
+
+    def get_process_by_port(self, port, ipv6=False, udp=False):
+        """Returns the psutil.Process object that is listening on the given port, see `get_process_by_port`
+
+        Raises:
+            j.exceptions.Runtime: pid is not retrievable.
+            j.exceptions.NotFound: if the process is no longer exists.
+            j.exceptions.Permission: if the process is not accessible by the user.
+
+        Returns:
+            psutil.Process: process object if found, otherwise None
+        """
+        for conn in self.connections_by_port.get(port, []):
+            # should we check against ESTABLISHED status?
+            # connection.status For UDP and UNIX sockets this is always going to be psutil.CONN_NONE
+            if (
+                conn.status in ["LISTEN", "NONE", "ESTABLISHED"]
+                and (conn.family.name == "AF_INET6") == ipv6
+                and (conn.type.name == "SOCK_DGRAM") == udp
+            ):
+                if not conn.pid:
+                    raise j.exceptions.Runtime("pid is not retrievable, not root?")
+                if conn.pid in self.processes:
+                    return self.processes[conn.pid]
+                try:
+                    return psutil.Process(conn.pid)
+                except psutil.NoSuchProcess:
+                    raise j.exceptions.NotFound("Process is no longer exists")
+                except psutil.AccessDenied:
+                    raise j.exceptions.Permission("Permission denied")
+
+    def get_ports_mapping(self, status=psutil.CONN_LISTEN):
+        """Get a mapping for process to ports with a status filter
+
+        Args:
+            status (psutil.CONN_CONSTANT): `psutil` CONN_* constant as a filter. Defaults to psutil.CONN_LISTEN.
+
+        Returns:
+            defaultdict: a mapping between process and ports
+        """
+        ports = defaultdict(list)
+        for pid, connections in self.connections_by_pid.items():
+            process = self.processes.get(pid)
+            if not process:
+                continue
             for conn in connections:
                 if conn.status == status:
                     ports[process].append(conn.laddr.port)
+        return ports
+
+    def get_processes_info(self, user=None, sort="mem", filterstr=None, limit=25, desc=True):
+        """Get information for top running processes sorted by memory usage or CPU usage, see `get_processes_info`
+
+        Returns:
+            list of dict: processes info
+        """
+
+        def _get_sort_key(procObj):
+            if sort == "mem":
+                return procObj["rss"]
+            if sort == "cpu_times":
+                return procObj["cpu_time"]
+            elif sort in ["gids", "egid"]:
+                return procObj["gids"].effective
+            elif sort in ["uids", "euid"]:
+                return procObj["uids"].effective
+            else:
+                try:
+                    return procObj[sort]
+                except KeyError:
+                    j.logger.error(f"bad field name for sorting: {sort}")
+                    raise j.exceptions.Value(f"bad field name for sorting: {sort}")
+
+        if user:
+            p_source = self.get_user_processes(user)
+        else:
+            p_source = list(self.processes.values())
+        if filterstr:
+            pids = set(get_pids(process_name=filterstr, _alt_source=p_source))
+            p_source = [proc for proc in p_source if proc.pid in pids]
+
+        processes_list = []
+        for proc in p_source:
+            if proc.info["memory_info"] is None or proc.info["cpu_times"] is None:
+                # attributes are not accessible, not root?
+                continue
 
-    return ports
+            pinfo = {attr: proc.info[attr] for attr in self.ATTRS if attr not in ("cmdline", "exe", "memory_info")}
+            # the non-swapped physical memory a process has used in Mb
+            pinfo["rss"] = proc.info["memory_info"].rss / (1024 * 1024)
+            pinfo["cpu_time"] = sum(pinfo["cpu_times"][:2])  # cumulative, excluding children and iowait
+            pinfo["ports"] = [
+                {"port": conn.laddr.port, "status": conn.status} for conn in self.connections_by_pid.get(proc.pid, [])
+            ]
+            processes_list.append(pinfo)
+
+        # sort the processes list by sort_key
+        sorted_processes = sorted(processes_list, key=_get_sort_key, reverse=desc)
+        if limit < 0:
+            return sorted_processes
+        return sorted_processes[:limit]
 
 
 def get_memory_usage():
@@ -1,5 +1,15 @@
 from jumpscale.loader import j
+from collections import OrderedDict, deque
+import atexit
 import gevent
+import threading
+import time
+
+# how many alerts are fetched at once (using HMGET) while searching
+FIND_BATCH_SIZE = 100
+
+# max number of (most recent) tracebacks kept per alert
+MAX_TRACEBACKS = 5
 
 
 def _get_identifier(app_name, message, public_message, category, alert_type):
@@ -38,18 +48,62 @@ class Alert:
     def json(self):
         return self.__dict__
 
+    @property
+    def pids(self):
+        return {traceback["process_id"] for traceback in self.tracebacks if traceback and "process_id" in traceback}
+
     def dumps(self):
         return j.data.serializers.json.dumps(self.__dict__)
 
 
+class PendingOccurrences:
+    """Occurrences of the same alert that are coalesced in memory and not written yet"""
+
+    def __init__(self, app_name, message, public_message, category, alert_type, level, timestamp):
+        self.app_name = app_name
+        self.message = message
+        self.public_message = public_message
+        self.category = category
+        self.alert_type = alert_type
+        self.level = level
+        self.count = 0
+        self.first_occurrence = timestamp
+        self.last_occurrence = timestamp
+        self.tracebacks = deque(maxlen=MAX_TRACEBACKS)
+
+    def add(self, level, timestamp, traceback=None):
+        self.count += 1
+        self.level = level
+        self.last_occurrence = timestamp
+        if traceback:
+            self.tracebacks.append(traceback)
+
+
 class AlertsHandler:
     def __init__(self):
         self._rkey = "alerts"
         self._rkey_id = "alerts:id"
         self._rkey_incr = "alerts:id:incr"
+        # secondary indexes: all ids, first/last occurrence (sorted sets) and a set of ids per app name, category or pid
+        self._rkey_index_ids = "alerts:index:ids"
+        self._rkey_index_first = "alerts:index:first_occurrence"
+        self._rkey_index_last = "alerts:index:last_occurrence"
+        self._rkey_index_set = "alerts:index:%s:%s"
+        # names of all index sets, to be able to delete them
+        self._rkey_index_sets = "alerts:index:sets"
         self._db = None
         self.handlers = []
 
+        # if set (in seconds), repeated occurrences of the same alert inside this window are counted in memory
+        # and written once when the window ends, instead of rewriting the alert on every occurrence
+        self.coalesce_window = (j.config.get("alerts") or {}).get("coalesce_window", 0)
+        self._pending = {}
+        # identifier -> time of the last write (not coalesced), ordered by time, oldest first
+        self._last_written = OrderedDict()
+        self._pending_lock = threading.Lock()
+        self._flush_timer = None
+        atexit.register(self.flush)
+
     def __dir__(self):
         return ("get", "find", "alert_raise", "count", "reset", "delete", "delete_all")
 
@@ -85,6 +139,117 @@ class AlertsHandler:
         if die:
             raise j.core.exceptions.NotFound("Requested alert is not found")
 
+    def _get_index_set_keys(self, alert: Alert) -> set:
+        """Gets the keys of all index sets this alert belongs to
+
+        Arguments:
+            alert {Alert} -- alert object
+
+        Returns:
+            set -- index set keys
+        """
+        keys = {
+            self._rkey_index_set % ("app_name", (alert.app_name or "").strip().lower()),
+            self._rkey_index_set % ("category", (alert.category or "").strip().lower()),
+        }
+        keys.update(self._rkey_index_set % ("pid", pid) for pid in alert.pids)
+        return keys
+
+    def _index(self, pipeline, alert: Alert, old_set_keys: set = None):
+        """Adds index updates of an alert to the given pipeline
+
+        Arguments:
+            pipeline -- redis pipeline
+            alert {Alert} -- alert object
+
+        Keyword Arguments:
+            old_set_keys {set} -- index set keys of the alert before updating it (default: {None})
+        """
+        pipeline.zadd(self._rkey_index_ids, {alert.id: alert.id})
+        pipeline.zadd(self._rkey_index_first, {alert.id: alert.first_occurrence})
+        pipeline.zadd(self._rkey_index_last, {alert.id: alert.last_occurrence})
+
+        set_keys = self._get_index_set_keys(alert)
+        for key in (old_set_keys or set()) - set_keys:
+            pipeline.srem(key, alert.id)
+        for key in set_keys:
+            pipeline.sadd(key, alert.id)
+        pipeline.sadd(self._rkey_index_sets, *set_keys)
+
+    def _unindex(self, pipeline, alert: Alert):
+        """Adds removing an alert from indexes to the given pipeline
+
+        Arguments:
+            pipeline -- redis pipeline
+            alert {Alert} -- alert object
+        """
+        pipeline.zrem(self._rkey_index_ids, alert.id)
+        pipeline.zrem(self._rkey_index_first, alert.id)
+        pipeline.zrem(self._rkey_index_last, alert.id)
+        for key in self._get_index_set_keys(alert):
+            pipeline.srem(key, alert.id)
+
+    def _delete_index(self, pipeline):
+        set_keys = self.db.smembers(self._rkey_index_sets)
+        pipeline.delete(self._rkey_index_ids, self._rkey_index_first, self._rkey_index_last, self._rkey_index_sets)
+        if set_keys:
+            pipeline.delete(*set_keys)
+
+    def rebuild_index(self):
+        """Rebuilds all alert indexes from stored alerts, it's done automatically if the index is missing or incomplete"""
+        pipeline = self.db.pipeline()
+        self._delete_index(pipeline)
+        for _, value in self.db.hscan_iter(self._rkey):
+            self._index(pipeline, Alert.loads(value))
+        pipeline.execute()
+
+    def _ensure_index(self):
+        """Rebuilds the index if it does not cover all alerts (e.g. alerts saved by an older version)"""
+        pipeline = self.db.pipeline(transaction=False)
+        pipeline.zcard(self._rkey_index_ids)
+        pipeline.hlen(self._rkey)
+        indexed_count, alerts_count = pipeline.execute()
+        if indexed_count != alerts_count:
+            self.rebuild_index()
+
+    def _find_ids(
+        self, app_name: str, category: str, pid: int, start_time: int, end_time: int, cursor: int, limit: int
+    ) -> list:
+        """Gets candidate alert ids (sorted) using the indexes
+
+        if no filters are given, ids are paginated by redis directly (using the cursor and limit)
+
+        Returns:
+            list -- alert ids
+        """
+        set_keys = []
+        if app_name:
+            set_keys.append(self._rkey_index_set % ("app_name", app_name))
+        if category:
+            set_keys.append(self._rkey_index_set % ("category", category))
+        if pid:
+            set_keys.append(self._rkey_index_set % ("pid", pid))
+
+        min_id = f"({cursor}" if cursor else "-inf"
+        if not (set_keys or start_time or end_time):
+            if limit:
+                return [int(x) for x in self.db.zrangebyscore(self._rkey_index_ids, min_id, "+inf", start=0, num=limit)]
+            return [int(x) for x in self.db.zrangebyscore(self._rkey_index_ids, min_id, "+inf")]
+
+        pipeline = self.db.pipeline(transaction=False)
+        if set_keys:
+            pipeline.sinter(*set_keys)
+        if start_time:
+            pipeline.zrangebyscore(self._rkey_index_first, "-inf", start_time)
+        if end_time:
+            pipeline.zrangebyscore(self._rkey_index_last, end_time, "+inf")
+
+        results = [set(result) for result in pipeline.execute()]
+        ids = {int(x) for x in set.intersection(*results)}
+        if cursor:
+            ids = {x for x in ids if x > cursor}
+        return sorted(ids)
+
     def find(
         self,
         app_name: str = "",
@@ -93,10 +258,16 @@ class AlertsHandler:
         pid: int = None,
         start_time: int = None,
         end_time: int = None,
+        cursor: int = None,
+        limit: int = None,
     ) -> list:
 
         """Find alerts
 
+        Alerts are filtered using the indexes, and only matching alerts are fetched.
+
+        For pagination, pass the id of the last alert of current page as the `cursor` of the next page.
+
         Keyword Arguments:
             app_name (str):  filter by allert app name (default: {""})
             category {str} -- filter by alert category (default: {""})
@@ -104,47 +275,39 @@ class AlertsHandler:
             pid {int} -- filter by process id (default: {None})
             start_time {int} -- filter by start time (default: {None})
             end_time {int} -- filter by end time (default: {None})
+            cursor {int} -- only get alerts with ids greater than the cursor (default: {None})
+            limit {int} -- max number of alerts to get (default: {None})
 
         Returns:
-            list of Alert objects
+            list of Alert objects (sorted by id)
         """
 
         app_name = app_name.strip().lower()
         category = category.strip().lower()
         message = message.strip().lower()
 
-        alerts = []
-        items = self.db.hscan_iter(self._rkey)
-
-        for item in items:
-            alert = Alert.loads(item[1])
-
-            if app_name and app_name != alert.app_name.strip().lower():
-                continue
+        self._ensure_index()
+        # the message is not indexed, the limit is only applied after filtering by message
+        ids = self._find_ids(app_name, category, pid, start_time, end_time, cursor, None if message else limit)
 
-            if category and category != alert.category.strip().lower():
-                continue
-
-            if message and (
-                message not in alert.message.strip().lower() and message not in alert.public_message.strip().lower()
-            ):
-                continue
-
-            if start_time and start_time < alert.first_occurrence:
-                continue
-
-            if end_time and end_time > alert.last_occurrence:
-                continue
+        alerts = []
+        for batch_start in range(0, len(ids), FIND_BATCH_SIZE):
+            batch_ids = ids[batch_start : batch_start + FIND_BATCH_SIZE]
+            for value in self.db.hmget(self._rkey, batch_ids):
+                if not value:
+                    continue
 
-            if pid:
-                for traceback in alert.tracebacks:
-                    if traceback["process_id"] == pid:
-                        break
-                else:
+                alert = Alert.loads(value)
+                if message and (
+                    message not in alert.message.strip().lower() and message not in alert.public_message.strip().lower()
+                ):
                     continue
 
-            alerts.append(alert)
-        return sorted(alerts, key=lambda alert: alert.id)
+                alerts.append(alert)
+                if limit and len(alerts) >= limit:
+                    return alerts
+
+        return alerts
 
     def alert_raise(
         self,
@@ -172,14 +335,79 @@ class AlertsHandler:
             traceback {dict} -- alert traceback (default: {None})
 
         Returns:
-            Alert -- alert object
+            Alert -- alert object (if the occurrence is coalesced with others, the stored alert with not written
+            occurrences applied)
         """
         if not self.db.is_running():
             return
 
+        timestamp = timestamp or j.data.time.now().timestamp
+        occurrences = PendingOccurrences(app_name, message, public_message, category, alert_type, level, timestamp)
+        occurrences.add(level, timestamp, traceback)
+
         identifier = _get_identifier(app_name, message, public_message, category, alert_type)
+        if self.coalesce_window:
+            now = time.monotonic()
+            with self._pending_lock:
+                pending = self._pending.get(identifier)
+                if pending:
+                    pending.add(level, timestamp, traceback)
+                else:
+                    last_written = self._last_written.get(identifier)
+                    if last_written and now - last_written < self.coalesce_window:
+                        # a repeated occurrence inside the window, write it later with others
+                        pending = self._pending[identifier] = occurrences
+                        self._schedule_flush()
+                    else:
+                        self._set_last_written(identifier, now)
+
+            if pending:
+                return self._get_coalesced(identifier, pending)
+
+        alert = self._write_occurrences(identifier, occurrences)
+        self._call_handlers(alert)
+        return alert
+
+    def _write_occurrences(self, identifier: str, occurrences: PendingOccurrences) -> Alert:
+        """Applies (one or more) occurrences to the stored alert and saves it
+
+        Arguments:
+            identifier {str} -- alert identifier
+            occurrences {PendingOccurrences} -- occurrences
+
+        Returns:
+            Alert -- alert object
+        """
+        alert = self.get(identifier=identifier, die=False) or Alert()
+        old_index_set_keys = self._get_index_set_keys(alert) if alert.id else None
+        self._apply_occurrences(alert, occurrences)
+        self._save(alert, old_index_set_keys)
+        return alert
+
+    def _get_coalesced(self, identifier: str, occurrences: PendingOccurrences) -> Alert:
+        """Gets the stored alert with coalesced occurrences applied (without saving it)
+
+        Arguments:
+            identifier {str} -- alert identifier
+            occurrences {PendingOccurrences} -- pending occurrences
+
+        Returns:
+            Alert -- alert object
+        """
         alert = self.get(identifier=identifier, die=False) or Alert()
+        with self._pending_lock:
+            # if flushed meanwhile, the stored alert has them already
+            if self._pending.get(identifier) is occurrences:
+                self._apply_occurrences(alert, occurrences)
+        return alert
+
+    def _apply_occurrences(self, alert: Alert, occurrences: PendingOccurrences):
+        """Applies (one or more) occurrences to an alert object
 
+        Arguments:
+            alert {Alert} -- alert object
+            occurrences {PendingOccurrences} -- occurrences
+        """
         if alert.id:
             if alert.status == "new":
                 alert.status = "open"
@@ -187,27 +415,81 @@ class AlertsHandler:
                 alert.status = "reopened"
         else:
             alert.status = "new"
-            alert.first_occurrence = timestamp or j.data.time.now().timestamp
+            alert.first_occurrence = occurrences.first_occurrence
 
-        alert.app_name = app_name
-        alert.category = category
-        alert.message = message
-        alert.public_message = public_message
-        alert.level = level
-        alert.type = alert_type
-        alert.count += 1
-        alert.last_occurrence = timestamp or j.data.time.now().timestamp
+        alert.app_name = occurrences.app_name
+        alert.category = occurrences.category
+        alert.message = occurrences.message
+        alert.public_message = occurrences.public_message
+        alert.level = occurrences.level
+        alert.type = occurrences.alert_type
+        alert.count += occurrences.count
+        alert.last_occurrence = occurrences.last_occurrence
 
-        if traceback:
-            if len(alert.tracebacks) > 5:
-                alert.tracebacks.pop(0)
-
-        alert.tracebacks.append(traceback)
-        self._save(alert)
-        for handler_func, handler_level in self.handlers:
-            if level >= handler_level:
-                gevent.spawn(handler_func, alert)
-        return alert
+        # keep only the most recent tracebacks, so the alert size stays bounded
+        alert.tracebacks = [traceback for traceback in alert.tracebacks if traceback]
+        alert.tracebacks.extend(occurrences.tracebacks)
+        del alert.tracebacks[:-MAX_TRACEBACKS]
+
+    def _call_handlers(self, alert: Alert) -> list:
+        """Calls registered handlers of alert level (each in a new greenlet)
+
+        Arguments:
+            alert {Alert} -- alert object
+
+        Returns:
+            list -- spawned greenlets
+        """
+        return [
+            gevent.spawn(handler_func, alert)
+            for handler_func, handler_level in self.handlers
+            if alert.level >= handler_level
+        ]
+
+    def _set_last_written(self, identifier: str, now: float):
+        """Sets the last write time of an alert, and forgets alerts that were not written inside the window
+        (should be called with the lock)
+
+        Arguments:
+            identifier {str} -- alert identifier
+            now {float} -- current (monotonic) time
+        """
+        self._last_written[identifier] = now
+        self._last_written.move_to_end(identifier)
+        # oldest first, so only expired entries are visited
+        while self._last_written:
+            oldest_identifier, last_written = next(iter(self._last_written.items()))
+            if now - last_written <= self.coalesce_window:
+                break
+            del self._last_written[oldest_identifier]
+
+    def _schedule_flush(self):
+        """Schedules writing pending occurrences when the current window ends (should be called with the lock)"""
+        if not self._flush_timer:
+            self._flush_timer = threading.Timer(self.coalesce_window, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """Writes all pending (coalesced) occurrences now"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+
+            now = time.monotonic()
+            for identifier in pending:
+                self._set_last_written(identifier, now)
+
+        greenlets = []
+        for identifier, occurrences in pending.items():
+            alert = self._write_occurrences(identifier, occurrences)
+            greenlets.extend(self._call_handlers(alert))
+
+        if threading.current_thread() is not threading.main_thread():
+            # e.g. the flush timer thread, nothing else would run the handlers' greenlets
+            gevent.joinall(greenlets)
 
     def count(self) -> int:
         """Gets alerts count
@@ -217,17 +499,23 @@ class AlertsHandler:
         """
         return self.db.hlen(self._rkey)
 
-    def _save(self, alert: Alert):
-        """Saves alert object in db
+    def _save(self, alert: Alert, old_index_set_keys: set = None):
+        """Saves alert object in db and updates the indexes
 
         Arguments:
             alert {Alert} -- alert object
+
+        Keyword Arguments:
+            old_index_set_keys {set} -- index set keys of the alert before updating it (default: {None})
         """
         if not alert.id:
             alert.id = self.db.incr(self._rkey_incr)
 
-        self.db.hset(self._rkey, alert.id, alert.dumps())
-        self.db.hset(self._rkey_id, alert.identifier, alert.id)
+        pipeline = self.db.pipeline()
+        pipeline.hset(self._rkey, alert.id, alert.dumps())
+        pipeline.hset(self._rkey_id, alert.identifier, alert.id)
+        self._index(pipeline, alert, old_index_set_keys)
+        pipeline.execute()
 
     def delete(self, alert_id: int = None, identifier: str = None):
         """Delete alert by its id or identifier
@@ -242,13 +530,19 @@ class AlertsHandler:
         if not (alert_id or identifier):
             raise j.core.exceptions.Value("Either alert id or alert identifier are required")
 
-        alert_id = alert_id or self.db.hget(self._rkey_id, identifier)
-        if alert_id:
-            self.db.hdel(self._rkey, alert_id)
+        alert = self.get(alert_id=alert_id, identifier=identifier, die=False)
+        if alert:
+            pipeline = self.db.pipeline()
+            pipeline.hdel(self._rkey, alert.id)
+            self._unindex(pipeline, alert)
+            pipeline.execute()
 
     def delete_all(self):
         """Deletes all alerts"""
-        self.db.delete(self._rkey, self._rkey_id)
+        pipeline = self.db.pipeline()
+        pipeline.delete(self._rkey, self._rkey_id)
+        self._delete_index(pipeline)
+        pipeline.execute()
 
     def reset(self):
         """Delete all alerts and reset the db"""
@@ -27,13 +27,73 @@ If it matches any of the above you would be able to perform available on that pr
 - Special cases
 
 you can add cmd.ports, cmd.process_strings_regex or cmd.process_strings_regex to reach the process pid
+
+- Waiting for start/stop
+
+`wait_for_running` and `wait_for_stop` poll with an exponential backoff (from `WAIT_MIN_DELAY` to `WAIT_MAX_DELAY` seconds).
+If `ports` are set, the command is ready as soon as all ports accept tcp connections, otherwise processes are looked up
+using a single snapshot of processes and connections per check. When the process is known, stopping is detected
+by waiting on the process itself (using a pidfd where available) instead of polling.
 """
+import os
+import re
+import select
+import time
 from enum import Enum
+
+import psutil
+from psutil import NoSuchProcess
+
 from jumpscale.loader import j
 from jumpscale.core.base import Base, fields
 
-import time
-from psutil import NoSuchProcess
+# first and max delay in seconds between checks while waiting for start/stop
+WAIT_MIN_DELAY = 0.05
+WAIT_MAX_DELAY = 1
+# timeout in seconds of tcp connection checks of ports
+PORT_CHECK_TIMEOUT = 0.5
+
+
+def _wait_for_exit(process, timeout):
+    """Wait for a process to exit, without polling where possible
+
+    A pidfd (linux >= 5.3) becomes readable when the process exits, then `psutil.Process.wait` is used to reap it
+    if it's our child (otherwise it would stay as a zombie), for other platforms, `psutil.Process.wait` is used
+    directly (it waits on children and polls others with backoff).
+
+    Args:
+        process (psutil.Process): process
+        timeout (float): timeout in seconds
+
+    Returns:
+        bool: True if the process exited
+    """
+    pidfd_open = getattr(os, "pidfd_open", None)
+    if pidfd_open:
+        try:
+            pidfd = pidfd_open(process.pid)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pidfd = None
+
+        if pidfd is not None:
+            try:
+                ready, _, _ = select.select([pidfd], [], [], max(timeout, 0))
+            finally:
+                os.close(pidfd)
+
+            if not ready:
+                return False
+            timeout = 0
+
+    try:
+        process.wait(timeout)
+    except psutil.TimeoutExpired:
+        return False
+    except (NoSuchProcess, ChildProcessError):
+        pass
+    return True
 
 
 class Executor(Enum):
@@ -106,6 +166,8 @@ class StartupCmd(Base):
     def _get_processes_by_port_or_filter(self):
         """Uses object properties to find the corresponding process(es)
 
+        All ports and filters are looked up in a single snapshot of processes and connections.
+
         Returns:
             list: All processes that matched
         """
@@ -118,26 +180,70 @@ class StartupCmd(Base):
                 result.append(process)
                 pids_done.append(process.pid)
 
+        has_filters = bool(self.process_strings or self.process_strings_regex)
+        if not (self.ports or has_filters):
+            return result
+
+        snapshot = j.sals.process.ProcessSnapshot(processes=has_filters, connections=bool(self.ports))
         for port in self.ports:
             try:
-                process = j.sals.process.get_process_by_port(port)
+                process = snapshot.get_process_by_port(port)
             except Exception:
                 continue
 
             _add_to_result(process)
 
-        for process_string in self.process_strings:
-            for pid in j.sals.process.get_filtered_pids(process_string):
-                process = j.sals.process.get_process_object(pid, die=False)
-                _add_to_result(process)
+        for process in snapshot.processes.values():
+            if not process.info["cmdline"]:
+                continue
 
-        for pid in j.sals.process.get_pids_filtered_by_regex(self.process_strings_regex):
-            process = j.sals.process.get_process_object(pid, die=False)
-            _add_to_result(process)
+            cmdline = " ".join(process.info["cmdline"])
+            if any(process_string in cmdline for process_string in self.process_strings) or any(
+                re.match(regex, cmdline) for regex in self.process_strings_regex
+            ):
+                _add_to_result(process)
 
         #  We return all processes which match
         return result
 
+    def _ports_accept_connections(self):
+        """Checks if all ports accept tcp connections on localhost
+
+        Returns:
+            bool: True if all ports accept connections
+        """
+        return all(
+            j.sals.nettools.tcp_connection_test("127.0.0.1", port, timeout=PORT_CHECK_TIMEOUT) for port in self.ports
+        )
+
+    def _is_ready(self):
+        """Readiness probe used while waiting for start, a cheap tcp connection check of ports if set,
+        then `is_running`
+
+        Returns:
+            bool: True if it is running
+        """
+        if not self.check_cmd and self.ports and self._ports_accept_connections():
+            return True
+        return self.is_running()
+
+    def _is_stopped(self, timeout):
+        """Stop probe used while waiting for stop, if the process is known, waits up to `timeout` for it to exit,
+        then checks `is_running`
+
+        Args:
+            timeout (float): max time in seconds to wait for the process to exit
+
+        Returns:
+            bool: True if it is stopped
+        """
+        if not self.check_cmd:
+            self.reset()
+            process = self.process
+            if process and not _wait_for_exit(process, timeout):
+                return False
+        return not self.is_running()
+
     def _kill_processes_by_port_or_filter(self):
         """Kills processes that matches object properties"""
         processes = self._get_processes_by_port_or_filter()
@@ -235,15 +341,26 @@ class StartupCmd(Base):
         Raises:
             j.exceptions.Timeout: If timeout is exceeded.
         """
-        end = j.data.time.now().timestamp + timeout
+        end = time.monotonic() + timeout
+        delay = WAIT_MIN_DELAY
 
-        while j.data.time.now().timestamp < end:
-            if self.is_running() == for_running:
+        while True:
+            remaining = end - time.monotonic()
+            if for_running:
+                done = self._is_ready()
+            else:
+                done = self._is_stopped(remaining)
+            if done:
+                return
+
+            remaining = end - time.monotonic()
+            if remaining <= 0:
                 break
-            time.sleep(0.05)
-        else:
-            if die:
-                raise j.exceptions.Timeout(f"Wait operation exceeded timeout: {timeout}")
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, WAIT_MAX_DELAY)
+
+        if die:
+            raise j.exceptions.Timeout(f"Wait operation exceeded timeout: {timeout}")
 
     def wait_for_stop(self, die=True, timeout=10):
         """Wait for stop to finishes
@@ -13,6 +13,13 @@ JS-NG> s.start()
 ```
 """
 
+import os
+import shlex
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+
 from jumpscale.loader import j
 from watchdog.events import PatternMatchingEventHandler
 from watchdog.observers import Observer
@@ -20,6 +27,20 @@ import gevent
 from typing import List, Dict, Optional
 
 DEFAULT_IGNORED_PATTERNS = [".git", ".pyc", "__pycache__", ".swp", ".swx"]
+# seconds to collect events for, before pushing them to remote machines
+DEFAULT_DEBOUNCE = 0.5
+# max number of paths passed to a single remote command (e.g. mkdir -p or rm -rf)
+MAX_COMMAND_PATHS = 500
+# where local manifests (size, mtime and hash of every file) are cached between runs
+MANIFESTS_DIR = os.path.join(j.core.dirs.VARDIR, "syncer")
+
+# pending operations (per destination path)
+PUT = "put"
+MKDIR = "mkdir"
+DELETE = "delete"
+RENAME = "rename"
+# only set the modification time of a remote file
+TOUCH = "touch"
 
 
 class Syncer(PatternMatchingEventHandler):
@@ -31,9 +52,14 @@ class Syncer(PatternMatchingEventHandler):
         ignore_patterns: Optional[List[str]] = None,
         ignore_directories: Optional[List[str]] = False,
         case_sensitive: bool = True,
+        debounce: float = DEFAULT_DEBOUNCE,
     ):
         """Creates new syncer tool
 
+        Events are not pushed one by one, they are collected for `debounce` seconds (repeated events of the same path
+        are merged), then pushed to all remote machines in parallel, using one persistent ssh/sftp session per machine.
+        Operations are applied in the order of their (last) events.
+
         Arguments:
             sshclients_names {List[str]} -- list of sshclient names
             paths {Dict[str, str]} -- paths to watch src/dest form of dict {'/tmp/myproj':'/root/proj'}
@@ -43,15 +69,34 @@ class Syncer(PatternMatchingEventHandler):
             ignore_patterns {Optional[List[str]]} -- patterns to ignore, e.g .git, __pycache__ (default: {None})
             ignore_directories {Optional[List[str]]} -- directories to ignore (default: {False})
             case_sensitive {bool} -- case sensitive watching  (default: {True})
+            debounce {float} -- seconds to collect events for before pushing them (default: {DEFAULT_DEBOUNCE})
 
         Returns:
             Syncer -- Syncer object
         """
         ignore_patterns = ignore_patterns or DEFAULT_IGNORED_PATTERNS
-        super().__init__(patterns, ignore_patterns, ignore_directories, case_sensitive)
+        super().__init__(
+            patterns=patterns,
+            ignore_patterns=ignore_patterns,
+            ignore_directories=ignore_directories,
+            case_sensitive=case_sensitive,
+        )
         self.observer = Observer()
         self.sshclients_names = sshclients_names
         self.paths = paths or {}  # src:dst
+        self.debounce = debounce
+
+        self._sshclients = None
+        # destination path: (operation, argument), ordered by the last event
+        self._pending = OrderedDict()
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_timer = None
+        # ssh client instance name: own sftp session (the pooled connection can be shared with others)
+        self._sftp_sessions = {}
+        self._sftp_lock = threading.Lock()
+        # source path: {relative file path: [size, mtime, hash or None]}
+        self._manifests = {}
 
     def _get_dest_path(self, src_path: str) -> str:
         """returns destination path in remote machine
@@ -86,60 +131,417 @@ class Syncer(PatternMatchingEventHandler):
                 return src_path.replace(path, self.paths[path])
 
     def _get_sshclients(self):
-        """Returns list of sshclient objects.
+        """Returns list of sshclient objects (fetched once from the factory).
 
         Returns:
             List[SSHClient] -- list of ssh clients
         """
-        clients = []
-        for name in self.sshclients_names:
-            clients.append(j.clients.sshclient.get(name))
-        return clients
+        if self._sshclients is None:
+            self._sshclients = [j.clients.sshclient.get(name) for name in self.sshclients_names]
+        return self._sshclients
 
-    def sync(self):
-        """Sync directory structure and files"""
-        j.logger.debug(f"paths: {self.paths}")
+    def _use_connection(self, client):
+        """Returns the pooled connection to the machine of the given client, held in use until the block exits
 
-        def ensure_dirs():
-            """For every directory in watched paths we make sure it's full path exists on remote."""
-            for path in self.paths:
-                for src_dir in j.sals.fs.walk_dirs(path):
-                    dest_dir = str(self._rewrite_path_for_dest(src_dir))
-                    for cl in self._get_sshclients():
-                        j.logger.debug(f"making dir {dest_dir}")
-                        cl.sshclient.run(f"mkdir -p {dest_dir}")
-                        self.observer.schedule(self, src_dir)
+        Arguments:
+            client {SSHClient} -- ssh client
+
+        Returns:
+            contextmanager -- yields a fabric.Connection
+        """
+        return client.sshclient.use_connection()
+
+    def _get_sftp(self, client, connection):
+        """Returns the sftp session of the syncer to the machine of the given client, over the given connection.
 
-        def sync_file(e):
-            """Sync single file to all registered sshclients
+        A new session is opened if there's none, or the connection was re-opened.
 
-            Arguments:
-                e {str} -- file path
-            """
-            dest_path = self._rewrite_path_for_dest(e)
-            j.logger.debug(f"syncing {e} to machines into {dest_path}")
+        Arguments:
+            client {SSHClient} -- ssh client
+            connection {fabric.Connection} -- connection
 
-            for cl in self._get_sshclients():
-                cl.sshclient.run(f"mkdir -p {j.sals.fs.parent(dest_path)}")
-                cl.sshclient.sftp.put(e, self._rewrite_path_for_dest(e))
+        Returns:
+            paramiko.SFTPClient -- sftp session
+        """
+        with self._sftp_lock:
+            sftp = self._sftp_sessions.get(client.instance_name)
+            if sftp is not None:
+                channel = sftp.get_channel()
+                if not channel.closed and channel.get_transport() is connection.transport:
+                    return sftp
+                sftp.close()
+
+            sftp = self._sftp_sessions[client.instance_name] = connection.client.open_sftp()
+            return sftp
+
+    def _reset_sftp(self, client):
+        """Closes the sftp session of a client, a new one is opened on next use.
+
+        The pooled connection is not closed, as it can be used by others, it's checked by the pool before next use.
+
+        Arguments:
+            client {SSHClient} -- ssh client
+        """
+        with self._sftp_lock:
+            sftp = self._sftp_sessions.pop(client.instance_name, None)
+        if sftp is not None:
+            sftp.close()
+
+    def close(self):
+        """Closes all sftp sessions"""
+        for client in self._get_sshclients():
+            self._reset_sftp(client)
+
+    def _run_for_paths(self, connection, cmd, paths):
+        """Runs a command with many (quoted) paths as arguments, in as few remote calls as possible
+
+        Arguments:
+            connection {fabric.Connection} -- connection
+            cmd {str} -- command, e.g. `mkdir -p`
+            paths {List[str]} -- paths
+        """
+        for i in range(0, len(paths), MAX_COMMAND_PATHS):
+            args = " ".join(shlex.quote(path) for path in paths[i : i + MAX_COMMAND_PATHS])
+            connection.run(f"{cmd} {args}", hide=True)
 
-        def filter_ignored(e):
-            return True
+    def _push_to_client(self, client, operations):
+        """Applies operations on the machine of a client, in order.
 
-        ensure_dirs()
+        Consecutive deletions are done with one command, and consecutive creations/uploads are done by creating
+        all needed directories with one command, then uploading files using the same sftp session.
+
+        Arguments:
+            client {SSHClient} -- ssh client
+            operations {List[tuple]} -- list of (operation, destination path, argument)
+        """
+        with self._use_connection(client) as connection:
+            try:
+                sftp = self._get_sftp(client, connection)
+
+                # consecutive creations and uploads are grouped together
+                group_key = lambda item: item[0] if item[0] in (DELETE, RENAME) else PUT
+                for kind, group in groupby(operations, key=group_key):
+                    group = list(group)
+                    if kind == DELETE:
+                        self._run_for_paths(connection, "rm -rf", [dest_path for _, dest_path, _ in group])
+                    elif kind == RENAME:
+                        for _, dest_path, old_dest_path in group:
+                            sftp.posix_rename(old_dest_path, dest_path)
+                    else:
+                        self._put_to_client(client, connection, sftp, group)
+            except Exception:
+                # the session could be broken, start a new one next time
+                self._reset_sftp(client)
+                raise
+
+    def _put_to_client(self, client, connection, sftp, operations):
+        """Creates directories and uploads files on the machine of a client
+
+        Arguments:
+            client {SSHClient} -- ssh client
+            connection {fabric.Connection} -- connection
+            sftp {paramiko.SFTPClient} -- sftp session
+            operations {List[tuple]} -- list of MKDIR, PUT or TOUCH operations (operation, destination path, argument)
+        """
+        dirs = set()
+        for operation, dest_path, _ in operations:
+            if operation == MKDIR:
+                dirs.add(dest_path)
+            elif operation == PUT:
+                dirs.add(j.sals.fs.parent(dest_path))
+        if dirs:
+            self._run_for_paths(connection, "mkdir -p", sorted(dirs))
+
+        for operation, dest_path, src_path in operations:
+            if operation == PUT:
+                j.logger.debug(f"syncing {src_path} to {client.instance_name} into {dest_path}")
+                sftp.put(src_path, dest_path)
+
+            if operation in (PUT, TOUCH):
+                # keep the modification time, so an unchanged file is detected by the next delta sync
+                stat = os.stat(src_path)
+                sftp.utime(dest_path, (stat.st_atime, stat.st_mtime))
+
+    def _push(self, operations):
+        """Applies operations on all machines in parallel
+
+        Arguments:
+            operations {List[tuple]} -- list of (operation, destination path, argument)
+        """
+        if not operations:
+            return
+
+        clients = self._get_sshclients()
+        with ThreadPoolExecutor(max_workers=max(len(clients), 1)) as executor:
+            futures = {executor.submit(self._push_to_client, client, operations): client for client in clients}
+            for future, client in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    j.logger.error(f"failed to sync {len(operations)} paths to {client.instance_name}: {e}")
+
+    def _add_pending(self, operation, dest_path, argument=None):
+        """Adds an operation to be pushed with the next batch, replacing any pending operation of the same path
+
+        Arguments:
+            operation {str} -- one of PUT, MKDIR, DELETE or RENAME
+            dest_path {str} -- path in remote machine
+
+        Keyword Arguments:
+            argument {str} -- source path for PUT, old destination path for RENAME (default: {None})
+        """
+        with self._pending_lock:
+            previous = self._pending.pop(dest_path, None)
+            if previous and previous[0] == RENAME and operation != RENAME:
+                # the renamed directory is replaced, the old one should not be left behind
+                self._pending[previous[1]] = (DELETE, None)
+            self._pending[dest_path] = (operation, argument)
+
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.debounce, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self):
+        """Pushes all pending operations now"""
+        with self._flush_lock:
+            with self._pending_lock:
+                if self._flush_timer:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                pending, self._pending = self._pending, OrderedDict()
+
+            operations = []
+            for dest_path, (operation, argument) in pending.items():
+                if operation == PUT and not j.sals.fs.is_file(argument):
+                    # removed or moved later, its own event will handle it
+                    continue
+                operations.append((operation, dest_path, argument))
+
+            if operations:
+                j.logger.debug(f"pushing {len(operations)} changes to {self.sshclients_names}")
+                self._push(operations)
+
+    def _get_manifest_path(self, src_path):
+        return os.path.join(MANIFESTS_DIR, f"{j.data.hash.sha256(src_path)}.json")
+
+    def _get_local_manifest(self, src_path):
+        """Builds a manifest of all files under a watched path, hashes of unchanged files are reused from the cache
+
+        Arguments:
+            src_path {str} -- watched path
+
+        Returns:
+            Dict[str, list] -- relative file path: [size, mtime, hash or None]
+        """
+        cached = {}
+        manifest_path = self._get_manifest_path(src_path)
+        if j.sals.fs.exists(manifest_path):
+            try:
+                cached = j.data.serializers.json.load_from_file(manifest_path)
+            except ValueError:
+                j.logger.warning(f"ignoring invalid syncer manifest at {manifest_path}")
+
+        manifest = {}
+        for src_file, stat in j.sals.fs.walk_files(src_path, with_stat=True):
+            rel_path = os.path.relpath(src_file, src_path)
+            size, mtime = stat.st_size, int(stat.st_mtime)
+
+            file_hash = None
+            if rel_path in cached and cached[rel_path][:2] == [size, mtime]:
+                file_hash = cached[rel_path][2]
+            manifest[rel_path] = [size, mtime, file_hash]
+
+        self._manifests[src_path] = manifest
+        return manifest
+
+    def _get_local_hash(self, src_path, rel_path):
+        """Gets the hash of a file from the manifest, and computes it if it's not known yet
 
+        Arguments:
+            src_path {str} -- watched path
+            rel_path {str} -- file path relative to the watched path
+
+        Returns:
+            str -- sha256 hexdigest
+        """
+        entry = self._manifests[src_path][rel_path]
+        if entry[2] is None:
+            entry[2] = j.data.hash.hash_file(os.path.join(src_path, rel_path), "sha256").hexdigest()
+        return entry[2]
+
+    def _save_local_manifests(self):
+        j.sals.fs.mkdirs(MANIFESTS_DIR)
+        for src_path, manifest in self._manifests.items():
+            j.data.serializers.json.dump_to_file(self._get_manifest_path(src_path), manifest)
+
+    def _get_remote_manifest(self, connection, dest_path):
+        """Lists all files (with their size and mtime) and directories under a path on a remote machine in one command
+
+        Arguments:
+            connection {fabric.Connection} -- connection
+            dest_path {str} -- path in remote machine
+
+        Returns:
+            tuple -- ({relative file path: (size, mtime)}, set of relative directory paths)
+        """
+        files = {}
+        dirs = set()
+        result = connection.run(
+            f"test ! -d {shlex.quote(dest_path)} || find {shlex.quote(dest_path)} -mindepth 1 "
+            r"\( -type f -printf 'f %s %T@ %P\0' \) -o \( -type d -printf 'd 0 0 %P\0' \)",
+            hide=True,
+            warn=True,
+        )
+        if result.failed:
+            # e.g. a find without -printf support, everything is uploaded
+            j.logger.warning(f"failed to list {dest_path} on remote machine, all files will be synced: {result.stderr}")
+            return files, dirs
+
+        for entry in result.stdout.split("\0"):
+            if not entry:
+                continue
+            kind, size, mtime, rel_path = entry.split(" ", 3)
+            if kind == "f":
+                files[rel_path] = (int(size), int(float(mtime)))
+            else:
+                dirs.add(rel_path)
+        return files, dirs
+
+    def _get_remote_hashes(self, connection, dest_path, rel_paths):
+        """Computes sha256 hashes of files on a remote machine, with as few commands as possible
+
+        Arguments:
+            connection {fabric.Connection} -- connection
+            dest_path {str} -- base path in remote machine
+            rel_paths {List[str]} -- file paths relative to `dest_path`
+
+        Returns:
+            Dict[str, str] -- relative file path: sha256 hexdigest
+        """
+        hashes = {}
+        for i in range(0, len(rel_paths), MAX_COMMAND_PATHS):
+            args = " ".join(shlex.quote(rel_path) for rel_path in rel_paths[i : i + MAX_COMMAND_PATHS])
+            result = connection.run(f"cd {shlex.quote(dest_path)} && sha256sum -- {args}", hide=True, warn=True)
+            for line in result.stdout.splitlines():
+                # names with special characters are escaped by sha256sum (prefixed with a backslash), skip them
+                if line and not line.startswith("\\"):
+                    file_hash, rel_path = line.split("  ", 1)
+                    hashes[rel_path] = file_hash
+        return hashes
+
+    def _get_delta_operations(self, client, src_path):
+        """Compares the local manifest of a watched path with the remote one of a client,
+        and gets operations needed to sync only changed files.
+
+        A file is unchanged if it has the same size and mtime on both sides, if only the mtime differs,
+        hashes are compared.
+
+        Arguments:
+            client {SSHClient} -- ssh client
+            src_path {str} -- watched path
+
+        Returns:
+            List[tuple] -- list of (operation, destination path, argument)
+        """
+        dest_path = self.paths[src_path]
+        local_files = self._manifests[src_path]
+        changed = []
+        touched = []
+        to_compare = []
+        with self._use_connection(client) as connection:
+            remote_files, remote_dirs = self._get_remote_manifest(connection, dest_path)
+            for rel_path, (size, mtime, _) in local_files.items():
+                if rel_path not in remote_files or remote_files[rel_path][0] != size:
+                    changed.append(rel_path)
+                elif remote_files[rel_path][1] != mtime:
+                    to_compare.append(rel_path)
+
+            if to_compare:
+                remote_hashes = self._get_remote_hashes(connection, dest_path, to_compare)
+                for rel_path in to_compare:
+                    if remote_hashes.get(rel_path) != self._get_local_hash(src_path, rel_path):
+                        changed.append(rel_path)
+                    else:
+                        touched.append(rel_path)
+
+        operations = []
+        if remote_dirs or remote_files:
+            # only create missing directories
+            for src_dir in j.sals.fs.walk_dirs(src_path):
+                rel_dir = os.path.relpath(src_dir, src_path)
+                if rel_dir != "." and rel_dir not in remote_dirs:
+                    operations.append((MKDIR, os.path.join(dest_path, rel_dir), None))
+        else:
+            operations.append((MKDIR, dest_path, None))
+            for src_dir in j.sals.fs.walk_dirs(src_path):
+                operations.append((MKDIR, os.path.join(dest_path, os.path.relpath(src_dir, src_path)), None))
+
+        for rel_path in changed:
+            operations.append((PUT, os.path.join(dest_path, rel_path), os.path.join(src_path, rel_path)))
+        for rel_path in touched:
+            operations.append((TOUCH, os.path.join(dest_path, rel_path), os.path.join(src_path, rel_path)))
+
+        j.logger.debug(
+            f"{client.instance_name}: {len(changed)} of {len(local_files)} files under {src_path} need to be synced"
+        )
+        return operations
+
+    def _delta_sync_client(self, client):
+        operations = []
+        for src_path in self.paths:
+            operations.extend(self._get_delta_operations(client, src_path))
+        self._push_to_client(client, operations)
+
+    def sync(self, delta=True):
+        """Sync directory structure and files
+
+        Keyword Arguments:
+            delta {bool} -- only upload files changed on every remote machine, comparing size, mtime and
+                            (if needed) sha256 of files, otherwise upload all files (default: {True})
+        """
+        j.logger.debug(f"paths: {self.paths}")
+
+        for path in self.paths:
+            for src_dir in j.sals.fs.walk_dirs(path):
+                self.observer.schedule(self, src_dir)
+
+        if delta:
+            for path in self.paths:
+                self._get_local_manifest(path)
+
+            clients = self._get_sshclients()
+            with ThreadPoolExecutor(max_workers=max(len(clients), 1)) as executor:
+                futures = {executor.submit(self._delta_sync_client, client): client for client in clients}
+                for future, client in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        j.logger.error(f"failed to sync {client.instance_name}: {e}")
+
+            self._save_local_manifests()
+            return
+
+        operations = []
         for path in self.paths:
-            for f in j.sals.fs.walk_files(path, sync_file):
-                sync_file(f)
+            # for every directory in watched paths we make sure it's full path exists on remote
+            for src_dir in j.sals.fs.walk_dirs(path):
+                operations.append((MKDIR, str(self._rewrite_path_for_dest(src_dir)), None))
+
+            for src_file in j.sals.fs.walk_files(path):
+                operations.append((PUT, self._rewrite_path_for_dest(src_file), src_file))
+
+        self._push(operations)
 
-    def start(self, sync=True):
+    def start(self, sync=True, delta=True):
         """Start syncing/watching paths to remote machines
 
         Keyword Arguments:
             sync {bool} -- sync dirs/files first (default: {True})
+            delta {bool} -- only upload changed files on first sync (default: {True})
         """
         if sync:
-            self.sync()
+            self.sync(delta=delta)
 
         for path in self.paths.keys():
             self.observer.schedule(self, path)
@@ -152,6 +554,8 @@ class Syncer(PatternMatchingEventHandler):
             self.observer.unschedule_all()
             self.observer.stop()
         self.observer.join()
+        self.flush()
+        self.close()
 
     def on_moved(self, event):
         super().on_moved(event)
@@ -161,17 +565,14 @@ class Syncer(PatternMatchingEventHandler):
         dest_path = self._rewrite_path_for_dest(event.dest_path)
         j.logger.debug(f"will move to {dest_path}")
         j.logger.debug(f"will delete original in {self._rewrite_path_for_dest(event.src_path)}")
-        for cl in self._get_sshclients():
-            if not event.is_directory:
-                try:
-                    # in case file is moved
-                    cl.sshclient.sftp.put(event.dest_path, dest_path)
-                    cl.sshclient.run(f"rm {self._rewrite_path_for_dest(event.src_path)}")
-                except:
-                    j.logger.debug(f"Ignoring {dest_path}. Path was not found during move event")
-            else:
-                # in case file is directory
-                cl.sshclient.sftp.posix_rename(self._rewrite_path_for_dest(event.src_path), dest_path)
+        if not event.is_directory:
+            # in case file is moved
+            self._add_pending(DELETE, self._rewrite_path_for_dest(event.src_path))
+            self._add_pending(PUT, dest_path, event.dest_path)
+        else:
+            # in case file is directory
+            self._add_pending(RENAME, dest_path, self._rewrite_path_for_dest(event.src_path))
+            self.observer.schedule(self, event.dest_path)
 
     def on_created(self, event):
         super().on_created(event)
@@ -181,16 +582,17 @@ class Syncer(PatternMatchingEventHandler):
         dest_path = self._rewrite_path_for_dest(event.src_path)
         j.logger.debug(f"will create in {dest_path}")
 
-        for cl in self._get_sshclients():
-            if what == "directory":
-                cl.sshclient.run(f"mkdir -p {dest_path}")
-                self.observer.schedule(self, event.src_path)
-            else:
-                try:
-                    cl.sshclient.run(f"mkdir -p {j.sals.fs.parent(dest_path)}")
-                    cl.sshclient.run(f"touch {dest_path}")
-                except:
-                    j.logger.debug(f"Ignoring {dest_path}. Path was not found during create event")
+        if what == "directory":
+            self._add_pending(MKDIR, dest_path)
+            self.observer.schedule(self, event.src_path)
+            # contents created before the directory is watched (e.g. `mkdir -p` or a checkout) have no events
+            for src_dir in j.sals.fs.walk_dirs(event.src_path):
+                self._add_pending(MKDIR, self._rewrite_path_for_dest(src_dir))
+                self.observer.schedule(self, src_dir)
+            for src_file in j.sals.fs.walk_files(event.src_path):
+                self._add_pending(PUT, self._rewrite_path_for_dest(src_file), src_file)
+        else:
+            self._add_pending(PUT, dest_path, event.src_path)
 
     def on_deleted(self, event):
         super().on_deleted(event)
@@ -200,14 +602,7 @@ class Syncer(PatternMatchingEventHandler):
 
         dest_path = self._rewrite_path_for_dest(event.src_path)
         j.logger.debug(f"will delete in {dest_path}")
-        for cl in self._get_sshclients():
-            if what == "directory":
-                cl.sshclient.run(f"rm -rf {dest_path}")
-            else:
-                try:
-                    cl.sshclient.run(f"rm {dest_path}")
-                except:
-                    j.logger.debug(f"Ignoring {dest_path}. Path was not found during delete event")
+        self._add_pending(DELETE, dest_path)
 
     def on_modified(self, event):
         super().on_modified(event)
@@ -217,11 +612,7 @@ class Syncer(PatternMatchingEventHandler):
         dest_path = self._rewrite_path_for_dest(event.src_path)
         j.logger.debug(f"will modify in {dest_path}")
 
-        for cl in self._get_sshclients():
-            if what == "directory":
-                j.logger.debug(f"Folder {dest_path} was modified")
-            else:
-                try:
-                    cl.sshclient.sftp.put(event.src_path, dest_path)
-                except:
-                    j.logger.debug(f"Ignoring {dest_path}. Path was not found during modify event")
+        if what == "directory":
+            j.logger.debug(f"Folder {dest_path} was modified")
+        else:
+            self._add_pending(PUT, dest_path, event.src_path)
@@ -0,0 +1,25 @@
+import tempfile
+from unittest import mock
+
+import pytest
+
+from jumpscale.core.config import Environment
+
+# stores with a local path, they are moved to a temporary directory, not to touch the user's config store
+LOCAL_STORES = ["filesystem", "packed", "whoosh"]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def temporary_stores():
+    get_store_config = Environment.get_store_config
+
+    with tempfile.TemporaryDirectory() as root:
+
+        def get_temporary_store_config(self, name):
+            store_config = get_store_config(self, name)
+            if name in LOCAL_STORES:
+                store_config["path"] = f"{root}/{name}"
+            return store_config
+
+        with mock.patch.object(Environment, "get_store_config", get_temporary_store_config):
+            yield root
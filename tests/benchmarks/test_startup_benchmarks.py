@@ -0,0 +1,68 @@
+"""
+benchmarks for startup: loading `j` and client factories, and reading the config
+
+run with `make benchmarks` or `pytest tests/benchmarks -sv -m benchmark`
+"""
+import subprocess
+import sys
+import time
+
+import pytest
+
+from jumpscale.core import config
+
+# clients whose factories are loaded after `j`
+CLIENTS = ["docker", "git", "redis", "sshclient", "sshkey", "zdb"]
+RUNS = 5
+CONFIG_READS = 1000
+
+STARTUP_SCRIPT = f"""
+import time
+
+start = time.perf_counter()
+from jumpscale.loader import j
+
+loaded = time.perf_counter()
+for name in {CLIENTS!r}:
+    try:
+        factory = getattr(j.clients, name)
+    except ImportError:
+        # optional dependency is not installed
+        continue
+    for instance_name in factory.list_all():
+        getattr(factory, instance_name)
+
+print(loaded - start, time.perf_counter() - loaded)
+"""
+
+
+def report(title, total, count):
+    print(f"\n{title}: {total * 1000:.2f} ms total, {total / count * 1e6:.2f} us per call")
+
+
+@pytest.mark.benchmark
+def test_startup():
+    # every run is a new process, so nothing is cached in memory
+    import_times = []
+    factories_times = []
+    for _ in range(RUNS):
+        output = subprocess.check_output([sys.executable, "-c", STARTUP_SCRIPT], text=True)
+        import_time, factories_time = map(float, output.split()[-2:])
+        import_times.append(import_time)
+        factories_times.append(factories_time)
+
+    print(
+        f"\nimport j: {min(import_times) * 1000:.2f} ms (best of {RUNS}), "
+        f"load client factories: {min(factories_times) * 1000:.2f} ms (best of {RUNS})"
+    )
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("cached", [True, False])
+def test_config_get(cached):
+    start = time.perf_counter()
+    for _ in range(CONFIG_READS):
+        if not cached:
+            config.clear_cache()
+        assert config.get("factory") is not None
+    report(f"config.get (cached={cached})", time.perf_counter() - start, CONFIG_READS)
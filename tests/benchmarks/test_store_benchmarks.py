@@ -0,0 +1,134 @@
+"""
+benchmarks for config stores and stored factories
+
+run with `make benchmarks` or `pytest tests/benchmarks -sv -m benchmark`
+"""
+import time
+
+import pytest
+
+from jumpscale.core.base import Base, StoredFactory, fields
+from jumpscale.core.base.store import Location, filesystem, packed
+
+INSTANCES_COUNT = 200
+# instances count used to benchmark bulk loading
+BULK_INSTANCES_COUNT = 10000
+
+
+class Account(Base):
+    name = fields.String()
+    username = fields.String()
+    password = fields.Secret()
+    token = fields.Secret()
+    secret_key = fields.Secret()
+
+
+class AccountFactory(StoredFactory):
+    STORE = filesystem.FileSystemStore
+
+
+class BulkAccount(Account):
+    pass
+
+
+class BulkAccountFactory(StoredFactory):
+    STORE = packed.PackedStore
+
+
+def report(title, total, count):
+    print(f"\n{title}: {total * 1000:.2f} ms total, {total / count * 1e6:.2f} us per instance")
+
+
+@pytest.fixture(scope="module")
+def accounts():
+    factory = AccountFactory(Account)
+    for i in range(INSTANCES_COUNT):
+        account = factory.get(f"account_{i}")
+        account.name = f"name {i}"
+        account.username = f"user_{i}"
+        account.password = f"password_{i}"
+        account.token = f"token_{i}"
+        account.secret_key = f"secret_key_{i}"
+        account.save()
+
+    yield factory
+
+    for name in factory.list_all():
+        factory.delete(name)
+
+
+@pytest.fixture(scope="module")
+def bulk_accounts():
+    factory = BulkAccountFactory(BulkAccount)
+    with factory.batch():
+        for i in range(BULK_INSTANCES_COUNT):
+            account = factory.get(f"account_{i}")
+            account.name = f"name {i}"
+            account.username = f"user_{i}"
+            account.password = f"password_{i}"
+            account.token = f"token_{i}"
+            account.secret_key = f"secret_key_{i}"
+            account.save()
+
+    yield factory
+
+    for name in factory.list_all():
+        factory.delete(name)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("lazy_decrypt", [False, True])
+def test_load_instances(accounts, lazy_decrypt):
+    factory = AccountFactory(Account)
+    factory.store.lazy_decrypt = lazy_decrypt
+
+    names = factory.list_all()
+    start = time.perf_counter()
+    for name in names:
+        assert getattr(factory, name).username
+    total = time.perf_counter() - start
+
+    report(f"load instances (lazy_decrypt={lazy_decrypt})", total, len(names))
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("store_class", [filesystem.FileSystemStore, packed.PackedStore])
+def test_store_layout(store_class):
+    location = Location(__name__, "Layout", store_class.__name__)
+    store = store_class(location)
+    configs = {f"instance_{i}": {"name": f"name {i}", "username": f"user_{i}"} for i in range(INSTANCES_COUNT)}
+
+    try:
+        start = time.perf_counter()
+        for name, config in configs.items():
+            store.save(name, config)
+        report(f"{store_class.__name__}: write", time.perf_counter() - start, INSTANCES_COUNT)
+
+        # a new store, as in a cold start
+        store = store_class(location)
+        start = time.perf_counter()
+        names = store.list_all()
+        for name in names:
+            store.get(name)
+        report(f"{store_class.__name__}: list and read", time.perf_counter() - start, INSTANCES_COUNT)
+        assert len(names) == INSTANCES_COUNT
+    finally:
+        for name in store.list_all():
+            store.delete(name)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("workers", [None, 1, 4, 8])
+def test_load_all(bulk_accounts, workers):
+    factory = BulkAccountFactory(BulkAccount)
+
+    start = time.perf_counter()
+    if workers is None:
+        # one by one, on first access
+        instances = [getattr(factory, name) for name in factory.list_all()]
+    else:
+        instances = factory.load_all(workers=workers)
+    total = time.perf_counter() - start
+
+    assert len(instances) == BULK_INSTANCES_COUNT
+    report(f"load all instances (workers={workers})", total, len(instances))
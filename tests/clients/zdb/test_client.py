@@ -0,0 +1,104 @@
+import threading
+from unittest import mock
+
+from jumpscale.loader import j
+from parameterized import parameterized
+from tests.base_tests import BaseTests
+from tests.clients.zdb.zdb_stand_in import HOST, SCAN_PAGE_SIZE, ZDBStandIn
+
+
+class TestZDBClient(BaseTests):
+    def setUp(self):
+        super().setUp()
+        self.clients = []
+
+    def tearDown(self):
+        for name in self.clients:
+            j.clients.zdb.delete(name)
+        self.server.shutdown()
+        self.server.server_close()
+
+    def start_server(self, mode):
+        self.server = ZDBStandIn(mode)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def get_client(self, nsname, mode):
+        name = self.random_name()
+        self.clients.append(name)
+        return j.clients.zdb.new(name, addr=HOST, port=self.server.server_address[1], nsname=nsname, mode=mode)
+
+    def write_entries(self, client, mode, count):
+        items = [(None if mode == "seq" else f"key_{i}".encode(), f"data {i}".encode()) for i in range(count)]
+        keys = client.mset(items)
+        return [(key, data) for key, (_, data) in zip(keys, items)]
+
+    @parameterized.expand([("seq",), ("user",)])
+    def test01_mget_mset(self, mode):
+        """Test case for setting and getting many entries using pipelines.
+
+        **Test Scenario**
+
+        - Start a stand-in 0-db server.
+        - Set many entries using mset, check that the keys of all entries are returned in order.
+        - Get all entries using mget, check that no command is sent outside a pipeline.
+        - Get entries with missing keys, check that None is returned for missing keys.
+        """
+        self.info("Start a stand-in 0-db server.")
+        self.start_server(mode)
+        client = self.get_client("test", mode)
+
+        self.info("Set many entries using mset, check that the keys of all entries are returned in order.")
+        with mock.patch.object(client.redis, "execute_command") as execute_command:
+            entries = self.write_entries(client, mode, 50)
+            execute_command.assert_not_called()
+        expected_keys = list(range(50)) if mode == "seq" else [f"key_{i}".encode() for i in range(50)]
+        self.assertEqual([key for key, _ in entries], expected_keys)
+        self.assertEqual(client.mset({}), [])
+
+        self.info("Get all entries using mget, check that no command is sent outside a pipeline.")
+        keys = [key for key, _ in entries]
+        with mock.patch.object(client.redis, "execute_command") as execute_command:
+            self.assertEqual(client.mget(keys), [data for _, data in entries])
+            execute_command.assert_not_called()
+        self.assertEqual(client.mget([]), [])
+
+        self.info("Get entries with missing keys, check that None is returned for missing keys.")
+        missing_key = 1000 if mode == "seq" else b"missing"
+        self.assertEqual(client.mget([keys[0], missing_key, keys[1]]), [entries[0][1], None, entries[1][1]])
+
+    @parameterized.expand([("seq",), ("user",)])
+    def test02_iterate(self, mode):
+        """Test case for iterating over a namespace, while prefetching data of the next pages.
+
+        **Test Scenario**
+
+        - Start a stand-in 0-db server, and write entries over many scan pages.
+        - Iterate over the namespace, check that all entries are yielded in order.
+        - Iterate in reverse, check that entries are yielded from newer to older.
+        - Iterate over keys only, check that no data is fetched.
+        - Iterate using many workers, check that entries are yielded in order.
+        - Iterate from a key, check that iteration starts from it.
+        """
+        self.info("Start a stand-in 0-db server, and write entries over many scan pages.")
+        self.start_server(mode)
+        client = self.get_client("test", mode)
+        entries = self.write_entries(client, mode, SCAN_PAGE_SIZE * 5 + 3)
+
+        self.info("Iterate over the namespace, check that all entries are yielded in order.")
+        self.assertEqual(list(client.iterate()), entries)
+
+        self.info("Iterate in reverse, check that entries are yielded from newer to older.")
+        self.assertEqual(list(client.iterate(reverse=True)), entries[::-1])
+
+        self.info("Iterate over keys only, check that no data is fetched.")
+        with mock.patch.object(client, "_mget_raw") as mget_raw:
+            self.assertEqual(list(client.iterate(keyonly=True)), [(key, None) for key, _ in entries])
+            mget_raw.assert_not_called()
+        self.assertEqual(client.list(), [key for key, _ in entries])
+
+        self.info("Iterate using many workers, check that entries are yielded in order.")
+        self.assertEqual(list(client.iterate(workers=3)), entries)
+        self.assertEqual(list(client.iterate(reverse=True, workers=4)), entries[::-1])
+
+        self.info("Iterate from a key, check that iteration starts from it.")
+        self.assertEqual(list(client.iterate(key_start=entries[10][0], workers=2)), entries[10:])
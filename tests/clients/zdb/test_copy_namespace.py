@@ -0,0 +1,66 @@
+import threading
+
+from jumpscale.loader import j
+from parameterized import parameterized
+from tests.base_tests import BaseTests
+from tests.clients.zdb.zdb_stand_in import HOST, ZDBStandIn
+
+
+class TestCopyNamespace(BaseTests):
+    def setUp(self):
+        super().setUp()
+        self.clients = []
+        self.checkpoint_path = j.sals.fs.join_paths("/tmp", f"{self.random_name()}.checkpoint")
+
+    def tearDown(self):
+        for name in self.clients:
+            j.clients.zdb.delete(name)
+        if j.sals.fs.exists(self.checkpoint_path):
+            j.sals.fs.unlink(self.checkpoint_path)
+        self.server.shutdown()
+        self.server.server_close()
+
+    def start_server(self, mode):
+        self.server = ZDBStandIn(mode)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def get_client(self, nsname, mode):
+        name = self.random_name()
+        self.clients.append(name)
+        return j.clients.zdb.new(name, addr=HOST, port=self.server.server_address[1], nsname=nsname, mode=mode)
+
+    @parameterized.expand([("seq",), ("user",)])
+    def test01_copy_namespace(self, mode):
+        """Test case for copying a namespace, then resuming an interrupted copy using a checkpoint.
+
+        **Test Scenario**
+
+        - Start a stand-in 0-db server.
+        - Write entries to the source namespace.
+        - Copy the namespace, and make the destination fail after some entries.
+        - Resume the copy using the checkpoint.
+        - Check that all entries are copied, in the same order.
+        """
+        self.info("Start a stand-in 0-db server.")
+        self.start_server(mode)
+        src = self.get_client("src", mode)
+        dst = self.get_client("dst", mode)
+
+        self.info("Write entries to the source namespace.")
+        items = [(None if mode == "seq" else f"key_{i}".encode(), f"data {i}".encode()) for i in range(100)]
+        src_keys = src.mset(items)
+        self.assertEqual(len(src_keys), 100)
+
+        self.info("Copy the namespace, and make the destination fail after some entries.")
+        self.server.sets_limit = 45
+        with self.assertRaises(Exception):
+            j.clients.zdb.copy_namespace(src, dst, workers=2, batch_size=10, checkpoint_path=self.checkpoint_path)
+
+        self.info("Resume the copy using the checkpoint.")
+        self.server.sets_limit = None
+        stats = j.clients.zdb.copy_namespace(src, dst, workers=2, batch_size=10, checkpoint_path=self.checkpoint_path)
+        self.assertEqual(stats.copied, 100)
+        self.assertEqual(stats.size, sum(len(data) for _, data in items))
+
+        self.info("Check that all entries are copied, in the same order.")
+        self.assertEqual(list(dst.iterate()), list(src.iterate()))
@@ -0,0 +1,90 @@
+"""A minimal stand-in for 0-db, to test the zdb client without a 0-db server"""
+import socketserver
+import struct
+import threading
+
+HOST = "127.0.0.1"
+SCAN_PAGE_SIZE = 7
+
+
+class ZDBStandIn(socketserver.ThreadingTCPServer):
+    """A minimal stand-in for 0-db, speaks the redis protocol and supports the commands used by the client"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, mode):
+        super().__init__((HOST, 0), ZDBStandInHandler)
+        self.mode = mode
+        # namespace -> {key: data}, keys are kept in insertion order
+        self.namespaces = {}
+        self.lock = threading.Lock()
+        # how many SET commands are allowed before failing, None for no limit
+        self.sets_limit = None
+
+
+class ZDBStandInHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def write(self, value):
+        if value is None:
+            self.wfile.write(b"$-1\r\n")
+        elif isinstance(value, int):
+            self.wfile.write(b":%d\r\n" % value)
+        elif isinstance(value, bytes):
+            self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+        elif isinstance(value, list):
+            self.wfile.write(b"*%d\r\n" % len(value))
+            for item in value:
+                self.write(item)
+
+    def handle(self):
+        server = self.server
+        namespace = {}
+        while True:
+            args = self.read_command()
+            if not args:
+                return
+
+            command = args[0].upper()
+            with server.lock:
+                if command == b"SELECT":
+                    namespace = server.namespaces.setdefault(args[1], {})
+                    self.wfile.write(b"+OK\r\n")
+                elif command == b"PING":
+                    self.wfile.write(b"+PONG\r\n")
+                elif command == b"SET":
+                    if server.sets_limit is not None:
+                        if server.sets_limit <= 0:
+                            self.wfile.write(b"-ERR stand-in failure\r\n")
+                            continue
+                        server.sets_limit -= 1
+
+                    key = args[1]
+                    if server.mode == "seq" and not key:
+                        key = struct.pack("<I", len(namespace))
+                    namespace[key] = args[2]
+                    self.write(key)
+                elif command == b"GET":
+                    self.write(namespace.get(args[1]))
+                elif command == b"KEYCUR":
+                    self.write(args[1])
+                elif command in (b"SCANX", b"RSCAN"):
+                    keys = list(namespace) if command == b"SCANX" else list(reversed(namespace))
+                    start = keys.index(args[1]) + 1 if len(args) > 1 else 0
+                    page = keys[start : start + SCAN_PAGE_SIZE]
+                    if not page:
+                        self.wfile.write(b"-No more data\r\n")
+                    else:
+                        self.write([page[-1], [[key, len(namespace[key]), 0] for key in page]])
+                else:
+                    self.wfile.write(b"-ERR unknown command\r\n")
+            self.wfile.flush()
@@ -2,3 +2,10 @@ def pytest_collection_modifyitems(items, config):
     for item in items:
         if not any(item.iter_markers()):
             item.add_marker("unittests")
+
+    # benchmarks are slow, only run them if selected explicitly (e.g. `-m benchmark`)
+    if "benchmark" not in (config.getoption("markexpr") or ""):
+        deselected = [item for item in items if item.get_closest_marker("benchmark")]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = [item for item in items if not item.get_closest_marker("benchmark")]
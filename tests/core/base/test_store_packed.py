@@ -0,0 +1,136 @@
+import errno
+import os
+from unittest import mock
+
+import pytest
+
+from jumpscale.core.base import Base, fields
+from jumpscale.core.base.store import Location, packed
+
+
+class Car(Base):
+    color = fields.String()
+    key = fields.Secret()
+
+
+def get_store():
+    return packed.PackedStore(Location(__name__, "Car", type_=Car))
+
+
+def teardown_function():
+    store = get_store()
+    for name in store.list_all():
+        store.delete(name)
+
+
+def test_write_read_and_delete():
+    store = get_store()
+    store.save("bmw", {"color": "red", "__key": "abc"})
+    store.save("fiat", {"color": "blue", "__key": "def"})
+    store.save("bmw", {"color": "black", "__key": "abc"})
+
+    assert store.list_all() == ["fiat", "bmw"]
+    assert store.get("bmw") == {"color": "black", "key": "abc"}
+
+    # another store (e.g. in another process) sees the same data
+    other_store = get_store()
+    assert other_store.get("fiat") == {"color": "blue", "key": "def"}
+
+    # and new records are scanned incrementally
+    store.delete("fiat")
+    store.save("opel", {"color": "white"})
+    assert other_store.list_all() == ["bmw", "opel"]
+    assert other_store.get("opel") == {"color": "white"}
+
+
+def test_partial_record_is_ignored():
+    store = get_store()
+    store.save("bmw", {"color": "red"})
+
+    with open(store.path, "ab") as f:
+        f.write(packed.HEADER.pack(packed.WRITE, 4, 100) + b"opel{")
+
+    other_store = get_store()
+    assert other_store.list_all() == ["bmw"]
+
+    # the partial record is dropped by the next write
+    other_store.save("fiat", {"color": "blue"})
+    assert get_store().get("fiat") == {"color": "blue"}
+
+
+def test_compaction():
+    store = get_store()
+    data = {"color": "x" * 1024}
+    for _ in range(100):
+        store.save("bmw", data)
+
+    # dead records are removed
+    assert store.dead_size < packed.COMPACTION_MIN_SIZE
+    assert get_store().get("bmw") == data
+
+
+def test_short_writes():
+    store = get_store()
+    real_write = os.write
+
+    def short_write(fd, data):
+        # write at most 3 bytes at a time
+        return real_write(fd, bytes(data[:3]))
+
+    with mock.patch("os.write", side_effect=short_write):
+        store.save("bmw", {"color": "red"})
+        store.save("fiat", {"color": "blue"})
+
+    assert get_store().get("bmw") == {"color": "red"}
+    assert get_store().get("fiat") == {"color": "blue"}
+
+
+def test_failed_write_is_truncated():
+    store = get_store()
+    store.save("bmw", {"color": "red"})
+    size = os.path.getsize(store.path)
+    real_write = os.write
+
+    def failing_write(fd, data):
+        real_write(fd, bytes(data[:5]))
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    with mock.patch("os.write", side_effect=failing_write):
+        with pytest.raises(OSError):
+            store.save("fiat", {"color": "blue"})
+
+    assert os.path.getsize(store.path) == size
+    assert store.list_all() == ["bmw"]
+    store.save("opel", {"color": "white"})
+    assert get_store().get("opel") == {"color": "white"}
+
+
+def test_delete_removes_child_locations():
+    store = get_store()
+    store.save("bmw", {"color": "red", "__key": "abc"})
+    child_store = packed.PackedStore(Location(__name__, "Car", "bmw", "wheels", "Wheel"))
+    child_store.save("front", {"size": 17})
+    other_store = packed.PackedStore(Location(__name__, "Car", "bmwx", "wheels", "Wheel"))
+    other_store.save("front", {"size": 18})
+
+    store.delete("bmw")
+    assert not os.path.exists(child_store.path)
+    # children of other instances are kept
+    assert os.path.exists(other_store.path)
+    other_store.delete("front")
+
+    # the same name is created again, without the old children
+    store.save("bmw", {"color": "red", "__key": "abc"})
+    assert packed.PackedStore(Location(__name__, "Car", "bmw", "wheels", "Wheel")).list_all() == []
+
+
+def test_compact_takes_the_lock():
+    store = get_store()
+    store.save("bmw", {"color": "red", "__key": "abc"})
+    store.save("bmw", {"color": "black", "__key": "abc"})
+
+    with mock.patch.object(packed.fcntl, "flock", wraps=packed.fcntl.flock) as flock:
+        store.compact()
+    assert [call.args[1] for call in flock.call_args_list] == [packed.fcntl.LOCK_EX, packed.fcntl.LOCK_UN]
+    assert os.path.getsize(store.path) == packed.HEADER.size + len("bmw") + len(store.read("bmw"))
+    assert store.get("bmw") == {"color": "black", "key": "abc"}
@@ -1,8 +1,9 @@
 import string
 from random import randint, uniform
+from unittest import mock
 
 from jumpscale.core.base import Base, StoredFactory, fields
-from jumpscale.core.base.store import redis
+from jumpscale.core.base.store import EncryptedConfigStore, IndexMixin, redis
 from jumpscale.loader import j
 from tests.base_tests import BaseTests
 
@@ -122,3 +123,85 @@ class RedisStoreTests(BaseTests):
             obj = self.factory.find(instance)
             name = f"student_{instance[-1]}"
             self.assertEqual(obj.name, name)
+
+    def test_03_list_and_find_with_names_set(self):
+        """Test for listing and searching instances using the names set.
+
+        **Test Scenario**
+
+        - Create three instances.
+        - Check that the names set is stored in redis.
+        - Remove the names set and check that all instances are still listed.
+        - Find instances by name.
+        """
+        self.info("Create three instances.")
+        for i in range(3):
+            student = self.factory.new(f"instance_{i}")
+            student.name = "student_a" if i < 2 else "student_b"
+            student.save()
+
+        self.info("Check that the names set is stored in redis.")
+        redis = j.clients.redis.get(self.randstr())
+        names = redis.smembers(f"{__name__}.Student.__names__")
+        self.assertEqual(sorted(names), [b"instance_0", b"instance_1", b"instance_2"])
+
+        self.info("Remove the names set and check that all instances are still listed.")
+        redis.delete(f"{__name__}.Student.__names__")
+        self.assertEqual(self.factory.store.list_all(), ["instance_0", "instance_1", "instance_2"])
+
+        self.info("Find instances by name.")
+        _, count, result = self.factory.find_many(name="student_a")
+        self.assertEqual(count, 2)
+        self.assertEqual(sorted(student.instance_name for student in result), ["instance_0", "instance_1"])
+
+    def test_04_find_uses_version_stamps(self):
+        """Test for validating index entries using version stamps, without reading data.
+
+        **Test Scenario**
+
+        - Create three instances and find them, so the index is built.
+        - Find again, check that no data is read.
+        - Change an instance, check that only this instance is read and found by its new value.
+        - Check that an incomplete index backend can not be created.
+        """
+        self.info("Create three instances and find them, so the index is built.")
+        store = self.factory.store
+        for i in range(3):
+            student = self.factory.new(f"instance_{i}")
+            student.name = "student_a"
+            student.save()
+        self.assertEqual(self.factory.find_many(name="student_a")[1], 3)
+
+        self.info("Find again, check that no data is read.")
+        with mock.patch.object(store, "read_many", wraps=store.read_many) as read_many:
+            self.assertEqual(self.factory.find_many(name="student_b")[1], 0)
+        self.assertEqual([names for (names,), _ in read_many.call_args_list if names], [])
+
+        self.info("Change an instance, check that only this instance is read and found by its new value.")
+        store.write("instance_1", store.serializer.serialize({"name": "student_b"}))
+        with mock.patch.object(store, "read_many", wraps=store.read_many) as read_many:
+            _, count, result = self.factory.find_many(name="student_b")
+            names = [student.instance_name for student in result]
+        self.assertEqual((count, names), (1, ["instance_1"]))
+        self.assertEqual(read_many.call_args_list[0], mock.call(["instance_1"]))
+
+        self.info("Check that an incomplete index backend can not be created.")
+
+        class IncompleteStore(IndexMixin, EncryptedConfigStore):
+            def read(self, instance_name):
+                pass
+
+            def write(self, instance_name, data):
+                pass
+
+            def list_all(self):
+                return []
+
+            def delete(self, instance_name):
+                pass
+
+            def read_index(self):
+                pass
+
+        with self.assertRaises(TypeError):
+            IncompleteStore(store.location)
@@ -1,7 +1,7 @@
 import datetime
 
 from jumpscale.core.base import Base, fields, StoredFactory
-from jumpscale.core.base.store import whooshfts
+from jumpscale.core.base.store import Location, whooshfts
 
 
 class Permission(Base):
@@ -77,3 +77,77 @@ def test_create_schema_and_search():
 
     assert len(factory.list_all()) == 0
     assert len(a.machines.list_all()) == 0
+
+
+def test_bulk_write_and_cached_searcher():
+    factory = CustomFactory(User)
+    store = factory.store
+
+    with store.bulk():
+        for i in range(5):
+            user = factory.new(f"bulk_{i}", first_name="bulk", rating=i)
+            user.save()
+
+        # nothing is committed yet
+        assert store.list_all() == []
+
+    assert sorted(store.list_all()) == [f"bulk_{i}" for i in range(5)]
+
+    searcher = store.get_searcher()
+    assert store.get_searcher() is searcher
+
+    _, total_count, _ = factory.find_many(first_name="bulk")
+    assert total_count == 5
+
+    # a failed bulk is cancelled
+    try:
+        with store.bulk():
+            factory.delete("bulk_0")
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert "bulk_0" in store.list_all()
+
+    for i in range(5):
+        factory.delete(f"bulk_{i}")
+
+    assert store.get_searcher() is not searcher
+    assert len(factory.list_all()) == 0
+
+
+class RatingV1(Base):
+    name = fields.String()
+    rating = fields.String()
+
+
+class RatingV2(Base):
+    name = fields.String()
+    rating = fields.Integer()
+    comment = fields.String()
+
+
+def test_shared_index_and_reindex_on_schema_change():
+    location_v1 = Location("tests", "whoosh_reindex", type_=RatingV1)
+    store_v1 = whooshfts.WhooshStore(location_v1)
+    assert whooshfts.WhooshStore(location_v1).index is store_v1.index
+
+    store_v1.save("good", {"name": "good", "rating": "5"})
+    store_v1.save("bad", {"name": "bad", "rating": "not rated"})
+
+    # same location, but the type has changed
+    location_v2 = Location("tests", "whoosh_reindex", type_=RatingV2)
+    store_v2 = whooshfts.WhooshStore(location_v2)
+    assert store_v2.index is not store_v1.index
+    assert "comment" in store_v2.index.schema
+
+    assert sorted(store_v2.list_all()) == ["bad", "good"]
+    _, total_count, result = store_v2.find(rating=">=5")
+    assert total_count == 1
+    assert next(result)["name"] == "good"
+
+    # a value that cannot be indexed as an integer is dropped
+    assert store_v2.get("bad")["rating"] is None
+
+    store_v2.delete("good")
+    store_v2.delete("bad")
+    whooshfts.clear_registry()
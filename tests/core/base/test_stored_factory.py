@@ -4,12 +4,13 @@ this module mostly test creating/storing/reteriving objects/instances
 which makes sure every field is serialized correctly
 """
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
 # TODO: move fields to fields or types module
 
 from jumpscale.core.base import Base, DuplicateError, Factory, StoredFactory, fields
-from jumpscale.core.base.store import filesystem, redis, whooshfts
+from jumpscale.core.base.store import EncryptedValue, filesystem, packed, redis, whooshfts
 from parameterized import parameterized_class
 from jumpscale.loader import j
 
@@ -86,6 +87,10 @@ class User(Base):
     ahmed_greeter = fields.Typed(Greeter, stored=False, default=Greeter("ahmed"))
 
 
+class Account(Base):
+    pin = fields.Secret(maxlen=4)
+
+
 class Client(Base):
     wallets = fields.Factory(Wallet)
     users = fields.Factory(User)
@@ -95,6 +100,10 @@ class FilesystemFactory(StoredFactory):
     STORE = filesystem.FileSystemStore
 
 
+class PackedFactory(StoredFactory):
+    STORE = packed.PackedStore
+
+
 class RedisFactory(StoredFactory):
     STORE = redis.RedisStore
 
@@ -104,7 +113,12 @@ class WhooshFactory(StoredFactory):
 
 
 @parameterized_class(
-    [{"factory_class": FilesystemFactory}, {"factory_class": RedisFactory}, {"factory_class": WhooshFactory}]
+    [
+        {"factory_class": FilesystemFactory},
+        {"factory_class": PackedFactory},
+        {"factory_class": RedisFactory},
+        {"factory_class": WhooshFactory},
+    ]
 )
 class TestStoredFactory(unittest.TestCase):
 
@@ -408,6 +422,165 @@ class TestStoredFactory(unittest.TestCase):
         wallet.save()
         self.assertIsNotNone(new_factory.find(name))
 
+    def test_find_many(self):
+        cl = self.factory.get("test_find_many")
+        for name, first_name in [("user1", "ahmed"), ("user2", "mahmoud"), ("user3", "ahmed")]:
+            user = cl.users.get(name)
+            user.first_name = first_name
+            user.save()
+
+        _, count, result = cl.users.find_many(first_name="ahmed")
+        self.assertEqual(count, 2)
+        self.assertEqual(sorted(user.instance_name for user in result), ["user1", "user3"])
+
+        cl.users.delete("user1")
+        _, count, result = cl.users.find_many(first_name="ahmed")
+        self.assertEqual(count, 1)
+        self.assertEqual(next(result).instance_name, "user3")
+
+    def test_find_many_with_stale_index(self):
+        users = self.factory.get("test_stale_index").users
+        if not users.store.indexed:
+            self.skipTest("store does not maintain an index")
+
+        user = users.get("user1")
+        user.first_name = "ahmed"
+        user.password = "secret"
+        user.save()
+        _, count, result = users.find_many(first_name="ahmed")
+        self.assertEqual(count, 1)
+        self.assertEqual(next(result).password, "secret")
+
+        # write a config without updating the index
+        users.store.write("user2", users.store.serializer.serialize({"first_name": "ahmed"}))
+        self.assertEqual(users.find_many(first_name="ahmed")[1], 2)
+        self.assertIn("user2", users.store.read_index())
+
+    def test_find_many_with_changed_value(self):
+        users = self.factory.get("test_changed_index").users
+        if not users.store.indexed:
+            self.skipTest("store does not maintain an index")
+
+        user = users.get("user1")
+        user.first_name = "ahmed"
+        user.save()
+        self.assertEqual(users.find_many(first_name="ahmed")[1], 1)
+
+        # change the value without updating the index (e.g. by another process or an older version)
+        users.store.write("user1", users.store.serializer.serialize({"first_name": "mahmoud"}))
+        self.assertEqual(users.find_many(first_name="ahmed")[1], 0)
+        self.assertEqual(users.find_many(first_name="mahmoud")[1], 1)
+        self.assertEqual(users.store.read_index()["user1"]["values"]["first_name"], "mahmoud")
+
+    def test_index_concurrent_saves(self):
+        users = self.factory.get("test_concurrent_index").users
+        if not users.store.indexed:
+            self.skipTest("store does not maintain an index")
+
+        users.store.save("user0", {"first_name": "ahmed"})
+        users.find_many(first_name="ahmed")
+
+        names = [f"user{i}" for i in range(1, 21)]
+        stores = [users.store.__class__(users.store.location) for _ in names]
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            list(executor.map(lambda args: args[0].save(args[1], {"first_name": "ahmed"}), zip(stores, names)))
+
+        # no entry is lost
+        self.assertTrue(set(names).issubset(users.store.read_index()))
+        self.assertEqual(users.find_many(first_name="ahmed")[1], 21)
+
+    def test_list_all_skips_temporary_files(self):
+        if not issubclass(self.factory_class, FilesystemFactory):
+            self.skipTest("only for filesystem store")
+
+        users = self.factory.get("test_temporary_files").users
+        users.store.save("user1", {"first_name": "ahmed"})
+        users.find_many(first_name="ahmed")
+        # left over by a crash before renaming
+        j.sals.fs.write_file(f"{users.store.index_path}.1234.tmp", "")
+
+        self.assertEqual(users.store.list_all(), ["user1"])
+
+    def test_lazy_decrypt(self):
+        users = self.factory_class(User)
+        user = users.get("test_lazy_decrypt")
+        user.first_name = "ahmed"
+        user.password = "test124"
+        user.save()
+
+        users = self.factory_class(User)
+        users.store.lazy_decrypt = True
+        user = users.get("test_lazy_decrypt")
+        self.assertEqual(user.first_name, "ahmed")
+        self.assertIsInstance(user.__dict__["__password"], EncryptedValue)
+
+        self.assertEqual(user.password, "test124")
+        self.assertEqual(user.__dict__["__password"], "test124")
+        users.delete("test_lazy_decrypt")
+
+    def test_lazy_decrypt_validation(self):
+        accounts = self.factory_class(Account)
+        # written without validation, e.g. by an older version
+        accounts.store.save("test_lazy_decrypt_validation", {"__pin": "123456"})
+
+        accounts = self.factory_class(Account)
+        accounts.store.lazy_decrypt = True
+        account = accounts.get("test_lazy_decrypt_validation")
+        self.assertIsInstance(account.__dict__["__pin"], EncryptedValue)
+
+        with self.assertRaises(fields.ValidationError):
+            account.pin
+        accounts.delete("test_lazy_decrypt_validation")
+
+    def test_batch_save(self):
+        # sub-factories use the default store, use a different name for every store
+        name = f"test_batch_save_{self.factory_class.__name__.lower()}"
+        cl = self.factory.get(name)
+        with self.factory.batch():
+            for i in range(3):
+                user = cl.users.get(f"user_{i}")
+                user.first_name = f"user {i}"
+                user.save()
+
+            # nothing should be written yet
+            self.assertEqual(list(cl.users.store.list_all()), [])
+            self.assertNotIn(name, self.factory.store.list_all())
+
+        self.assertEqual(sorted(cl.users.store.list_all()), ["user_0", "user_1", "user_2"])
+        self.assertIn(name, self.factory.store.list_all())
+
+        users = self.factory_class(Client).get(name).users
+        self.assertEqual(users.get("user_1").first_name, "user 1")
+
+        # nothing is written if an exception is raised inside the batch
+        with self.assertRaises(RuntimeError):
+            with self.factory.batch():
+                user = cl.users.get("user_3")
+                user.save()
+                raise RuntimeError
+
+        self.assertNotIn("user_3", cl.users.store.list_all())
+
+    def test_load_all(self):
+        users = self.factory_class(User)
+        for i in range(4):
+            user = users.get(f"test_load_all_{i}")
+            user.first_name = f"user {i}"
+            user.password = f"password {i}"
+            user.save()
+
+        users = self.factory_class(User)
+        loaded = users.get("test_load_all_0")
+        all_users = users.load_all(workers=2)
+
+        self.assertEqual(sorted(user.instance_name for user in all_users), [f"test_load_all_{i}" for i in range(4)])
+        self.assertIs(users.get("test_load_all_0"), loaded)
+        self.assertEqual(users.test_load_all_3.password, "password 3")
+        self.assertEqual(users.find("test_load_all_2").first_name, "user 2")
+
+        for i in range(4):
+            users.delete(f"test_load_all_{i}")
+
     def test_field_name_in_exception(self):
         cars = self.factory_class(Car)
         bmw = cars.get("bmw")
@@ -19,8 +19,8 @@ class TestConfig(BaseTests):
 
         self.info("Check that some of these config are having the default values.")
         self.assertEqual(default_config.get("store"), "filesystem")
-        self.assertEqual(default_config.get("factory"), {"always_reload": False})
-        self.assertEqual(default_config.get("alerts"), {"enabled": True, "level": 40})
+        self.assertEqual(default_config.get("factory"), {"always_reload": False, "lazy_decrypt": False})
+        self.assertEqual(default_config.get("alerts"), {"enabled": True, "level": 40, "coalesce_window": 0})
 
     def test_02_get_config(self):
         """Test case for getting jsng config.
@@ -182,3 +182,37 @@ class TestConfig(BaseTests):
         self.info("Try to get store config for random store name, should raise error.")
         with self.assertRaises(Exception):
             env.get_store_config(self.generate_random_text())
+
+    def test_08_config_cache(self):
+        """Test case for the cached config.
+
+        **Test Scenario**
+
+        - Get the config and change it without updating.
+        - Check that the cached config has not been changed.
+        - Write the config file directly with a new key.
+        - Check that the new key is read from the changed file.
+        - Remove this key from the config and update the config.
+        """
+        self.info("Get the config and change it without updating.")
+        config = j.core.config.get_config()
+        config["stores"]["filesystem"]["path"] = self.generate_random_text()
+
+        self.info("Check that the cached config has not been changed.")
+        self.assertNotEqual(j.core.config.get("stores")["filesystem"], config["stores"]["filesystem"])
+
+        self.info("Write the config file directly with a new key.")
+        original_config = j.core.config.get_config()
+        key = self.generate_random_text()
+        value = self.generate_random_text()
+        with open(j.core.config.config_path) as f:
+            content = f.read()
+        with open(j.core.config.config_path, "w") as f:
+            f.write(f'{key} = "{value}"\n{content}')
+
+        self.info("Check that the new key is read from the changed file.")
+        self.assertEqual(j.core.config.get(key), value)
+
+        self.info("Remove this key from the config and update the config.")
+        j.core.config.update_config(original_config)
+        self.assertIsNone(j.core.config.get(key))
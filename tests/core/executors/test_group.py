@@ -0,0 +1,159 @@
+import time
+from unittest import mock
+
+from invoke.exceptions import CommandTimedOut
+from invoke.runners import Result
+
+from jumpscale.loader import j
+from jumpscale.core.executors.group import ERROR_RC, TIMEOUT_RC
+from jumpscale.core.executors.pool import ConnectionPool
+from tests.base_tests import BaseTests
+
+
+class FakeExecutor:
+    """stands for a remote executor, sleeps for `delay` seconds then returns the command output"""
+
+    def __init__(self, name, delay=0, rc=0, error=None):
+        self.name = name
+        self.delay = delay
+        self.rc = rc
+        self.error = error
+        self.commands = []
+
+    def run(self, cmd, timeout=None, **command_ctx):
+        self.commands.append((cmd, command_ctx))
+        if timeout and self.delay > timeout:
+            time.sleep(timeout)
+            raise CommandTimedOut(Result(stdout="partial", command=cmd), timeout)
+
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.rc, f"{self.name}: {cmd}", ""
+
+
+class TestGroupExecutor(BaseTests):
+    def test001_results_are_yielded_as_hosts_finish(self):
+        """Test case for running a command on many hosts and getting results as they finish.
+
+        **Test Scenario**
+        - Create a group of 3 hosts, with different delays.
+        - Run a command on the group.
+        - Check that results are yielded in order of finishing, not in order of hosts.
+        - Check that hosts ran concurrently.
+        """
+        self.info("Create a group of 3 hosts, with different delays")
+        hosts = [FakeExecutor("slow", delay=0.6), FakeExecutor("fast", delay=0), FakeExecutor("medium", delay=0.3)]
+        group = j.core.executors.GroupExecutor(hosts, workers=3)
+
+        self.info("Run a command on the group")
+        start = time.monotonic()
+        results = list(group.run("hostname"))
+        elapsed = time.monotonic() - start
+
+        self.info("Check that results are yielded in order of finishing")
+        self.assertEqual([result.host for result in results], ["fast", "medium", "slow"])
+        self.assertEqual(results[0], ("fast", 0, "fast: hostname", ""))
+
+        self.info("Check that hosts ran concurrently")
+        self.assertLess(elapsed, 0.9)
+
+    def test002_failures_and_timeouts(self):
+        """Test case for hosts that fail or time out.
+
+        **Test Scenario**
+        - Create a group with a healthy host, a failing command, an unreachable host and a slow host.
+        - Run a command on the group with a per-host timeout.
+        - Check that every host is reported with its return code, and the others are not affected.
+        """
+        self.info("Create a group with a healthy host, a failing command, an unreachable host and a slow host")
+        hosts = [
+            FakeExecutor("ok"),
+            FakeExecutor("failing", rc=1),
+            FakeExecutor("unreachable", error=ConnectionRefusedError("connection refused")),
+            FakeExecutor("slow", delay=5),
+        ]
+
+        self.info("Run a command on the group with a per-host timeout")
+        start = time.monotonic()
+        results = j.core.executors.GroupExecutor(hosts, timeout=0.2).run_all("uptime")
+        self.assertLess(time.monotonic() - start, 2)
+
+        self.info("Check that every host is reported with its return code")
+        self.assertEqual(results["ok"].rc, 0)
+        self.assertEqual(results["failing"].rc, 1)
+        self.assertEqual(results["unreachable"].rc, ERROR_RC)
+        self.assertIn("connection refused", results["unreachable"].stderr)
+        self.assertEqual(results["slow"].rc, TIMEOUT_RC)
+        self.assertEqual(results["slow"].stdout, "partial")
+
+        self.info("Check that commands are not raising on failures, and output is hidden")
+        _, command_ctx = hosts[0].commands[0]
+        self.assertEqual(command_ctx, {"warn": True, "hide": True})
+
+    def test003_bounded_workers(self):
+        """Test case for limiting the number of hosts running at the same time.
+
+        **Test Scenario**
+        - Create a group of 4 hosts with 2 workers.
+        - Run a command on the group.
+        - Check that no more than 2 hosts were running at the same time.
+        """
+        running = []
+        max_running = []
+
+        class CountingExecutor(FakeExecutor):
+            def run(self, cmd, **command_ctx):
+                running.append(self.name)
+                max_running.append(len(running))
+                time.sleep(0.1)
+                running.remove(self.name)
+                return 0, "", ""
+
+        self.info("Create a group of 4 hosts with 2 workers")
+        group = j.core.executors.GroupExecutor([CountingExecutor(f"host{i}") for i in range(4)], workers=2)
+
+        self.info("Run a command on the group")
+        self.assertEqual(len(list(group.run("ls"))), 4)
+
+        self.info("Check that no more than 2 hosts were running at the same time")
+        self.assertEqual(max(max_running), 2)
+
+    def test004_connection_contexts(self):
+        """Test case for running a command on connection contexts over a mocked transport.
+
+        **Test Scenario**
+        - Mock the pooled connections.
+        - Run a command on 2 connection contexts.
+        - Check that every host ran the command over its own connection, with the given connect timeout.
+        - Check that the command timeout is not used as connect timeout.
+        """
+        self.info("Mock the pooled connections")
+        connections = {}
+
+        def get_connection(**connection_ctx):
+            connection = mock.Mock(is_connected=True)
+            connection.run.return_value = mock.Mock(return_code=0, stdout=connection_ctx["host"], stderr="")
+            connections[connection_ctx["host"]] = (connection, connection_ctx)
+            return connection
+
+        self.info("Run a command on 2 connection contexts")
+        hosts = [{"host": "10.0.0.1", "user": "root"}, {"host": "10.0.0.2", "port": 2222}]
+        with mock.patch("jumpscale.core.executors.remote.pool", ConnectionPool()), mock.patch(
+            "jumpscale.core.executors.pool.fabric.Connection", side_effect=get_connection
+        ):
+            results = dict(
+                (result.host, result)
+                for result in j.core.executors.run_group(hosts, "hostname", timeout=60, connect_timeout=5)
+            )
+
+        self.info("Check that every host ran the command over its own connection")
+        self.assertEqual(results["10.0.0.1"], ("10.0.0.1", 0, "10.0.0.1", ""))
+        self.assertEqual(results["10.0.0.2:2222"], ("10.0.0.2:2222", 0, "10.0.0.2", ""))
+        connection, connection_ctx = connections["10.0.0.1"]
+        connection.run.assert_called_once_with("hostname", warn=True, hide=True, timeout=60)
+        self.assertEqual(connection_ctx["connect_timeout"], 5)
+
+        self.info("Check that the command timeout is not used as connect timeout")
+        [(_, executor)] = j.core.executors.GroupExecutor([{"host": "10.0.0.3"}], timeout=60).executors
+        self.assertNotIn("connect_timeout", executor._connection_ctx)
@@ -0,0 +1,159 @@
+import threading
+import time
+from unittest import mock
+
+import fabric
+
+from jumpscale.loader import j
+from jumpscale.core.executors.pool import ConnectionPool
+from tests.base_tests import BaseTests
+
+
+def get_connection(**connection_ctx):
+    """stands for a fabric connection, commands sleep for `delay` seconds (from the command) then return it"""
+    connection = mock.Mock(is_connected=True, connection_ctx=connection_ctx)
+    connection.transport.is_active.return_value = True
+    # whether the connection was closed while running each command
+    connection.closed_while_running = []
+
+    def run(cmd, **command_ctx):
+        time.sleep(float(cmd.split()[-1]))
+        connection.closed_while_running.append(connection.close.called)
+        return mock.Mock(return_code=0, stdout=cmd, stderr="")
+
+    connection.run.side_effect = run
+    return connection
+
+
+class TestConnectionPool(BaseTests):
+    def setUp(self):
+        super().setUp()
+        self.connections = []
+
+        def open_connection(**connection_ctx):
+            self.connections.append(get_connection(**connection_ctx))
+            return self.connections[-1]
+
+        patcher = mock.patch("jumpscale.core.executors.pool.fabric.Connection", side_effect=open_connection)
+        self.connection_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = ConnectionPool()
+
+    def test001_keys(self):
+        """Test case for pooling connections by their contexts.
+
+        **Test Scenario**
+        - Get connections of the same context twice, check that the same connection is returned.
+        - Get connections of different contexts, check that different connections are returned.
+        - Get connections of contexts with an unhashable config, check that they are pooled by config object.
+        """
+        self.info("Get connections of the same context twice")
+        connection = self.pool.get(host="10.0.0.1", connect_kwargs={"key_filename": ["/tmp/key"]})
+        self.assertIs(self.pool.get(host="10.0.0.1", connect_kwargs={"key_filename": ["/tmp/key"]}), connection)
+        self.assertEqual(len(self.connections), 1)
+
+        self.info("Get connections of different contexts")
+        self.assertIsNot(self.pool.get(host="10.0.0.1", port=2222), connection)
+        self.assertIsNot(self.pool.get(host="10.0.0.2", connect_kwargs={"key_filename": ["/tmp/key"]}), connection)
+
+        self.info("Get connections of contexts with an unhashable config")
+        config = fabric.Config()
+        connection = self.pool.get(host="10.0.0.1", config=config)
+        self.assertIs(self.pool.get(host="10.0.0.1", config=config), connection)
+        self.assertIsNot(self.pool.get(host="10.0.0.1", config=fabric.Config()), connection)
+        self.assertEqual(len(self.pool), 5)
+
+    def test002_health_check(self):
+        """Test case for re-opening broken connections.
+
+        **Test Scenario**
+        - Get a connection, and break its transport.
+        - Check that it's returned as long as it was used recently.
+        - Check that it's re-opened when it was not used for more than health check interval.
+        - Check that a disconnected connection is re-opened.
+        """
+        self.info("Get a connection, and break its transport")
+        connection = self.pool.get(host="10.0.0.1")
+        connection.transport.is_active.return_value = False
+
+        self.info("Check that it's returned as long as it was used recently")
+        self.assertIs(self.pool.get(host="10.0.0.1"), connection)
+
+        self.info("Check that it's re-opened when it was not used for more than health check interval")
+        self.pool.health_check_interval = 0
+        new_connection = self.pool.get(host="10.0.0.1")
+        self.assertIsNot(new_connection, connection)
+        connection.close.assert_called_once_with()
+
+        self.info("Check that a disconnected connection is re-opened")
+        new_connection.is_connected = False
+        self.assertIsNot(self.pool.get(host="10.0.0.1"), new_connection)
+
+    def test003_evict_idle(self):
+        """Test case for closing idle connections, but not connections in use.
+
+        **Test Scenario**
+        - Hold a connection in use, and another one not.
+        - Evict connections not used for more than max idle.
+        - Check that only the connection which is not in use is closed.
+        - Check that the connection is closed when it's not in use anymore.
+        """
+        self.info("Hold a connection in use, and another one not")
+        self.pool.max_idle = 0.1
+        idle_connection = self.pool.get(host="10.0.0.2")
+        with self.pool.use(host="10.0.0.1") as connection:
+            time.sleep(0.2)
+
+            self.info("Evict connections not used for more than max idle")
+            self.pool.evict_idle()
+
+            self.info("Check that only the connection which is not in use is closed")
+            idle_connection.close.assert_called_once_with()
+            connection.close.assert_not_called()
+            self.assertEqual(len(self.pool), 1)
+
+        self.info("Check that the connection is closed when it's not in use anymore")
+        time.sleep(0.2)
+        self.pool.evict_idle()
+        connection.close.assert_called_once_with()
+        self.assertEqual(len(self.pool), 0)
+
+    def test004_concurrent_run_many(self):
+        """Test case for running many commands concurrently over one pooled connection.
+
+        **Test Scenario**
+        - Run commands concurrently using run_many, while idle connections are evicted all the time.
+        - Check that commands ran concurrently over one connection, and results are in order.
+        - Check that the connection was not closed while running commands, and it's closed as idle after that.
+        """
+        self.info("Run commands concurrently using run_many, while idle connections are evicted all the time")
+        self.pool.max_idle = 0
+        stop = threading.Event()
+
+        def evict():
+            while not stop.is_set():
+                self.pool.evict_idle()
+                time.sleep(0.01)
+
+        evictor = threading.Thread(target=evict)
+        evictor.start()
+        try:
+            with mock.patch("jumpscale.core.executors.remote.pool", self.pool):
+                executor = j.core.executors.RemoteExecutor(host="10.0.0.1")
+                cmds = [f"sleep {delay}" for delay in (0.3, 0.1, 0.2, 0.3)]
+                start = time.monotonic()
+                results = executor.run_many(cmds)
+                elapsed = time.monotonic() - start
+        finally:
+            stop.set()
+            evictor.join()
+
+        self.info("Check that commands ran concurrently over one connection, and results are in order")
+        self.assertEqual(results, [(0, cmd, "") for cmd in cmds])
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(len(self.connections), 1)
+
+        self.info("Check that the connection was not closed while running commands")
+        self.assertEqual(self.connections[0].closed_while_running, [False] * len(cmds))
+        self.pool.evict_idle()
+        self.connections[0].close.assert_called_once_with()
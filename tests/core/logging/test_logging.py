@@ -1,3 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from unittest import mock
+
 from tests.base_tests import BaseTests
 from jumpscale.loader import j
 
@@ -91,3 +95,137 @@ class TestLogging(BaseTests):
     def test_03_test_register_invalid_app_name(self):
         with self.assertRaises(j.exceptions.Value):
             j.logger.register("")
+
+    def test_04_queued_redis_handler(self):
+        handler = j.logger.redis
+        handler._queued = True
+        try:
+            test_records_count = handler.max_size * 3
+
+            for i in range(test_records_count):
+                test_value = i + 1
+                j.logger.info("message {}", test_value, category=str(test_value))
+
+            handler.flush()
+            self.assertEqual(handler.records_count(TEST_APP_NAME), test_records_count)
+
+            for test_value in (1, handler.max_size, handler.max_size + 1, test_records_count):
+                record = handler.record_get(test_value, TEST_APP_NAME)
+                self.assertEqual(record["id"], test_value)
+                self.assertEqual(record["category"], str(test_value))
+
+            records = handler.tail(TEST_APP_NAME)
+            self.assertEqual(len(list(records)), handler.max_size)
+        finally:
+            handler.close()
+            handler._queued = False
+
+    def test_05_iter_records(self):
+        handler = j.logger.redis
+        test_records_count = handler.max_size * 2 + 50
+
+        for i in range(test_records_count):
+            j.logger.info("message {}", i + 1)
+
+        dump_dir = j.sals.fs.join_paths(handler.dump_dir, TEST_APP_NAME)
+        dumped_parts = [j.sals.fs.basename(path) for path in j.sals.fs.walk_files(dump_dir, recursive=False)]
+        self.assertEqual(sorted(dumped_parts), [f"{handler.max_size}.records", f"{handler.max_size * 2}.records"])
+
+        records = list(handler.iter_records(TEST_APP_NAME))
+        self.assertEqual([record["id"] for record in records], list(range(1, test_records_count + 1)))
+
+        # a range across a dumped part and redis
+        start_id, end_id = handler.max_size * 2 - 10, handler.max_size * 2 + 10
+        records = list(handler.iter_records(TEST_APP_NAME, start_id=start_id, end_id=end_id))
+        self.assertEqual([record["id"] for record in records], list(range(start_id, end_id + 1)))
+
+        epoch = records[5]["epoch"]
+        records = handler.iter_records(TEST_APP_NAME, start_time=epoch, end_time=epoch)
+        self.assertTrue(all(record["epoch"] == epoch for record in records))
+
+        record = handler.record_get(handler.max_size + 1, TEST_APP_NAME)
+        self.assertEqual(record["message"], f"message {handler.max_size + 1}")
+
+    def test_06_queued_redis_handler_drops_and_restarts(self):
+        handler = j.logger.redis
+        handler._queued = True
+        dropped_count = handler.dropped_count
+        try:
+            with mock.patch("atexit.register") as register, mock.patch.object(
+                handler, "_is_db_running", return_value=False
+            ):
+                for _ in range(2):
+                    # records are dropped by the flusher as redis is not available
+                    with ThreadPoolExecutor(max_workers=4) as executor:
+                        list(executor.map(lambda i: j.logger.info("message {}", i), range(200)))
+                    handler.close()
+
+            self.assertEqual(handler.dropped_count - dropped_count, 400)
+            # close is registered once, even if the flusher is started again
+            self.assertLessEqual(register.call_count, 1)
+        finally:
+            handler.close()
+            handler._queued = False
+
+    def test_07_invalid_dumped_parts(self):
+        handler = j.logger.redis
+        test_records_count = handler.max_size * 2 + 10
+
+        for i in range(test_records_count):
+            j.logger.info("message {}", i + 1)
+
+        dump_dir = j.sals.fs.join_paths(handler.dump_dir, TEST_APP_NAME)
+        # first part is truncated, second part is empty
+        first_part = j.sals.fs.join_paths(dump_dir, f"{handler.max_size}.records")
+        with open(first_part, "r+b") as f:
+            f.truncate(10)
+        second_part = j.sals.fs.join_paths(dump_dir, f"{handler.max_size * 2}.records")
+        open(second_part, "wb").close()
+
+        self.assertIsNone(handler.record_get(handler.max_size + 1, TEST_APP_NAME))
+        self.assertIsNone(handler.record_get(handler.max_size * 2 - 1, TEST_APP_NAME))
+        records = list(handler.iter_records(TEST_APP_NAME))
+        self.assertEqual(
+            [record["id"] for record in records], list(range(handler.max_size * 2 + 1, test_records_count + 1))
+        )
+
+    def test_08_queued_redis_handler_after_fork(self):
+        handler = j.logger.redis
+        handler._queued = True
+        try:
+            # a forked child inherits the flusher, but not its thread
+            dead_flusher = threading.Thread(target=lambda: None)
+            dead_flusher.start()
+            dead_flusher.join()
+            handler._flusher = dead_flusher
+
+            j.logger.info("message after fork")
+            handler.close()
+            self.assertEqual(handler.records_count(TEST_APP_NAME), 1)
+
+            handler._after_fork_in_child()
+            self.assertIsNone(handler._flusher)
+            j.logger.info("message after fork")
+            handler.close()
+            self.assertEqual(handler.records_count(TEST_APP_NAME), 2)
+        finally:
+            handler.close()
+            handler._queued = False
+
+    def test_09_redis_handler_reports_write_failures(self):
+        handler = j.logger.redis
+        dropped_count = handler.dropped_count
+        with mock.patch("sys.stderr") as stderr, mock.patch.object(
+            handler, "_write_records", side_effect=ConnectionError("connection refused")
+        ):
+            for i in range(3):
+                j.logger.info("message {}", i)
+
+        # reported once per failures streak
+        self.assertEqual(handler.dropped_count - dropped_count, 3)
+        self.assertEqual(stderr.write.call_count, 1)
+        self.assertIn("connection refused", stderr.write.call_args[0][0])
+
+        j.logger.info("message")
+        self.assertEqual(handler.records_count(TEST_APP_NAME), 1)
+        self.assertFalse(handler._write_failed)
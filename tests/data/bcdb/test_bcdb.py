@@ -0,0 +1,103 @@
+import os
+import tempfile
+from unittest import mock
+
+import pytest
+from redis import Redis
+
+from jumpscale.data.bcdb import bcdb
+from jumpscale.loader import j
+
+
+@pytest.fixture
+def db():
+    namespace = f"test_bcdb_{j.data.random_names.random_name()}"
+    # sonic (text index) is not needed here
+    with mock.patch.object(bcdb, "SonicIndexTextClient"):
+        db = bcdb.BCDB(namespace)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db.indexer_set.db_path = os.path.join(tmpdir, "index.db")
+        yield db
+        db.indexer_set.close()
+
+    redis_client = Redis()
+    for key in redis_client.scan_iter(match=f"{namespace}.*"):
+        redis_client.delete(key)
+
+
+def test_save_many_and_find(db):
+    model = db.get_model_by_name("employee")
+    employees = [model.create_obj({"name": f"employee{i}", "salary": i * 1000}) for i in range(10)]
+    model.save_many(employees)
+
+    # read back
+    for employee in employees:
+        saved = db.get_item_by_id(model, employee.id)
+        assert (saved.name, saved.salary) == (employee.name, employee.salary)
+
+    # found using redis index
+    assert db.get_item_from_index(model, "name", "employee3").id == employees[3].id
+    assert db.get_ids_from_index(model, [("name", "employee1"), ("name", "employee9")]) == [
+        employees[1].id,
+        employees[9].id,
+    ]
+
+    # found using sqlite index
+    found = db.get_item_from_index_set(model, "salary", 2000, 4000)
+    assert sorted(employee.name for employee in found) == ["employee2", "employee3", "employee4"]
+
+
+def test_save_many_updates_indexes(db):
+    model = db.get_model_by_name("employee")
+    employees = [model.create_obj({"name": f"employee{i}", "salary": i * 1000}) for i in range(3)]
+    model.save_many(employees)
+
+    for employee in employees:
+        employee.name = f"renamed_{employee.name}"
+        employee.salary += 10000
+    model.save_many(employees)
+
+    # old index entries are removed
+    assert db.get_item_from_index(model, "name", "employee1") is None
+    assert db.get_item_from_index_set(model, "salary", 0, 9999) == []
+
+    assert db.get_item_from_index(model, "name", "renamed_employee1").id == employees[1].id
+    found = db.get_item_from_index_set(model, "salary", 10000, 12000)
+    assert sorted(employee.name for employee in found) == [f"renamed_employee{i}" for i in range(3)]
+
+
+def test_bulk_set(db):
+    model = db.get_model_by_name("employee")
+    employees = [model.create_obj({"name": f"employee{i}", "salary": i}) for i in range(5)]
+    db.indexer_set.bulk_set(model, employees)
+    assert sorted(row[0] for row in db.indexer_set.get(model, "salary", 1, 3)) == [
+        employee.id for employee in employees[1:4]
+    ]
+
+    # replaced, not duplicated
+    employees[1].salary = 100
+    db.indexer_set.bulk_set(model, employees[1:2])
+    assert sorted(row[0] for row in db.indexer_set.get(model, "salary", 1, 3)) == [
+        employee.id for employee in employees[2:4]
+    ]
+    assert db.indexer_set.get(model, "salary", 100, 100) == [(employees[1].id,)]
+
+
+def test_save_many_with_separate_index_server(db, request):
+    # another database stands for another redis server
+    index_client = db.indexer.redis_client = Redis(db=1)
+
+    def clean_index_server():
+        for key in index_client.scan_iter(match=f"{db.ns}.*"):
+            index_client.delete(key)
+
+    request.addfinalizer(clean_index_server)
+    model = db.get_model_by_name("employee")
+    employees = [model.create_obj({"name": f"employee{i}", "salary": i}) for i in range(3)]
+    model.save_many(employees)
+
+    assert db.get_item_from_index(model, "name", "employee2").id == employees[2].id
+    index_key = db.indexer._get_key(model, "name", "employee2")
+    assert db.indexer.redis_client.exists(index_key)
+    assert not db.storage.redis_client.exists(index_key)
@@ -1,5 +1,6 @@
 # coding: utf-8
 import hashlib
+import json
 import pytest
 import os
 import tempfile
@@ -84,3 +85,45 @@ def test_hash_dir(make_list):
         base_hexdigest = ha.hexdigest()
         for value in j.data.hash.hash_directory(dir_path, h).values():
             assert value == base_hexdigest
+
+
+def test_hash_dir_parallel_with_cache():
+    dir_path = tempfile.mkdtemp()
+    os.makedirs(os.path.join(dir_path, "sub", "subsub"))
+    for i, rel_path in enumerate(["a", "sub/b", "sub/subsub/c"]):
+        with open(os.path.join(dir_path, rel_path), "w") as f:
+            f.write(f"content {i}")
+
+    expected = j.data.hash.hash_directory(dir_path, "sha256")
+    assert len(expected) == 3
+    assert j.data.hash.hash_directory(dir_path, "sha256", workers=4) == expected
+
+    cache_path = os.path.join(tempfile.mkdtemp(), "hashes.json")
+    assert j.data.hash.hash_directory(dir_path, "sha256", cache_path=cache_path) == expected
+    # cached hashes are used as long as (inode, size, mtime) did not change
+    with open(cache_path) as f:
+        cache = json.load(f)
+    cache["sha256"][os.path.join(dir_path, "a")][3] = "cached"
+    with open(cache_path, "w") as f:
+        json.dump(cache, f)
+    assert (
+        j.data.hash.hash_directory(dir_path, "sha256", cache_path=cache_path)[os.path.join(dir_path, "a")] == "cached"
+    )
+
+    tree_hash = j.data.hash.hash_tree(dir_path, "sha256", workers=2)
+    assert j.data.hash.hash_tree(dir_path, "sha256") == tree_hash
+    os.rename(os.path.join(dir_path, "sub", "b"), os.path.join(dir_path, "sub", "subsub", "b"))
+    assert j.data.hash.hash_tree(dir_path, "sha256") != tree_hash
+
+
+def test_hash_dir_does_not_follow_dir_symlinks():
+    dir_path = tempfile.mkdtemp()
+    os.makedirs(os.path.join(dir_path, "sub"))
+    with open(os.path.join(dir_path, "sub", "a"), "w") as f:
+        f.write("content")
+    # a loop
+    os.symlink(dir_path, os.path.join(dir_path, "sub", "loop"))
+
+    hashes = j.data.hash.hash_directory(dir_path, "sha256")
+    assert list(hashes) == [os.path.join(dir_path, "sub", "a")]
+    assert list(j.data.hash.iter_files(dir_path)) == [os.path.join(dir_path, "sub", "a")]
@@ -43,3 +43,18 @@ def test_extract(tear_down):
     assert os.path.isdir(f"{out_dir}/tmp")
     j.sals.fs.rmtree(dir_0)
     j.sals.fs.rmtree(out_dir)
+
+
+def test_compress_with_exclude(tear_down):
+    dir_0 = tempfile.mkdtemp()
+    source = os.path.join(dir_0, "build")
+    os.makedirs(os.path.join(source, "sub", "build"))
+    for rel_path in ["a.py", "a.pyc", "sub/b.py", "sub/build/c.py"]:
+        j.sals.fs.touch(os.path.join(source, rel_path))
+
+    # the source matches an exclude pattern too, only what's under it is excluded
+    j.data.tarfile.compress(source, "/tmp/x", exclude=["build", "*.pyc"])
+    with j.data.tarfile.Reader("/tmp/x") as tar:
+        names = [name[len(source.lstrip("/")) :] for name in tar.get_content()]
+    assert sorted(names) == ["", "/a.py", "/sub", "/sub/b.py"]
+    j.sals.fs.rmtree(dir_0)
@@ -157,3 +157,22 @@ class TestFS(BaseTests):
         else:
             self.assertEqual(1, len(dirs))
             self.assertNotIn(random_dir_dest_3, dirs)
+
+    def test013_walk_with_exclude_and_stat(self):
+        random_dir_dest, random_dir_dest_2, random_files, random_files_internal = self.create_tree()
+        excluded_dir = j.sals.fs.join_paths(random_dir_dest, "node_modules")
+        excluded_file = j.sals.fs.join_paths(excluded_dir, self.generate_random_text())
+        j.sals.fs.mkdirs(excluded_dir)
+        j.sals.fs.touch(excluded_file)
+
+        self.info("Assert walk_files does not walk excluded directories")
+        files = list(j.sals.fs.walk_files(random_dir_dest, exclude=["node_modules"]))
+        self.assertEqual(sorted(files), sorted(random_files + random_files_internal))
+
+        self.info("Assert walk_dirs does not return excluded directories")
+        dirs = list(j.sals.fs.walk_dirs(random_dir_dest, exclude=["node_*"]))
+        self.assertEqual(dirs, [random_dir_dest_2])
+
+        self.info("Assert walk_files yields stat results with with_stat")
+        for path, stat in j.sals.fs.walk_files(random_dir_dest, with_stat=True):
+            self.assertEqual(stat.st_ino, j.sals.fs.stat(path).st_ino)
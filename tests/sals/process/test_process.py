@@ -782,3 +782,39 @@ class ProcessTests(BaseTests):
         else:
             self.info("Check that only pids that match the regex are returned.")
             self.assertEqual(pids, sorted(sorted_pids))
+
+    def test_23_process_snapshot(self):
+        """Test case for querying a process snapshot.
+
+        **Test Scenario**
+
+        - Start python server in tmux.
+        - Check that the server has been started.
+        - Take a process snapshot.
+        - Check that the server is found by name, port and user in the snapshot.
+        - Check that processes info from the snapshot are the same as without it.
+        """
+        self.info("Start python server in tmux.")
+        port = j.sals.nettools.get_free_port()
+        cmd = f"python3 -m {PYTHON_SERVER_NAME} {port}"
+        self.start_in_tmux(cmd)
+        self.assertTrue(j.sals.nettools.wait_connection_test(HOST, port, 2))
+
+        self.info("Check that the server has been started.")
+        pids = self.get_process_pids(PYTHON_SERVER_NAME, full=True)
+        self.assertEqual(len(pids), 1)
+
+        self.info("Take a process snapshot.")
+        snapshot = j.sals.process.ProcessSnapshot()
+
+        self.info("Check that the server is found by name, port and user in the snapshot.")
+        self.assertEqual(snapshot.get_pids(PYTHON_SERVER_NAME, full_cmd_line=True), pids)
+        self.assertEqual(snapshot.get_process_by_port(port).pid, pids[0])
+        self.assertIn(pids[0], [proc.pid for proc in snapshot.get_user_processes(getpass.getuser())])
+        self.assertEqual(snapshot.get_process(pids[0]).info["name"], "python3")
+
+        self.info("Check that processes info from the snapshot are the same as without it.")
+        processes_info = j.sals.process.get_processes_info(filterstr="python3", limit=-1, snapshot=snapshot)
+        server_info = [process_info for process_info in processes_info if process_info["pid"] == pids[0]]
+        self.assertEqual(len(server_info), 1)
+        self.assertEqual(server_info[0]["ports"], [{"port": port, "status": "LISTEN"}])
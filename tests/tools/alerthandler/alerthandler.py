@@ -26,3 +26,85 @@ class TestFS(BaseTests):
             break
         else:
             self.fail("Alert handler not registered")
+
+    def test_find_with_indexes_and_pagination(self):
+        """Tests finding alerts using the indexes, with pagination"""
+        handler = j.tools.alerthandler
+        handler.reset()
+
+        self.info("Raising alerts")
+        for i in range(10):
+            handler.alert_raise(
+                f"app_{i % 2}",
+                f"message {i}",
+                category="tests",
+                timestamp=1000 + i,
+                traceback={"process_id": 100 + i % 3},
+            )
+
+        self.info("Finding alerts by app name, category and pid")
+        self.assertEqual(len(handler.find()), 10)
+        self.assertEqual(
+            [alert.message for alert in handler.find(app_name="APP_0", pid=100)], ["message 0", "message 6"]
+        )
+        self.assertEqual(len(handler.find(category="tests", message="message 1")), 1)
+        self.assertEqual(len(handler.find(start_time=1004, end_time=1002)), 3)
+
+        self.info("Paginating alerts")
+        page = handler.find(limit=4)
+        self.assertEqual(len(page), 4)
+        page = handler.find(cursor=page[-1].id, limit=4)
+        self.assertEqual([alert.message for alert in page], ["message 4", "message 5", "message 6", "message 7"])
+
+        self.info("Deleting an alert and rebuilding the index")
+        handler.delete(alert_id=page[0].id)
+        self.assertEqual(len(handler.find(app_name="app_0")), 4)
+        handler.db.delete(handler._rkey_index_ids)
+        self.assertEqual(len(handler.find(app_name="app_0")), 4)
+
+        handler.reset()
+
+    def test_coalescing_repeated_alerts(self):
+        """Tests coalescing repeated occurrences of the same alert, with bounded tracebacks"""
+        handler = j.tools.alerthandler
+        handler.reset()
+        handler.coalesce_window = 60
+        try:
+            self.info("Raising the same alert many times")
+            alert = handler.alert_raise("Tests", "coalesced", traceback={"process_id": 1})
+            self.assertEqual(alert.count, 1)
+            for i in range(20):
+                coalesced_alert = handler.alert_raise("Tests", "coalesced", traceback={"process_id": i})
+                self.assertEqual(coalesced_alert.id, alert.id)
+                self.assertEqual(coalesced_alert.count, i + 2)
+            self.assertEqual(coalesced_alert.status, "open")
+
+            self.info("Only the first occurrence is written before flushing")
+            self.assertEqual(handler.get(alert_id=alert.id).count, 1)
+
+            handler.flush()
+            alert = handler.get(alert_id=alert.id)
+            self.assertEqual(alert.count, 21)
+            self.assertEqual([traceback["process_id"] for traceback in alert.tracebacks], [15, 16, 17, 18, 19])
+        finally:
+            handler.coalesce_window = 0
+            handler.reset()
+
+    def test_coalescing_forgets_old_alerts(self):
+        """Tests that alerts which are not raised again are forgotten after the coalescing window"""
+        handler = j.tools.alerthandler
+        handler.reset()
+        handler.coalesce_window = 0.2
+        try:
+            self.info("Raising many different alerts once")
+            for i in range(10):
+                handler.alert_raise("Tests", f"once {i}")
+            self.assertEqual(len(handler._last_written), 10)
+
+            self.info("Raising a new alert after the window, old ones are forgotten")
+            time.sleep(0.3)
+            alert = handler.alert_raise("Tests", "new")
+            self.assertEqual(list(handler._last_written), [alert.identifier])
+        finally:
+            handler.coalesce_window = 0
+            handler.reset()
@@ -1,3 +1,6 @@
+import subprocess
+import time
+
 from gevent import sleep
 from unittest import TestCase
 
@@ -54,6 +57,50 @@ class TestStartupCmd(TestCase):
         cmd.stop()
         self.assertFalse(cmd.is_running())
 
+    def test003_wait_for_ports_and_stop(self):
+        cmd = self._get_instance()
+        port = j.sals.nettools.get_free_port()
+        cmd.executor = "foreground"
+        cmd.ports = [port]
+
+        # start the process ourselves after a delay, then wait for the port to accept connections
+        proc = subprocess.Popen(
+            ["bash", "-c", f"sleep 1; exec -a startupcmd_{cmd.instance_name} {self.run_cmd[:-2]} {port}"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        cmd.wait_for_running(timeout=10)
+        self.assertTrue(cmd.is_running())
+        self.assertEqual(cmd.pid, proc.pid)
+
+        # stop is detected as soon as the process exits
+        subprocess.Popen(["bash", "-c", f"sleep 1; kill {proc.pid}"])
+        start = time.monotonic()
+        cmd.wait_for_stop(timeout=10)
+        self.assertLess(time.monotonic() - start, 3)
+        self.assertIsNotNone(proc.poll())
+        self.assertFalse(cmd.is_running())
+
+    def test004_find_processes_by_filters(self):
+        cmd = self._get_instance()
+        name = f"startupcmd_{cmd.instance_name}"
+        proc = subprocess.Popen(["bash", "-c", f"exec -a {name} sleep 30"])
+        try:
+            sleep(0.5)
+            # substring match
+            cmd.process_strings = [f"{name} 30"]
+            self.assertEqual([process.pid for process in cmd._get_processes_by_port_or_filter()], [proc.pid])
+
+            # regex match, from the start of the command line
+            cmd.process_strings = []
+            cmd.process_strings_regex = [rf"^{name} \d+$"]
+            self.assertEqual([process.pid for process in cmd._get_processes_by_port_or_filter()], [proc.pid])
+            cmd.process_strings_regex = [r"\d+$"]
+            self.assertNotIn(proc.pid, [process.pid for process in cmd._get_processes_by_port_or_filter()])
+        finally:
+            proc.kill()
+            proc.wait()
+
     def tearDown(self):
         for instance in self.instances:
             cmd = j.tools.startupcmd.find(instance)
@@ -0,0 +1,201 @@
+import hashlib
+import os
+import shlex
+from contextlib import nullcontext
+from unittest import mock
+
+import pytest
+
+from jumpscale.loader import j
+from jumpscale.tools import syncer as syncer_module
+from jumpscale.tools.syncer import DELETE, MKDIR, RENAME
+
+
+def get_client(calls):
+    connection = mock.Mock()
+    connection.run.side_effect = lambda cmd, **kwargs: calls.append(("run", cmd))
+    sftp = connection.client.open_sftp.return_value
+    sftp.get_channel.return_value.closed = False
+    sftp.get_channel.return_value.get_transport.return_value = connection.transport
+    sftp.posix_rename.side_effect = lambda old, new: calls.append(("rename", old, new))
+
+    client = mock.Mock(instance_name="test")
+    client.sshclient.use_connection.return_value = nullcontext(connection)
+    return client
+
+
+def get_syncer(client):
+    syncer = j.tools.syncer.Syncer(["test"], {"/tmp/src": "/tmp/dest"})
+    syncer._sshclients = [client]
+    return syncer
+
+
+def test_operations_in_event_order():
+    calls = []
+    client = get_client(calls)
+    syncer = get_syncer(client)
+
+    # rename dir a to b, then delete b/x, then delete c, d and create e
+    syncer._add_pending(RENAME, "/tmp/dest/b", "/tmp/dest/a")
+    syncer._add_pending(DELETE, "/tmp/dest/b/x")
+    syncer._add_pending(DELETE, "/tmp/dest/c")
+    syncer._add_pending(DELETE, "/tmp/dest/d")
+    syncer._add_pending(MKDIR, "/tmp/dest/e")
+    syncer.flush()
+
+    assert calls == [
+        ("rename", "/tmp/dest/a", "/tmp/dest/b"),
+        # consecutive deletions are done with one command
+        ("run", "rm -rf /tmp/dest/b/x /tmp/dest/c /tmp/dest/d"),
+        ("run", "mkdir -p /tmp/dest/e"),
+    ]
+
+
+def test_failure_resets_own_sftp_session_only():
+    calls = []
+    client = get_client(calls)
+    connection = client.sshclient.use_connection.return_value.enter_result
+    syncer = get_syncer(client)
+
+    connection.run.side_effect = OSError("broken")
+    syncer._add_pending(DELETE, "/tmp/dest/x")
+    syncer.flush()
+
+    # the sftp session of the syncer is closed, the pooled connection is not
+    connection.client.open_sftp.return_value.close.assert_called_once_with()
+    connection.close.assert_not_called()
+    client.sshclient.close.assert_not_called()
+
+    # a new session is opened on next use
+    connection.run.side_effect = None
+    syncer._add_pending(DELETE, "/tmp/dest/x")
+    syncer.flush()
+    assert connection.client.open_sftp.call_count == 2
+
+
+@pytest.fixture
+def local_path(tmp_path, monkeypatch):
+    """a watched directory with two files, and a temporary manifests directory"""
+    monkeypatch.setattr(syncer_module, "MANIFESTS_DIR", str(tmp_path / "manifests"))
+    src_path = tmp_path / "src"
+    (src_path / "sub").mkdir(parents=True)
+    for rel_path, content in (("a.txt", b"aaa"), ("sub/b.txt", b"bbb")):
+        (src_path / rel_path).write_bytes(content)
+        os.utime(src_path / rel_path, (1000, 1000))
+    return str(src_path)
+
+
+def get_delta_syncer(calls, src_path, remote_files, find_fails=False):
+    """gets a syncer of a client to a stand-in remote machine
+
+    `remote_files` is a dict of relative file path: (content, mtime) under /tmp/dest
+    """
+
+    def run(cmd, **kwargs):
+        if " find " in cmd:
+            if find_fails:
+                return mock.Mock(failed=True, stdout="", stderr="find: unrecognized: -printf")
+            dirs = {os.path.dirname(rel_path) for rel_path in remote_files} - {""}
+            stdout = "".join(f"d 0 0 {rel_dir}\0" for rel_dir in dirs)
+            stdout += "".join(
+                f"f {len(content)} {mtime}.5 {rel_path}\0" for rel_path, (content, mtime) in remote_files.items()
+            )
+            return mock.Mock(failed=False, stdout=stdout)
+
+        if "sha256sum" in cmd:
+            calls.append(("sha256sum", cmd))
+            rel_paths = shlex.split(cmd.split(" -- ", 1)[1])
+            stdout = "".join(
+                f"{hashlib.sha256(remote_files[rel_path][0]).hexdigest()}  {rel_path}\n" for rel_path in rel_paths
+            )
+            return mock.Mock(failed=False, stdout=stdout)
+
+        calls.append(("run", cmd))
+        return mock.Mock(failed=False, stdout="")
+
+    client = get_client(calls)
+    connection = client.sshclient.use_connection.return_value.enter_result
+    connection.run.side_effect = run
+    sftp = connection.client.open_sftp.return_value
+    sftp.put.side_effect = lambda src, dest: calls.append(("put", dest))
+    sftp.utime.side_effect = lambda dest, times: calls.append(("utime", dest))
+
+    syncer = j.tools.syncer.Syncer(["test"], {src_path: "/tmp/dest"})
+    syncer._sshclients = [client]
+    return syncer
+
+
+def get_saved_manifest(src_path):
+    return j.data.serializers.json.load_from_file(syncer_module.Syncer([], {})._get_manifest_path(src_path))
+
+
+def test_delta_sync_skips_unchanged_files(local_path):
+    calls = []
+    # b.txt has a different mtime only, it's compared by hash and only its mtime is set
+    remote_files = {"a.txt": (b"aaa", 1000), "sub/b.txt": (b"bbb", 2000)}
+    get_delta_syncer(calls, local_path, remote_files).sync()
+
+    assert [call[0] for call in calls] == ["sha256sum", "utime"]
+    assert calls[-1] == ("utime", "/tmp/dest/sub/b.txt")
+    # hashes computed are kept for next runs
+    assert get_saved_manifest(local_path)["sub/b.txt"] == [3, 1000, hashlib.sha256(b"bbb").hexdigest()]
+
+    calls.clear()
+    remote_files["sub/b.txt"] = (b"bbb", 1000)
+    get_delta_syncer(calls, local_path, remote_files).sync()
+    assert calls == []
+
+
+def test_delta_sync_uploads_changed_files(local_path):
+    calls = []
+    # a.txt has a different size, b.txt has a different mtime and content, c.txt is missing
+    remote_files = {"a.txt": (b"a", 1000), "sub/b.txt": (b"ccc", 2000)}
+    j.sals.fs.write_file(os.path.join(local_path, "c.txt"), "ccc")
+    os.utime(os.path.join(local_path, "c.txt"), (1000, 1000))
+    get_delta_syncer(calls, local_path, remote_files).sync()
+
+    puts = sorted(call[1] for call in calls if call[0] == "put")
+    assert puts == ["/tmp/dest/a.txt", "/tmp/dest/c.txt", "/tmp/dest/sub/b.txt"]
+    # uploaded files get the local mtime
+    assert sorted(call[1] for call in calls if call[0] == "utime") == puts
+    # existing directories are not created again
+    assert ("run", "mkdir -p /tmp/dest/sub") not in calls
+
+
+def test_delta_sync_deleted_local_file(local_path):
+    calls = []
+    remote_files = {"a.txt": (b"aaa", 1000), "sub/b.txt": (b"bbb", 1000)}
+    get_delta_syncer(calls, local_path, remote_files).sync()
+    assert set(get_saved_manifest(local_path)) == {"a.txt", "sub/b.txt"}
+
+    os.remove(os.path.join(local_path, "sub", "b.txt"))
+    get_delta_syncer(calls, local_path, remote_files).sync()
+
+    # nothing is uploaded, and the deleted file is forgotten by the manifest
+    assert calls == []
+    assert set(get_saved_manifest(local_path)) == {"a.txt"}
+
+
+def test_delta_sync_corrupt_manifest(local_path):
+    calls = []
+    manifest_path = syncer_module.Syncer([], {})._get_manifest_path(local_path)
+    j.sals.fs.mkdirs(syncer_module.MANIFESTS_DIR)
+    j.sals.fs.write_file(manifest_path, '{"a.txt": [3, 1000,')
+
+    remote_files = {"a.txt": (b"aaa", 1000), "sub/b.txt": (b"bbb", 2000)}
+    get_delta_syncer(calls, local_path, remote_files).sync()
+
+    # the corrupt manifest is ignored, and replaced by a valid one
+    assert [call[0] for call in calls] == ["sha256sum", "utime"]
+    assert get_saved_manifest(local_path)["sub/b.txt"] == [3, 1000, hashlib.sha256(b"bbb").hexdigest()]
+
+
+def test_delta_sync_remote_listing_fails(local_path):
+    calls = []
+    remote_files = {"a.txt": (b"aaa", 1000), "sub/b.txt": (b"bbb", 1000)}
+    get_delta_syncer(calls, local_path, remote_files, find_fails=True).sync()
+
+    # everything is synced, as if the remote machine was empty
+    assert ("run", "mkdir -p /tmp/dest /tmp/dest/sub") in calls
+    puts = sorted(call[1] for call in calls if call[0] == "put")
+    assert puts == ["/tmp/dest/a.txt", "/tmp/dest/sub/b.txt"]